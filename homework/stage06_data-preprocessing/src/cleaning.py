@@ -1,22 +1,74 @@
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
 
-def fill_missing_median(df: pd.DataFrame, columns: list) -> pd.DataFrame:
-    df_filled = df.copy()
+def _copy_on_write() -> bool:
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except (KeyError, pd.errors.OptionError):
+        return False
+
+def _target_frame(df: pd.DataFrame, inplace: bool) -> pd.DataFrame:
+    if inplace:
+        return df
+    return df.copy(deep=not _copy_on_write())
+
+def _writable_values(df: pd.DataFrame, col) -> np.ndarray:
+    values = df[col].to_numpy(copy=False)
+    if values.dtype.kind == 'f' and values.flags.writeable and values.base is not None:
+        return values
+    return None
+
+def fill_missing_median(df: pd.DataFrame, columns: list, inplace: bool = False) -> pd.DataFrame:
+    out = _target_frame(df, inplace)
     for col in columns:
-        if col in df.columns:
-            df_filled[col] = df[col].fillna(df[col].median())
-    return df_filled
+        if col not in out.columns:
+            continue
+        values = _writable_values(out, col)
+        if values is not None:
+            mask = np.isnan(values)
+            if mask.any():
+                values[mask] = np.nanmedian(values)
+            continue
+        mask = out[col].isna().to_numpy()
+        if not mask.any():
+            continue
+        median = out[col].median()
+        if inplace and out[col].dtype.kind == 'f':
+            out.loc[mask, col] = median
+        else:
+            out[col] = out[col].fillna(median)
+    return out
 
-def drop_missing(df: pd.DataFrame, threshold: float = 0.5) -> pd.DataFrame:
-    missing_ratios = df.isnull().mean()
+def drop_missing(df: pd.DataFrame, threshold: float = 0.5, inplace: bool = False) -> pd.DataFrame:
+    missing_ratios = 1 - df.count() / max(len(df), 1)
     cols_to_drop = missing_ratios[missing_ratios > threshold].index
+    if inplace:
+        if len(cols_to_drop):
+            df.drop(columns=cols_to_drop, inplace=True)
+        return df
     return df.drop(columns=cols_to_drop)
 
-def normalize_data(df: pd.DataFrame, columns: list) -> pd.DataFrame:
-    df_norm = df.copy()
-    scaler = MinMaxScaler()
+def normalize_data(df: pd.DataFrame, columns: list, inplace: bool = False) -> pd.DataFrame:
+    out = _target_frame(df, inplace)
     for col in columns:
-        if col in df.columns:
-            df_norm[col] = scaler.fit_transform(df[[col]])
-    return df_norm
\ No newline at end of file
+        if col not in out.columns:
+            continue
+        values = _writable_values(out, col)
+        if values is not None:
+            source = values
+        else:
+            source = out[col].to_numpy()
+            if source.dtype.kind != 'f':
+                source = source.astype(np.float64)
+        lo, hi = np.nanmin(source), np.nanmax(source)
+        scale = hi - lo if hi > lo else 1.0
+        if values is not None:
+            np.subtract(values, lo, out=values)
+            np.divide(values, scale, out=values)
+        elif inplace and out[col].dtype.kind == 'f':
+            out.loc[:, col] = (source - lo) / scale
+        else:
+            out[col] = (source - lo) / scale
+    return out
\ No newline at end of file
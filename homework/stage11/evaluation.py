@@ -49,7 +49,7 @@ def zero_fill(a: np.ndarray) -> np.ndarray:
 
 def forward_fill(a: np.ndarray) -> np.ndarray:
     """Forward fill missing values"""
-    return pd.Series(a).fillna(method='ffill').fillna(method='bfill').values
+    return pd.Series(a).ffill().bfill().to_numpy()
 
 def drop_missing(a: np.ndarray) -> np.ndarray:
     """Drop missing values"""
@@ -2,6 +2,9 @@
 Flask API for AAPL Stock Price Prediction
 """
 from flask import Flask, request, jsonify
+import atexit
+import os
+import sys
 import pickle
 import numpy as np
 import matplotlib.pyplot as plt
@@ -21,6 +24,64 @@ except Exception as e:
     print(f"Error loading model: {e}")
     model = None
 
+# Optional fitted cleaning statistics shared with the batch jobs
+# (project/src/cleaning.py::CleaningPipeline). When present, /predict applies
+# the same median fill and min/max scaling that was fitted on training data.
+FEATURE_NAMES = ['Open', 'High', 'Low', 'Volume', 'close_ma_5_prev', 'price_range']
+CLEANING_PIPELINE_PATH = 'model/cleaning_pipeline.json'
+cleaning_pipeline = None
+if os.path.exists(CLEANING_PIPELINE_PATH):
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'project', 'src'))
+        from cleaning import CleaningPipeline
+        cleaning_pipeline = CleaningPipeline.load(CLEANING_PIPELINE_PATH)
+        if cleaning_pipeline.columns_ != FEATURE_NAMES:
+            raise ValueError(f"pipeline columns {cleaning_pipeline.columns_} != {FEATURE_NAMES}")
+        print("✓ Cleaning pipeline loaded successfully")
+    except Exception as e:
+        print(f"Error loading cleaning pipeline: {e}")
+        cleaning_pipeline = None
+
+# Optional drift monitor (src/monitoring.py). With reference statistics built
+# from the raw training features, /predict records each request's raw features
+# (before the cleaning pipeline) into an in-memory window that is compared
+# with the reference on a background thread.
+REFERENCE_STATS_PATH = 'model/reference_stats.json'
+MONITOR_WINDOW = int(os.environ.get('MONITOR_WINDOW', 5000))
+MONITOR_INTERVAL = float(os.environ.get('MONITOR_INTERVAL', 30))
+monitor = None
+if os.path.exists(REFERENCE_STATS_PATH):
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+        from monitoring import DriftMonitor, load_reference
+        monitor = DriftMonitor(load_reference(REFERENCE_STATS_PATH), FEATURE_NAMES,
+                               window=MONITOR_WINDOW, interval=MONITOR_INTERVAL).start()
+        print("✓ Drift monitor started")
+    except Exception as e:
+        print(f"Error starting drift monitor: {e}")
+        monitor = None
+
+# Asynchronous prediction log (src/prediction_log.py): every prediction is
+# queued in memory and written to rotating Parquet files by a background
+# thread, for later evaluation. Set PREDICTION_LOG_DIR='' to disable.
+PREDICTION_LOG_DIR = os.environ.get('PREDICTION_LOG_DIR', 'logs/predictions')
+prediction_logger = None
+if PREDICTION_LOG_DIR:
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+        from prediction_log import PredictionLogger
+        prediction_logger = PredictionLogger(
+            PREDICTION_LOG_DIR, FEATURE_NAMES,
+            capacity=int(os.environ.get('PREDICTION_LOG_CAPACITY', 10000)),
+            flush_interval=float(os.environ.get('PREDICTION_LOG_FLUSH_SECONDS', 5)),
+            policy=os.environ.get('PREDICTION_LOG_POLICY', 'drop_oldest'),
+        ).start()
+        atexit.register(prediction_logger.close)
+        print("✓ Prediction logging enabled")
+    except Exception as e:
+        print(f"Error starting prediction logger: {e}")
+        prediction_logger = None
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """POST endpoint for prediction with JSON features"""
@@ -44,8 +105,19 @@ def predict():
         if model is None:
             return jsonify({'error': 'Model not loaded'}), 500
         
+        # monitor and log the request as sent: the drift reference is in raw
+        # feature space, and raw records can be replayed against the API
+        raw_features = features
+        if cleaning_pipeline is not None:
+            features = cleaning_pipeline.transform_row(features)
+        
         prediction = model.predict([features])[0]
         
+        if monitor is not None:
+            monitor.record(raw_features, prediction)
+        if prediction_logger is not None:
+            prediction_logger.log(raw_features, prediction, endpoint='/predict')
+        
         return jsonify({
             'prediction': float(prediction),
             'features': features,
@@ -73,6 +145,9 @@ def predict_single(open_price):
         
         prediction = model.predict([features])[0]
         
+        if prediction_logger is not None:
+            prediction_logger.log(features, prediction, endpoint='/predict/<open_price>')
+        
         return jsonify({
             'prediction': float(prediction),
             'open_price': open_price,
@@ -101,6 +176,9 @@ def predict_two(open_price, high_price):
         
         prediction = model.predict([features])[0]
         
+        if prediction_logger is not None:
+            prediction_logger.log(features, prediction, endpoint='/predict/<open_price>/<high_price>')
+        
         return jsonify({
             'prediction': float(prediction),
             'open_price': open_price,
@@ -140,17 +218,36 @@ def plot():
     except Exception as e:
         return jsonify({'error': f'Plot generation failed: {str(e)}'}), 500
 
+@app.route('/monitor')
+def monitor_report():
+    """GET endpoint with feature and prediction drift statistics"""
+    try:
+        if monitor is None:
+            return jsonify({'error': f'Drift monitor not enabled ({REFERENCE_STATS_PATH} not found)'}), 404
+        
+        # ?refresh=1 recomputes now instead of returning the last background result
+        if request.args.get('refresh') in ('1', 'true'):
+            return jsonify(monitor.refresh())
+        return jsonify(monitor.report)
+        
+    except Exception as e:
+        return jsonify({'error': f'Monitor report failed: {str(e)}'}), 500
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'model_loaded': model is not None,
+        'cleaning_pipeline_loaded': cleaning_pipeline is not None,
+        'drift_monitor_enabled': monitor is not None,
+        'prediction_log': prediction_logger.stats() if prediction_logger is not None else None,
         'endpoints': [
             'POST /predict',
             'GET /predict/<open_price>',
             'GET /predict/<open_price>/<high_price>',
             'GET /plot',
+            'GET /monitor',
             'GET /health'
         ]
     })
@@ -0,0 +1,285 @@
+"""
+Drift and data-quality monitoring for served features
+
+The request path only copies each feature vector and prediction into a
+fixed-size ring buffer (a few microseconds). A background thread periodically
+compares the most recent window with reference statistics from the training
+data:
+
+- PSI over the reference decile bins (0.1 = watch, 0.25 = drift)
+- Kolmogorov-Smirnov distance against the reference quantile function,
+  with its asymptotic p-value
+- data quality: missing values and values outside the training range
+
+Feature statistics are in raw feature space (the values clients send, before
+any cleaning pipeline), and the API records raw request features. The
+prediction distribution comes from the model applied to its actual inputs,
+i.e. after the cleaning pipeline when one is used.
+
+Build the reference once from training data:
+    python src/monitoring.py --data ../../project/data/processed/aapl_2023_cleaned.csv \
+        --model model/model.pkl --cleaning-pipeline model/cleaning_pipeline.json \
+        --output model/reference_stats.json
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+PSI_WARN = 0.1
+PSI_DRIFT = 0.25
+KS_ALPHA = 0.01
+# share of a histogram bin assumed when it is empty (keeps PSI finite)
+PSI_EPSILON = 1e-4
+PREDICTION = 'prediction'
+
+def build_reference(df, columns, predictions=None, n_bins=10, n_quantiles=101):
+    """
+    Reference statistics of the training features (and predictions)
+
+    Bins are reference quantiles, so every bin holds ~1/n_bins of the
+    training rows and PSI is sensitive across the whole distribution.
+    """
+    data = {c: df[c].to_numpy(dtype=np.float64) for c in columns}
+    if predictions is not None:
+        data[PREDICTION] = np.asarray(predictions, dtype=np.float64)
+    probs = np.linspace(0, 1, n_quantiles)
+    reference = {'created': datetime.now(timezone.utc).isoformat(), 'n_bins': n_bins, 'features': {}}
+    for name, values in data.items():
+        values = values[~np.isnan(values)]
+        # inner edges only: the outer bins are open-ended
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        reference['features'][name] = {
+            'n': int(len(values)),
+            'edges': edges.tolist(),
+            'proportions': (counts / max(len(values), 1)).tolist(),
+            'quantiles': np.quantile(values, probs).tolist(),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+        }
+    return reference
+
+def save_reference(reference, path):
+    """Write reference statistics to JSON"""
+    with open(path, 'w') as f:
+        json.dump(reference, f, indent=2)
+
+def load_reference(path):
+    """Load reference statistics written by save_reference"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def psi(expected, actual, epsilon=PSI_EPSILON):
+    """Population Stability Index between two bin-proportion vectors"""
+    expected = np.clip(np.asarray(expected, dtype=np.float64), epsilon, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def ks_pvalue(statistic, n1, n2):
+    """Asymptotic two-sample Kolmogorov-Smirnov p-value"""
+    if n1 == 0 or n2 == 0:
+        return float('nan')
+    n = n1 * n2 / (n1 + n2)
+    lam = (np.sqrt(n) + 0.12 + 0.11 / np.sqrt(n)) * statistic
+    if lam < 1e-3:
+        return 1.0
+    k = np.arange(1, 101)
+    p = 2 * np.sum((-1) ** (k - 1) * np.exp(-2 * (k * lam) ** 2))
+    return float(min(max(p, 0.0), 1.0))
+
+def ks_statistic(ref_quantiles, values):
+    """
+    KS distance between a sample and a reference distribution given by its
+    quantile function (evenly spaced probabilities)
+    """
+    ref_quantiles = np.asarray(ref_quantiles, dtype=np.float64)
+    x = np.sort(values)
+    n = len(x)
+    if n == 0:
+        return float('nan')
+    probs = np.linspace(0, 1, len(ref_quantiles))
+    # reference CDF at each sample point, linear between the stored quantiles
+    ref_cdf = np.interp(x, ref_quantiles, probs, left=0.0, right=1.0)
+    upper = np.arange(1, n + 1) / n - ref_cdf
+    lower = ref_cdf - np.arange(n) / n
+    return float(max(upper.max(), lower.max()))
+
+class DriftMonitor:
+    """
+    Rolling window of served features and predictions, compared with
+    training reference statistics on a background thread.
+
+    record() is the only call made on the request path: one row copy into a
+    preallocated array under a lock. All statistics are computed by
+    refresh(), either on the thread started by start() or on demand.
+    """
+
+    def __init__(self, reference, feature_names, window=5000, interval=30.0, min_samples=100):
+        """
+        reference: dict from build_reference / load_reference
+        feature_names: order of the features passed to record()
+        window: number of most recent requests compared with the reference
+        interval: seconds between background refreshes
+        min_samples: requests needed before drift is reported
+        """
+        self.reference = reference
+        self.feature_names = list(feature_names)
+        self.columns = self.feature_names + [PREDICTION]
+        self.window = window
+        self.interval = interval
+        self.min_samples = min_samples
+        self._buffer = np.full((window, len(self.columns)), np.nan)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.report = {'status': 'starting', 'samples': 0}
+
+    def record(self, features, prediction=None):
+        """Store one request (called from the request handler)"""
+        with self._lock:
+            row = self._buffer[self._count % self.window]
+            row[:-1] = features
+            row[-1] = np.nan if prediction is None else prediction
+            self._count += 1
+
+    def snapshot(self):
+        """Copy of the current window (oldest row first) and the total request count"""
+        with self._lock:
+            count = self._count
+            if count < self.window:
+                return self._buffer[:count].copy(), count
+            start = count % self.window
+            return np.concatenate([self._buffer[start:], self._buffer[:start]]), count
+
+    def _feature_report(self, name, values):
+        ref = self.reference['features'][name]
+        missing = np.isnan(values)
+        values = values[~missing]
+        result = {
+            'samples': int(len(values)),
+            'missing_share': float(missing.mean()) if len(missing) else 0.0,
+        }
+        if len(values) == 0:
+            result['status'] = 'no_data'
+            return result
+        edges = np.asarray(ref['edges'])
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        stat = ks_statistic(ref['quantiles'], values)
+        result.update({
+            'psi': psi(ref['proportions'], counts / len(values)),
+            'ks_statistic': stat,
+            'ks_pvalue': ks_pvalue(stat, len(values), ref['n']),
+            'mean': float(values.mean()),
+            'reference_mean': ref['mean'],
+            'out_of_range_share': float(np.mean((values < ref['min']) | (values > ref['max']))),
+        })
+        if len(values) < self.min_samples:
+            result['status'] = 'insufficient_data'
+        elif result['psi'] >= PSI_DRIFT or result['ks_pvalue'] < KS_ALPHA:
+            result['status'] = 'drift'
+        elif result['psi'] >= PSI_WARN:
+            result['status'] = 'warn'
+        else:
+            result['status'] = 'ok'
+        return result
+
+    def refresh(self):
+        """Recompute drift statistics for the current window"""
+        started = time.perf_counter()
+        data, count = self.snapshot()
+        features = {}
+        for j, name in enumerate(self.columns):
+            if name in self.reference['features']:
+                features[name] = self._feature_report(name, data[:, j])
+        statuses = [f['status'] for f in features.values()]
+        if 'drift' in statuses:
+            status = 'drift'
+        elif 'warn' in statuses:
+            status = 'warn'
+        elif len(data) < self.min_samples:
+            status = 'insufficient_data'
+        else:
+            status = 'ok'
+        report = {
+            'status': status,
+            'updated': datetime.now(timezone.utc).isoformat(),
+            'samples': int(len(data)),
+            'requests_total': int(count),
+            'window': self.window,
+            'thresholds': {'psi_warn': PSI_WARN, 'psi_drift': PSI_DRIFT, 'ks_alpha': KS_ALPHA},
+            'features': features,
+            'compute_ms': (time.perf_counter() - started) * 1000,
+        }
+        self.report = report
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f'[monitor] refresh failed: {e}')
+
+    def start(self):
+        """Start the background refresh thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='drift-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+def main(argv=None):
+    """Build reference statistics (raw features, served predictions) from training data"""
+    import pickle
+    from utils import engineer_features
+
+    parser = argparse.ArgumentParser(description='Build drift-monitor reference statistics')
+    parser.add_argument('--data', required=True, help='Training CSV (OHLCV or engineered features)')
+    parser.add_argument('--model', help='Pickled model; adds the prediction distribution')
+    parser.add_argument('--cleaning-pipeline',
+                        help='CleaningPipeline JSON the API applies before the model; '
+                             'predictions are made on transformed features, the '
+                             'feature statistics stay raw')
+    parser.add_argument('--features', nargs='+',
+                        default=['Open', 'High', 'Low', 'Volume', 'close_ma_5_prev', 'price_range'])
+    parser.add_argument('--train-fraction', type=float, default=0.8,
+                        help='Leading share of rows used for training (as in the notebook)')
+    parser.add_argument('--bins', type=int, default=10)
+    parser.add_argument('--output', default='model/reference_stats.json')
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    if any(c not in df.columns for c in args.features):
+        df = engineer_features(df)
+    df = df.iloc[:int(len(df) * args.train_fraction)]
+    predictions = None
+    if args.model:
+        with open(args.model, 'rb') as f:
+            model = pickle.load(f)
+        inputs = df[args.features]
+        if args.cleaning_pipeline:
+            from cleaning import CleaningPipeline
+            inputs = CleaningPipeline.load(args.cleaning_pipeline).transform(inputs)[args.features]
+        predictions = model.predict(inputs.to_numpy())
+    reference = build_reference(df, args.features, predictions, n_bins=args.bins)
+    save_reference(reference, args.output)
+    print(f"✓ Reference statistics for {len(reference['features'])} columns "
+          f"({len(df)} rows) saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
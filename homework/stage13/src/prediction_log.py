@@ -0,0 +1,250 @@
+"""
+Asynchronous prediction logging to rotating Parquet files
+
+Request handlers call PredictionLogger.log(), which appends one tuple to a
+bounded in-memory ring buffer under a lock held only for the append; nothing
+touches the disk on the request path. A background thread drains the buffer
+when it holds ``flush_records`` records or every ``flush_interval`` seconds
+and appends the batch as one row group to the current Parquet file:
+
+    <directory>/date=2024-01-31/predictions-093000-<id>.parquet
+
+Files are written as hidden ``.tmp`` files and renamed once they are rotated
+(``max_file_records`` rows, ``rotate_interval`` seconds, a new UTC day, or
+close()), so readers only ever see complete files.
+
+When the buffer is full (the writer cannot keep up, or the disk is slow) the
+request is never blocked; the overload policy decides what is lost:
+
+- ``drop_oldest``: keep the newest ``capacity`` records (ring-buffer overwrite)
+- ``drop_newest``: keep the buffered records and reject new ones
+
+Dropped records are counted in stats().
+
+Example:
+    logger = PredictionLogger('logs/predictions', FEATURE_NAMES).start()
+    logger.log(features, prediction, endpoint='/predict')
+    df = read_prediction_log('logs/predictions')
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+POLICIES = ('drop_oldest', 'drop_newest')
+
+class PredictionLogger:
+    """
+    Bounded, non-blocking prediction log with a background Parquet writer
+    """
+
+    def __init__(self, directory, feature_names, capacity=10000, flush_records=1000,
+                 flush_interval=5.0, max_file_records=100000, rotate_interval=3600.0,
+                 policy='drop_oldest'):
+        """
+        directory: root directory of the log files
+        feature_names: names of the features passed to log(), in order
+        capacity: maximum records held in memory between flushes
+        flush_records: buffered records that trigger a flush
+        flush_interval: maximum seconds between flushes
+        max_file_records: rows per file before it is rotated
+        rotate_interval: maximum seconds a file stays open
+        policy: what to drop when the buffer is full (see POLICIES)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        if capacity < 1 or flush_records < 1 or max_file_records < 1:
+            raise ValueError("capacity, flush_records and max_file_records must be >= 1")
+        self.directory = Path(directory)
+        self.feature_names = list(feature_names)
+        self.capacity = capacity
+        self.flush_records = min(flush_records, capacity)
+        self.flush_interval = flush_interval
+        self.max_file_records = max_file_records
+        self.rotate_interval = rotate_interval
+        self.policy = policy
+        self.schema = pa.schema(
+            [('timestamp', pa.timestamp('us', tz='UTC')), ('endpoint', pa.string())]
+            + [(name, pa.float64()) for name in self.feature_names]
+            + [('prediction', pa.float64())]
+        )
+        self._buffer = deque(maxlen=capacity if policy == 'drop_oldest' else None)
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # writer state is only touched by the flushing thread (or close())
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._file = None
+        self._file_rows = 0
+        self._file_opened = 0.0
+        self._file_date = None
+        self._stats = {'logged': 0, 'dropped': 0, 'written': 0, 'write_errors': 0, 'files': 0}
+
+    def log(self, features, prediction, endpoint='/predict'):
+        """Queue one prediction record; never blocks on I/O"""
+        record = (time.time(), endpoint, *features, prediction)
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                self._stats['dropped'] += 1
+                if self.policy == 'drop_newest':
+                    return False
+            self._buffer.append(record)
+            self._stats['logged'] += 1
+            pending = len(self._buffer)
+        if pending >= self.flush_records:
+            self._flush_requested.set()
+        return True
+
+    def _drain(self):
+        with self._lock:
+            records = self._buffer
+            self._buffer = deque(maxlen=records.maxlen)
+        return records
+
+    def _batch(self, records):
+        columns = list(zip(*records))
+        micros = (np.asarray(columns[0]) * 1e6).astype(np.int64)
+        arrays = [pa.array(micros, type=self.schema.field(0).type),
+                  pa.array(columns[1], type=pa.string())]
+        arrays += [pa.array(values, type=pa.float64()) for values in columns[2:]]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def _open_file(self, now):
+        date = now.strftime('%Y-%m-%d')
+        directory = self.directory / f'date={date}'
+        directory.mkdir(parents=True, exist_ok=True)
+        self._file = directory / f"predictions-{now.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        self._writer = pq.ParquetWriter(directory / f'.{self._file.name}.tmp', self.schema)
+        self._file_rows = 0
+        self._file_opened = time.monotonic()
+        self._file_date = date
+
+    def _close_file(self):
+        """Finish the current file and publish it under its final name"""
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._file.parent / f'.{self._file.name}.tmp', self._file)
+        self._writer = None
+        with self._lock:
+            self._stats['files'] += 1
+        logging.info(f'[prediction_log] wrote {self._file_rows} records to {self._file}')
+
+    def _abandon_file(self):
+        """Drop the current writer after a failed write (its .tmp file stays unpublished)"""
+        if self._writer is None:
+            return
+        try:
+            self._writer.close()
+        except Exception:
+            pass
+        self._writer = None
+
+    def _rotate_if_due(self, now):
+        if self._writer is None:
+            return
+        if (self._file_rows >= self.max_file_records
+                or time.monotonic() - self._file_opened >= self.rotate_interval
+                or now.strftime('%Y-%m-%d') != self._file_date):
+            self._close_file()
+
+    def flush(self):
+        """Write all buffered records now; returns the number written"""
+        with self._write_lock:
+            records = self._drain()
+            now = datetime.now(timezone.utc)
+            # rows written earlier into the open file are lost with it if publishing fails
+            carried, carried_file = self._file_rows if self._writer is not None else 0, self._file
+            try:
+                self._rotate_if_due(now)
+                if not records:
+                    return 0
+                batch = self._batch(records)
+                offset = 0
+                while offset < batch.num_rows:
+                    if self._writer is None:
+                        self._open_file(now)
+                    part = batch.slice(offset, self.max_file_records - self._file_rows)
+                    self._writer.write_batch(part)
+                    self._file_rows += part.num_rows
+                    offset += part.num_rows
+                    self._rotate_if_due(now)
+            except Exception as e:
+                # the batch (and an unpublished file) is lost; keep serving and
+                # start a fresh file with the next one
+                lost = len(records) + (carried if self._writer is not None and self._file == carried_file else 0)
+                logging.error(f'[prediction_log] failed to write {lost} records: {e}')
+                self._abandon_file()
+                with self._lock:
+                    self._stats['write_errors'] += lost
+                return 0
+            with self._lock:
+                self._stats['written'] += len(records)
+            return len(records)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the writer, flush what is buffered and publish the open file"""
+        self._stop.set()
+        self._flush_requested.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            self._close_file()
+
+    def stats(self):
+        """Counters of logged, dropped, written and failed records"""
+        with self._lock:
+            return dict(self._stats, buffered=len(self._buffer), policy=self.policy,
+                        capacity=self.capacity)
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tz is None else ts.tz_convert('UTC')
+
+def read_prediction_log(directory, start=None, end=None):
+    """Load published prediction log files into one DataFrame sorted by timestamp"""
+    files = sorted(Path(directory).glob('date=*/predictions-*.parquet'))
+    # partitions are dated by their flush time, so a file can hold records up
+    # to one flush older than its date= directory (end keeps one extra day)
+    if start is not None:
+        start = _utc(start)
+        files = [f for f in files if f.parent.name[len('date='):] >= start.strftime('%Y-%m-%d')]
+    if end is not None:
+        end = _utc(end)
+        last = (end + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        files = [f for f in files if f.parent.name[len('date='):] <= last]
+    if not files:
+        return pd.DataFrame()
+    df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    if start is not None:
+        df = df[df['timestamp'] >= start]
+    if end is not None:
+        df = df[df['timestamp'] < end]
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
@@ -1,18 +1,34 @@
 """
 Utility functions for AAPL stock analysis
 """
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from sklearn.preprocessing import StandardScaler
 
+# Shared indicator kernels live in project/src; appended so that
+# project/src/utils.py never shadows this module
+PROJECT_SRC = Path(__file__).resolve().parents[3] / 'project' / 'src'
+if str(PROJECT_SRC) not in sys.path:
+    sys.path.append(str(PROJECT_SRC))
+
+import indicators
+
 def calculate_metrics(df):
     """Calculate basic descriptive statistics"""
     return df.describe()
 
-def engineer_features(df):
-    """Engineer features for stock analysis"""
+def engineer_features(df, indicator_spec=None):
+    """
+    Engineer features for stock analysis
+    
+    indicator_spec optionally adds lagged technical indicators, e.g.
+    {"rsi": {"window": 14}, "atr": {"window": 14}} (see indicators.py)
+    """
     df_copy = df.copy()
     
     # Price-based features
@@ -25,6 +41,9 @@ def engineer_features(df):
     df_copy['roll_mean_5'] = df_copy['ret'].shift(1).rolling(5, min_periods=5).mean()
     df_copy['roll_vol_20'] = df_copy['ret'].shift(1).rolling(20, min_periods=20).std()
     
+    if indicator_spec:
+        indicators.add_technical_indicators(df_copy, indicator_spec)
+    
     return df_copy.dropna()
 
 def train_model(X, y):
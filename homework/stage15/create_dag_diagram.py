@@ -1,139 +1,305 @@
- #!/usr/bin/env python3
+#!/usr/bin/env python3
 """
 Create DAG diagram for AAPL Pipeline
+
+The diagram is generated from the pipeline definition in
+refactor_demo/run_pipeline.py, so it always matches the tasks and
+dependencies that actually run. Nodes are placed by a layered layout
+(layer = longest path from a source task, order within a layer by the
+barycenter of connected tasks), which works for any DAG size. When a run
+state file exists, every node is annotated with its last-run duration, rows
+processed and cache hit/miss, and shaded by its share of the pipeline time.
+
+Usage:
+    python create_dag_diagram.py
+    python create_dag_diagram.py --state refactor_demo/.pipeline_state.json -o dag.png -o dag.svg
+    python create_dag_diagram.py --config refactor_demo/pipeline_config.json --orientation LR
 """
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import matplotlib
+matplotlib.use('Agg')  # headless: render straight to files
 import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.patches import FancyBboxPatch
-import numpy as np
-
-# Create figure
-fig, ax = plt.subplots(1, 1, figsize=(12, 8))
-
-# Define tasks and positions
-tasks = [
-    ('data_ingestion', 'Data Ingestion\n(yfinance API)', (2, 6)),
-    ('data_cleaning', 'Data Cleaning\n(normalize, validate)', (2, 5)),
-    ('feature_engineering', 'Feature Engineering\n(technical indicators)', (2, 4)),
-    ('model_training', 'Model Training\n(Linear/Logistic Regression)', (2, 3)),
-    ('model_evaluation', 'Model Evaluation\n(metrics, diagnostics)', (2, 2)),
-    ('reporting', 'Reporting\n(stakeholder analysis)', (2, 1))
-]
-
-# Colors for different task types
-colors = {
-    'data_ingestion': '#E8F4FD',      # Light blue
-    'data_cleaning': '#E8F6F3',       # Light green  
-    'feature_engineering': '#FDF2E9', # Light orange
-    'model_training': '#F4ECF7',      # Light purple
-    'model_evaluation': '#FADBD8',    # Light red
-    'reporting': '#EAEDED'            # Light gray
+from matplotlib import colors as mcolors
+from matplotlib.lines import Line2D
+from matplotlib.patches import FancyBboxPatch, Patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'refactor_demo'))
+
+STATUS_COLORS = {
+    'success': '#27AE60',
+    'skipped': '#2E86C1',
+    'failed': '#C0392B',
+    'blocked': '#E67E22',
+    None: '#7F8C8D',        # never run
 }
+IDLE_FACE = '#F4F6F7'
+
+
+def layered_layout(nodes: List[str], edges: List[Tuple[str, str]], sweeps: int = 4):
+    """
+    Layered (Sugiyama-style) layout.
+
+    Each node's layer is its longest path from a source. Edges spanning
+    several layers get one virtual node per intermediate layer, so they are
+    routed around the nodes in between; the order inside every layer is then
+    refined by barycenter sweeps (down and up) to reduce edge crossings.
+
+    Args:
+        nodes: Node names in topological order
+        edges: (upstream, downstream) pairs
+        sweeps: Number of barycenter passes
+
+    Returns:
+        tuple: (node -> (layer, position), edge -> list of (layer, position)
+        points from source to target); positions are centred on 0
+    """
+    layer = {}
+    parents = {n: [] for n in nodes}
+    for src, dst in edges:
+        parents[dst].append(src)
+    for node in nodes:
+        layer[node] = 1 + max((layer[p] for p in parents[node]), default=-1)
+
+    # split long edges into unit-length segments through virtual nodes
+    up = {n: [] for n in nodes}
+    down = {n: [] for n in nodes}
+    chains = {}
+    for src, dst in edges:
+        chain = [src]
+        for level in range(layer[src] + 1, layer[dst]):
+            virtual = ('virtual', src, dst, level)
+            layer[virtual] = level
+            up[virtual], down[virtual] = [], []
+            chain.append(virtual)
+        chain.append(dst)
+        for a, b in zip(chain, chain[1:]):
+            down[a].append(b)
+            up[b].append(a)
+        chains[(src, dst)] = chain
+
+    layers = [[] for _ in range(max(layer.values(), default=-1) + 1)]
+    for node in layer:
+        layers[layer[node]].append(node)
+
+    for sweep in range(sweeps):
+        downward = sweep % 2 == 0
+        neighbours = up if downward else down
+        for members in (layers[1:] if downward else layers[-2::-1]):
+            pos = {n: i for level in layers for i, n in enumerate(level)}
+
+            def barycenter(node):
+                linked = neighbours[node]
+                return sum(pos[n] for n in linked) / len(linked) if linked else pos[node]
+
+            members.sort(key=barycenter)
+
+    placed = {}
+    for index, members in enumerate(layers):
+        offset = (len(members) - 1) / 2
+        for i, node in enumerate(members):
+            placed[node] = (index, i - offset)
+    layout = {n: placed[n] for n in nodes}
+    routes = {edge: [placed[n] for n in chain] for edge, chain in chains.items()}
+    return layout, routes
+
+
+def load_run_state(path: Optional[str]) -> Dict[str, Any]:
+    """Run state written by Pipeline.run (empty when the file is missing)."""
+    if path and Path(path).exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {'tasks': {}}
+
+
+def _is_dark(color) -> bool:
+    """True when white text reads better than black on this fill."""
+    r, g, b = mcolors.to_rgb(color)
+    return 0.299 * r + 0.587 * g + 0.114 * b < 0.5
+
+
+def _node_annotation(record: Optional[Dict[str, Any]]) -> str:
+    """'1.23s | 260 rows | miss' from a task state record."""
+    if not record:
+        return 'not run yet'
+    parts = []
+    # a cache hit costs almost nothing; show what the task took when it last ran
+    seconds = record.get('compute_seconds') if record.get('cache') == 'hit' else record.get('duration_seconds')
+    if seconds is not None:
+        parts.append(f"{seconds:.2f}s")
+    if record.get('rows') is not None:
+        parts.append(f"{record['rows']:,} rows")
+    if record.get('cache'):
+        parts.append(record['cache'])
+    if record.get('status') in ('failed', 'blocked'):
+        parts.append(record['status'])
+    return ' | '.join(parts)
+
+
+def draw_dag(nodes: List[str], edges: List[Tuple[str, str]], labels: Optional[Dict[str, str]] = None,
+             state: Optional[Dict[str, Any]] = None, orientation: str = 'TB',
+             title: Optional[str] = None):
+    """
+    Draw a DAG with optional run-state overlays.
+
+    Args:
+        nodes: Node names in topological order
+        edges: (upstream, downstream) pairs
+        labels: Display label per node (default: the node name)
+        state: Pipeline state ({'tasks': {name: record}, 'last_run': {...}})
+        orientation: 'TB' (top to bottom) or 'LR' (left to right)
+        title: Figure title
+
+    Returns:
+        matplotlib.figure.Figure
+    """
+    labels = labels or {}
+    records = (state or {}).get('tasks', {})
+    layout, routes = layered_layout(nodes, edges)
+    points = [p for route in routes.values() for p in route] + list(layout.values())
+    n_layers = max((l for l, _ in points), default=0) + 1
+    width = max(p for _, p in points) - min(p for _, p in points) + 1 if points else 1
+
+    box_w, box_h = 2.6, 0.9
+    gap_across, gap_along = 3.2, 1.8
+
+    def to_xy(point):
+        layer_index, pos = point
+        if orientation == 'LR':
+            return layer_index * gap_across * 1.15, -pos * gap_along
+        return pos * gap_across, -layer_index * gap_along
+
+    def centre(node):
+        return to_xy(layout[node])
+
+    # compute seconds drive the shading, so cached runs still show where time goes
+    seconds = {n: (records.get(n) or {}).get('compute_seconds') for n in nodes}
+    total = sum(s for s in seconds.values() if s)
+    cmap = matplotlib.colormaps['YlOrRd']
+    norm = mcolors.Normalize(vmin=0, vmax=max((s / total for s in seconds.values() if s), default=1)
+                             if total else 1)
+
+    if orientation == 'LR':
+        figsize = (max(8, n_layers * 3.4), max(4, width * 2.0 + 1.5))
+    else:
+        figsize = (max(8, width * 3.6), max(5, n_layers * 1.9 + 1.5))
+    fig, ax = plt.subplots(1, 1, figsize=figsize)
+
+    for (src, dst), route in routes.items():
+        xy = [to_xy(p) for p in route]
+        (x0, y0), (x1, y1) = xy[0], xy[-1]
+        if orientation == 'LR':
+            xy[0], xy[-1] = (x0 + box_w / 2, y0), (x1 - box_w / 2, y1)
+        else:
+            xy[0], xy[-1] = (x0, y0 - box_h / 2), (x1, y1 + box_h / 2)
+        if len(xy) > 2:
+            # long edge: straight segments through its virtual nodes
+            ax.plot([x for x, _ in xy[:-1]], [y for _, y in xy[:-1]], color='#2C3E50', lw=1.6)
+        ax.annotate('', xy=xy[-1], xytext=xy[-2],
+                    arrowprops=dict(arrowstyle='->', color='#2C3E50', lw=1.6,
+                                    shrinkA=0, shrinkB=2))
+
+    for node in nodes:
+        x, y = centre(node)
+        record = records.get(node)
+        share = seconds[node] / total if total and seconds[node] else None
+        face = cmap(norm(share)) if share is not None else IDLE_FACE
+        status = record.get('status') if record else None
+        ax.add_patch(FancyBboxPatch(
+            (x - box_w / 2, y - box_h / 2), box_w, box_h,
+            boxstyle='round,pad=0.08', facecolor=face,
+            edgecolor=STATUS_COLORS.get(status, STATUS_COLORS[None]), linewidth=2.4,
+            linestyle='--' if record and record.get('cache') == 'hit' else '-'))
+        dark = _is_dark(face)
+        ax.text(x, y + 0.12, labels.get(node, node), ha='center', va='center',
+                fontsize=9, fontweight='bold', color='white' if dark else 'black')
+        annotation = _node_annotation(record)
+        if share is not None:
+            annotation += f'\n{share:.0%} of compute time'
+        ax.text(x, y - 0.28, annotation, ha='center', va='center', fontsize=7.5,
+                style='italic', color='#F2F3F4' if dark else '#34495E')
+
+    xs = [to_xy(p)[0] for p in points] or [0]
+    ys = [to_xy(p)[1] for p in points] or [0]
+    ax.set_xlim(min(xs) - box_w, max(xs) + box_w)
+    ax.set_ylim(min(ys) - box_h * 1.5, max(ys) + box_h * 1.5)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+    last_run = (state or {}).get('last_run')
+    if title is None:
+        title = 'Pipeline Task Dependencies (DAG)'
+    if last_run:
+        title += f"\nlast run {last_run['started'][:19]}, {last_run['wall_seconds']:.2f}s wall"
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=16)
+
+    legend = [Line2D([0], [0], color=color, lw=2.4, label=status or 'not run')
+              for status, color in STATUS_COLORS.items()]
+    legend.append(Line2D([0], [0], color='#7F8C8D', lw=2.4, linestyle='--', label='cache hit'))
+    if total:
+        legend.append(Patch(facecolor=cmap(norm(norm.vmax)), label='largest share of compute'))
+    ax.legend(handles=legend, loc='upper left', bbox_to_anchor=(1.0, 1.0), fontsize=8, frameon=False)
+    fig.tight_layout()
+    return fig
+
+
+def render_pipeline_diagram(pipeline, state: Optional[Dict[str, Any]], outputs: Iterable[str],
+                            orientation: str = 'TB', dpi: int = 200,
+                            title: Optional[str] = None) -> List[str]:
+    """
+    Render a run_pipeline.Pipeline to one or more files.
+
+    Args:
+        pipeline: Pipeline whose tasks and dependencies define the graph
+        state: Run state to overlay (None for a plain diagram)
+        outputs: Output paths; the format follows the extension (.png, .svg, .pdf)
+        orientation: 'TB' or 'LR'
+        dpi: Resolution for raster formats
+        title: Figure title
+
+    Returns:
+        list: Written paths
+    """
+    labels = {name: task.label for name, task in pipeline.tasks.items()}
+    fig = draw_dag(pipeline.order, pipeline.edges(), labels, state, orientation, title)
+    written = []
+    for path in outputs:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+        written.append(str(path))
+    plt.close(fig)
+    return written
+
+
+def main(argv=None):
+    """Main CLI entry point."""
+    from run_pipeline import build_aapl_pipeline, load_pipeline_config
+
+    parser = argparse.ArgumentParser(description='Render the pipeline DAG with run-state overlays')
+    parser.add_argument('--config', help='Pipeline configuration JSON (as for run_pipeline.py)')
+    parser.add_argument('--state', help='Run state file (default: state_path from the config)')
+    parser.add_argument('-o', '--output', action='append',
+                        help='Output file, repeatable (default: aapl_pipeline_dag.png and .pdf)')
+    parser.add_argument('--orientation', choices=['TB', 'LR'], default='TB')
+    parser.add_argument('--dpi', type=int, default=200)
+    parser.add_argument('--title', default='AAPL Stock Prediction Pipeline - Task Dependencies (DAG)')
+    args = parser.parse_args(argv)
+
+    config = load_pipeline_config(args.config, state_path=args.state)
+    pipeline = build_aapl_pipeline(config)
+    state = load_run_state(config['state_path'])
+    outputs = args.output or ['aapl_pipeline_dag.png', 'aapl_pipeline_dag.pdf']
+    written = render_pipeline_diagram(pipeline, state, outputs, args.orientation, args.dpi, args.title)
+
+    print("DAG diagram saved as:")
+    for path in written:
+        print(f"- {path}")
+
 
-# Draw task boxes
-box_width = 2.5
-box_height = 0.6
-boxes = {}
-
-for task_id, task_name, (x, y) in tasks:
-    # Create fancy box
-    box = FancyBboxPatch(
-        (x - box_width/2, y - box_height/2), 
-        box_width, box_height,
-        boxstyle="round,pad=0.1",
-        facecolor=colors[task_id],
-        edgecolor='#2C3E50',
-        linewidth=2
-    )
-    ax.add_patch(box)
-    boxes[task_id] = (x, y)
-    
-    # Add task text
-    ax.text(x, y, task_name, ha='center', va='center', 
-           fontsize=10, fontweight='bold', wrap=True)
-
-# Draw arrows between tasks
-arrow_props = dict(
-    arrowstyle='->', 
-    color='#2C3E50', 
-    lw=2,
-    connectionstyle="arc3,rad=0"
-)
-
-# Define connections (linear pipeline)
-connections = [
-    ('data_ingestion', 'data_cleaning'),
-    ('data_cleaning', 'feature_engineering'),
-    ('feature_engineering', 'model_training'),
-    ('model_training', 'model_evaluation'),
-    ('model_evaluation', 'reporting')
-]
-
-for source, target in connections:
-    source_x, source_y = boxes[source]
-    target_x, target_y = boxes[target]
-    
-    # Draw arrow from bottom of source to top of target
-    ax.annotate('', 
-                xy=(target_x, target_y + box_height/2), 
-                xytext=(source_x, source_y - box_height/2),
-                arrowprops=arrow_props)
-
-# Add timing annotations
-timings = [
-    ('data_ingestion', '2-5 min'),
-    ('data_cleaning', '1-2 min'),
-    ('feature_engineering', '2-3 min'),
-    ('model_training', '5-10 min'),
-    ('model_evaluation', '3-5 min'),
-    ('reporting', '2-3 min')
-]
-
-for task_id, timing in timings:
-    x, y = boxes[task_id]
-    ax.text(x + box_width/2 + 0.3, y, timing, ha='left', va='center',
-           fontsize=9, style='italic', color='#7F8C8D')
-
-# Add title and labels
-ax.set_title('AAPL Stock Prediction Pipeline - Task Dependencies (DAG)', 
-             fontsize=16, fontweight='bold', pad=20)
-
-# Add legend for task types
-legend_elements = [
-    mpatches.Patch(color=colors['data_ingestion'], label='Data Ingestion'),
-    mpatches.Patch(color=colors['data_cleaning'], label='Data Processing'),
-    mpatches.Patch(color=colors['feature_engineering'], label='Feature Engineering'),
-    mpatches.Patch(color=colors['model_training'], label='Model Training'),
-    mpatches.Patch(color=colors['model_evaluation'], label='Model Evaluation'),
-    mpatches.Patch(color=colors['reporting'], label='Reporting')
-]
-
-ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(1.15, 1))
-
-# Add pipeline characteristics
-ax.text(0.5, 0.5, 
-        'Pipeline Characteristics:\n' +
-        '• Linear dependency chain\n' +
-        '• Total runtime: ~15-28 minutes\n' +
-        '• 6 sequential tasks\n' +
-        '• No current parallelization\n' +
-        '• Checkpoint recovery enabled',
-        ha='left', va='center', fontsize=10,
-        bbox=dict(boxstyle="round,pad=0.5", facecolor='#F8F9FA', edgecolor='#BDC3C7'))
-
-# Set axis properties
-ax.set_xlim(0, 6)
-ax.set_ylim(0.5, 6.5)
-ax.set_aspect('equal')
-ax.axis('off')
-
-# Save the diagram
-plt.tight_layout()
-plt.savefig('aapl_pipeline_dag.png', dpi=300, bbox_inches='tight')
-plt.savefig('aapl_pipeline_dag.pdf', bbox_inches='tight')
-
-print("DAG diagram saved as:")
-print("- aapl_pipeline_dag.png")
-print("- aapl_pipeline_dag.pdf")
-
-plt.show()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
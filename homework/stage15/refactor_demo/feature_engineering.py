@@ -9,9 +9,12 @@ into a production-ready CLI function with logging, validation, and error handlin
 Usage:
     python feature_engineering.py --input data/cleaned.csv --output data/features.csv
     python feature_engineering.py --input data/cleaned.csv --output data/features.csv --config config.json
+    python feature_engineering.py --input data/cleaned.csv --output data/features.csv --cache-dir .task_cache
+    python feature_engineering.py --input-glob 'data/cleaned/*.csv' --output-dir data/features --workers 4
 """
 
 import argparse
+import glob
 import json
 import logging
 import sys
@@ -19,159 +22,211 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import time
-import random
-from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
 
+import profiling
+import retry
+import task_cache
+from profiling import NullProfiler, StageProfiler
+from retry import retry_with_backoff
+from task_cache import DEFAULT_CACHE_MAX_BYTES, TaskCache, code_version
 
-def retry_with_backoff(n_tries: int = 3, base_delay: float = 1.0, 
-                      exponential: bool = True, jitter: bool = True,
-                      exceptions: tuple = (Exception,)):
+# Shared project modules (indicator kernels) live in project/src; appended so
+# they never shadow modules of this directory
+PROJECT_SRC = Path(__file__).resolve().parents[3] / 'project' / 'src'
+if str(PROJECT_SRC) not in sys.path:
+    sys.path.append(str(PROJECT_SRC))
+
+import indicators
+
+# Every module a cached task imports: editing any of them invalidates the cache
+TASK_SOURCES = [__file__, indicators.__file__, profiling.__file__, retry.__file__, task_cache.__file__]
+
+
+def find_high_correlations(df: pd.DataFrame, columns: List[str], threshold: float = 0.8,
+                           sample_size: Optional[int] = None,
+                           random_state: int = 42) -> Tuple[List[Tuple[str, str, float]], pd.DataFrame]:
     """
-    Enhanced retry decorator with exponential backoff and jitter.
+    Vectorized detection of highly correlated feature pairs.
+    
+    Computes pairwise-complete Pearson correlations (same NaN handling as
+    ``df.corr()``) with a handful of matrix products, then selects pairs from
+    the upper triangle with a NumPy mask instead of scanning them in Python.
     
     Args:
-        n_tries: Maximum number of attempts
-        base_delay: Base delay in seconds
-        exponential: Use exponential backoff (2^attempt * base_delay)
-        jitter: Add random jitter to prevent thundering herd
-        exceptions: Tuple of exceptions to catch and retry
-    """
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exception = None
-            
-            for attempt in range(n_tries):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt < n_tries - 1:  # Don't delay on last attempt
-                        if exponential:
-                            delay = base_delay * (2 ** attempt)
-                        else:
-                            delay = base_delay
-                        
-                        if jitter:
-                            delay += random.uniform(0, delay * 0.1)  # 0-10% jitter
-                        
-                        logging.warning(
-                            f'[retry] Attempt {attempt + 1}/{n_tries} failed: {str(e)}. '
-                            f'Retrying in {delay:.2f}s...'
-                        )
-                        time.sleep(delay)
-                    else:
-                        logging.error(
-                            f'[retry] All {n_tries} attempts failed. Last error: {str(e)}'
-                        )
-            
-            raise last_exception
+        df: DataFrame holding the features
+        columns: Feature columns to compare
+        threshold: Absolute correlation above which a pair is reported
+        sample_size: If set and the frame is longer, estimate correlations
+            from this many uniformly sampled rows (approximate mode)
+        random_state: Seed for the row sample
         
-        return wrapper
-    return decorator
+    Returns:
+        tuple: (list of (feature_a, feature_b, corr) pairs, correlation matrix)
+    """
+    X = df[columns].to_numpy(dtype=np.float64)
+    if sample_size is not None and len(X) > sample_size:
+        rng = np.random.default_rng(random_state)
+        X = X[np.sort(rng.choice(len(X), size=sample_size, replace=False))]
+    
+    valid = ~np.isnan(X)
+    M = valid.astype(np.float64)
+    # Center on column means first so the sums below stay well conditioned
+    X = np.where(valid, X - np.nanmean(np.where(valid, X, np.nan), axis=0), 0.0)
+    
+    # For every pair (i, j), sums over the rows where both columns are present
+    n = M.T @ M
+    sx = X.T @ M                 # sum of x_i
+    sxx = (X * X).T @ M          # sum of x_i^2
+    sxy = X.T @ X                # sum of x_i * x_j
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx ** 2 / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+    # a constant column has no correlation, not even with itself (as df.corr());
+    # checked exactly, since centering can leave rounding noise in its variance
+    constant = ~(np.max(X, axis=0, initial=-np.inf, where=valid)
+                 > np.min(X, axis=0, initial=np.inf, where=valid))
+    corr[n < 2] = np.nan
+    corr[constant, :] = np.nan
+    corr[:, constant] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where((np.diag(n) >= 2) & ~constant, 1.0, np.nan))
+    
+    upper = np.triu(np.ones_like(corr, dtype=bool), k=1)
+    ii, jj = np.nonzero(upper & (np.abs(np.nan_to_num(corr)) > threshold))
+    pairs = [(columns[i], columns[j], float(corr[i, j])) for i, j in zip(ii, jj)]
+    
+    return pairs, pd.DataFrame(corr, index=columns, columns=columns)
 
 
-@retry_with_backoff(n_tries=2, base_delay=1.0, exceptions=(FileNotFoundError, PermissionError))
-def feature_engineering_task(input_path: str, output_path: str, config_path: Optional[str] = None) -> Dict[str, Any]:
+DEFAULT_FEATURE_CONFIG = {
+    'moving_average_window': 5,
+    'volatility_window': 20,
+    'price_range_enabled': True,
+    'lagged_features_enabled': True,
+    'validation_enabled': True,
+    'target_variable': 'close_next',
+    'correlation_threshold': 0.8,
+    'correlation_sample_size': None,
+    'store_correlation_matrix': True,
+    'technical_indicators': {}
+}
+
+
+def load_feature_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """
-    AAPL Feature Engineering Task: Create technical indicators and derived features.
+    Merge a feature configuration JSON over the defaults.
     
     Args:
-        input_path: Path to cleaned AAPL data CSV
-        output_path: Path to save features CSV
         config_path: Optional path to feature configuration JSON
         
     Returns:
-        dict: Task execution summary with metrics
+        dict: Complete configuration
     """
-    start_time = datetime.utcnow()
-    logging.info('[feature_engineering] Starting feature engineering task')
-    logging.info(f'[feature_engineering] Input: {input_path}')
-    logging.info(f'[feature_engineering] Output: {output_path}')
+    if config_path and Path(config_path).exists():
+        with open(config_path, 'r') as f:
+            config = {**DEFAULT_FEATURE_CONFIG, **json.load(f)}
+        logging.info(f'[feature_engineering] Loaded config from {config_path}')
+        return config
+    logging.info('[feature_engineering] Using default configuration')
+    return dict(DEFAULT_FEATURE_CONFIG)
+
+
+def build_features(df: pd.DataFrame, config: Dict[str, Any], profiler=None) -> Dict[str, Any]:
+    """
+    Pure feature-engineering step: cleaned prices in, model-ready frame out.
     
-    try:
-        # Load configuration
-        default_config = {
-            'moving_average_window': 5,
-            'volatility_window': 20,
-            'price_range_enabled': True,
-            'lagged_features_enabled': True,
-            'validation_enabled': True,
-            'target_variable': 'close_next'
-        }
-        
-        if config_path and Path(config_path).exists():
-            with open(config_path, 'r') as f:
-                config = {**default_config, **json.load(f)}
-                logging.info(f'[feature_engineering] Loaded config from {config_path}')
-        else:
-            config = default_config
-            logging.info('[feature_engineering] Using default configuration')
-        
-        # Validate input file
-        input_file = Path(input_path)
-        if not input_file.exists():
-            raise FileNotFoundError(f"Input file not found: {input_path}")
-        
-        # Load data
-        logging.info('[feature_engineering] Loading cleaned data')
-        df = pd.read_csv(input_path, index_col='date', parse_dates=['date'])
-        initial_rows = len(df)
-        logging.info(f'[feature_engineering] Loaded {initial_rows} rows')
+    No file I/O, so a pipeline can hand DataFrames from stage to stage in
+    memory and persist only at checkpoints. The input frame is not modified:
+    features are added to a shallow copy.
+    
+    Args:
+        df: Cleaned OHLCV data indexed by date
+        config: Complete configuration (see load_feature_config)
+        profiler: Optional StageProfiler for per-stage timings
         
-        # Validate required columns
+    Returns:
+        dict: ``data`` (rows with all features and the target present),
+        ``features``, ``target_columns``, ``dropped_rows``, ``correlations``
+        and ``high_correlation_pairs``
+    """
+    profiler = profiler if profiler is not None else NullProfiler()
+    df = df.copy(deep=False)
+    
+    # Validate required columns
+    with profiler.stage('validate_input'):
         required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
         missing_columns = [col for col in required_columns if col not in df.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
-        
-        # Feature Engineering
-        logging.info('[feature_engineering] Creating features')
-        
-        # 1. Price Range Feature
-        if config['price_range_enabled']:
+
+    # Feature Engineering
+    logging.info('[feature_engineering] Creating features')
+
+    # 1. Price Range Feature
+    if config['price_range_enabled']:
+        with profiler.stage('feature:price_range'):
             df['price_range'] = df['High'] - df['Low']
-            logging.info('[feature_engineering] Created price_range feature')
-        
-        # 2. Moving Average (previous days only, avoid leakage)
-        ma_window = config['moving_average_window']
+        logging.info('[feature_engineering] Created price_range feature')
+
+    # 2. Moving Average (previous days only, avoid leakage)
+    ma_window = config['moving_average_window']
+    with profiler.stage('feature:close_ma_prev'):
         df['close_ma_prev'] = df['Close'].shift(1).rolling(
             window=ma_window, min_periods=ma_window
         ).mean()
-        logging.info(f'[feature_engineering] Created {ma_window}-day moving average')
-        
-        # 3. Returns and Lagged Features
-        if config['lagged_features_enabled']:
+    logging.info(f'[feature_engineering] Created {ma_window}-day moving average')
+
+    # 3. Returns and Lagged Features
+    if config['lagged_features_enabled']:
+        with profiler.stage('feature:returns'):
             df['daily_return'] = df['Close'].pct_change()
             df['return_lag_1'] = df['daily_return'].shift(1)
-            logging.info('[feature_engineering] Created return-based features')
-        
-        # 4. Volatility Features
-        vol_window = config['volatility_window']
+        logging.info('[feature_engineering] Created return-based features')
+
+    # 4. Volatility Features
+    vol_window = config['volatility_window']
+    with profiler.stage('feature:rolling_volatility'):
         df['rolling_volatility'] = df['daily_return'].shift(1).rolling(
             window=vol_window, min_periods=vol_window
         ).std()
-        logging.info(f'[feature_engineering] Created {vol_window}-day rolling volatility')
-        
-        # 5. Target Variable (next day's close price)
-        target_var = config['target_variable']
+    logging.info(f'[feature_engineering] Created {vol_window}-day rolling volatility')
+
+    # 5. Technical Indicators (lagged one day, avoid leakage)
+    indicator_cols = []
+    for name, params in config['technical_indicators'].items():
+        with profiler.stage(f'feature:{name}'):
+            indicator_cols += indicators.add_technical_indicators(df, {name: params})
+    if indicator_cols:
+        logging.info(f'[feature_engineering] Created technical indicators: {indicator_cols}')
+
+    # 6. Target Variable (next day's close price)
+    target_var = config['target_variable']
+    with profiler.stage('feature:target'):
         if target_var == 'close_next':
             df['close_next'] = df['Close'].shift(-1)
         elif target_var == 'return_next':
             df['return_next'] = df['daily_return'].shift(-1)
         else:
             raise ValueError(f"Unknown target variable: {target_var}")
-        
-        logging.info(f'[feature_engineering] Created target variable ({target_var})')
-        
-        # Data Validation
-        if config['validation_enabled']:
-            logging.info('[feature_engineering] Performing data validation')
-            
-            # Check for data leakage in moving average
+
+    logging.info(f'[feature_engineering] Created target variable ({target_var})')
+
+    feature_cols = ['price_range', 'close_ma_prev', 'return_lag_1', 'rolling_volatility'] + indicator_cols
+    available_features = [col for col in feature_cols if col in df.columns]
+    correlations = {}
+    high_corr_pairs = []
+
+    # Data Validation
+    if config['validation_enabled']:
+        logging.info('[feature_engineering] Performing data validation')
+
+        # Check for data leakage in moving average
+        with profiler.stage('leakage_check'):
             if 'close_ma_prev' in df.columns:
                 first_valid_ma = df['close_ma_prev'].first_valid_index()
                 if first_valid_ma is not None:
@@ -179,82 +234,191 @@ def feature_engineering_task(input_path: str, output_path: str, config_path: Opt
                     actual_start_idx = df.index.get_loc(first_valid_ma)
                     if actual_start_idx < expected_start_idx:
                         logging.warning('[feature_engineering] Potential data leakage in moving average')
-            
-            # Check feature correlations
-            feature_cols = ['price_range', 'close_ma_prev', 'return_lag_1', 'rolling_volatility']
-            available_features = [col for col in feature_cols if col in df.columns]
-            
-            correlations = {}
-            if len(available_features) > 1:
-                corr_matrix = df[available_features].corr()
-                high_corr_pairs = []
-                
-                for i in range(len(corr_matrix.columns)):
-                    for j in range(i+1, len(corr_matrix.columns)):
-                        corr_val = corr_matrix.iloc[i, j]
-                        if abs(corr_val) > 0.8:
-                            high_corr_pairs.append(
-                                (corr_matrix.columns[i], corr_matrix.columns[j], corr_val)
-                            )
-                
-                if high_corr_pairs:
-                    logging.warning(f'[feature_engineering] High correlations detected: {high_corr_pairs}')
-                else:
-                    logging.info('[feature_engineering] Feature correlation validation passed')
-                
+
+        # Check feature correlations
+        if len(available_features) > 1:
+            with profiler.stage('correlation_check'):
+                high_corr_pairs, corr_matrix = find_high_correlations(
+                    df, available_features,
+                    threshold=config['correlation_threshold'],
+                    sample_size=config['correlation_sample_size']
+                )
+
+            if high_corr_pairs:
+                logging.warning(f'[feature_engineering] High correlations detected: {high_corr_pairs}')
+            else:
+                logging.info('[feature_engineering] Feature correlation validation passed')
+
+            if config['store_correlation_matrix']:
                 correlations = corr_matrix.to_dict()
+
+    # Clean data (remove rows with NaN in target or key features)
+    target_cols = [target_var] if target_var in df.columns else []
+    required_for_modeling = available_features + target_cols
+
+    with profiler.stage('dropna'):
+        df_clean = df.dropna(subset=required_for_modeling)
+    final_rows = len(df_clean)
+    dropped_rows = len(df) - final_rows
+
+    logging.info(f'[feature_engineering] Dropped {dropped_rows} rows with missing values')
+    logging.info(f'[feature_engineering] Final dataset: {final_rows} rows')
+
+    if final_rows == 0:
+        raise ValueError("No valid rows remaining after feature engineering")
+    
+    return {
+        'data': df_clean,
+        'features': available_features,
+        'target_columns': target_cols,
+        'dropped_rows': dropped_rows,
+        'correlations': correlations,
+        'high_correlation_pairs': high_corr_pairs
+    }
+
+
+def feature_info_record(result: Dict[str, Any], config: Dict[str, Any], initial_rows: int,
+                        execution_info: Dict[str, Any],
+                        profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Metadata JSON (feature_info.json) describing a build_features result.
+    
+    Args:
+        result: Output of build_features
+        config: Configuration used
+        initial_rows: Rows before feature engineering
+        execution_info: Creation time, input/output locations, config file
+        profile: Profiler report to embed
         
-        # Clean data (remove rows with NaN in target or key features)
-        target_cols = [target_var] if target_var in df.columns else []
-        required_for_modeling = available_features + target_cols
+    Returns:
+        dict: JSON-serialisable metadata
+    """
+    df_clean = result['data']
+    return {
+        'task': 'feature_engineering',
+        'created_features': result['features'] + result['target_columns'],
+        'config_used': config,
+        'data_summary': {
+            'initial_rows': initial_rows,
+            'final_rows': len(df_clean),
+            'dropped_rows': result['dropped_rows'],
+            'features_created': len(result['features']),
+            'date_range': {
+                'start': df_clean.index.min().isoformat(),
+                'end': df_clean.index.max().isoformat()
+            }
+        },
+        'validation_results': {
+            'feature_correlations': result['correlations'] if config['validation_enabled'] and config['store_correlation_matrix'] else None,
+            'high_correlation_warnings': len(result['high_correlation_pairs']),
+            'high_correlation_pairs': [list(pair) for pair in result['high_correlation_pairs']]
+        },
+        'execution_info': execution_info,
+        'profile': profile if profile is not None else {'enabled': False}
+    }
+
+
+@retry_with_backoff(n_tries=2, base_delay=1.0, exceptions=(FileNotFoundError, PermissionError))
+def feature_engineering_task(input_path: str, output_path: str, config_path: Optional[str] = None,
+                             cache_dir: Optional[str] = None, force: bool = False,
+                             cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                             feature_info_path: Optional[str] = None, profile: bool = False,
+                             profile_dump: Optional[str] = None) -> Dict[str, Any]:
+    """
+    AAPL Feature Engineering Task: Create technical indicators and derived features.
+    
+    Args:
+        input_path: Path to cleaned AAPL data CSV
+        output_path: Path to save features CSV
+        config_path: Optional path to feature configuration JSON
+        cache_dir: Optional task cache directory; when set, a run whose input
+            contents, merged config and code are unchanged restores the cached
+            outputs instead of recomputing them
+        force: Recompute even on a cache hit (the cache entry is refreshed)
+        cache_max_bytes: Size limit of the cache before LRU eviction
+        feature_info_path: Where to write the metadata JSON
+            (default: feature_info.json next to the output)
+        profile: Record wall time, CPU time and peak RSS per stage into
+            feature_info.json and the returned summary
+        profile_dump: Optional path for a cProfile/pstats dump of the run
+            (implies profile)
         
-        initial_with_features = len(df)
-        df_clean = df.dropna(subset=required_for_modeling)
-        final_rows = len(df_clean)
-        dropped_rows = initial_with_features - final_rows
+    Returns:
+        dict: Task execution summary with metrics
+    """
+    start_time = datetime.utcnow()
+    profiler = StageProfiler(profile_dump) if (profile or profile_dump) else NullProfiler()
+    logging.info('[feature_engineering] Starting feature engineering task')
+    logging.info(f'[feature_engineering] Input: {input_path}')
+    logging.info(f'[feature_engineering] Output: {output_path}')
+    
+    try:
+        config = load_feature_config(config_path)
         
-        logging.info(f'[feature_engineering] Dropped {dropped_rows} rows with missing values')
-        logging.info(f'[feature_engineering] Final dataset: {final_rows} rows')
+        # Validate input file
+        input_file = Path(input_path)
+        if not input_file.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        # Check task cache
+        feature_info_path = Path(feature_info_path or Path(output_path).parent / 'feature_info.json')
+        cache = TaskCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key([input_path], config,
+                                       code_version(TASK_SOURCES))
+            cached = None if force else cache.get(cache_key)
+            if cached is not None:
+                profiler.finish()
+                cache.restore(cached, {
+                    'features.csv': output_path,
+                    'feature_info.json': str(feature_info_path)
+                })
+                duration = (datetime.utcnow() - start_time).total_seconds()
+                logging.info(f'[feature_engineering] Cache hit ({cache_key[:12]}), '
+                             f'restored outputs in {duration:.2f} seconds')
+                return {
+                    **cached['metadata'],
+                    'status': 'success',
+                    'input_path': input_path,
+                    'output_path': output_path,
+                    'duration_seconds': duration,
+                    'feature_info_path': str(feature_info_path),
+                    'cache_hit': True,
+                    'cache_key': cache_key
+                }
+            if force:
+                logging.info('[feature_engineering] --force set, ignoring cached outputs')
+        
+        # Load data
+        logging.info('[feature_engineering] Loading cleaned data')
+        with profiler.stage('load'):
+            df = pd.read_csv(input_path, index_col='date', parse_dates=['date'])
+        initial_rows = len(df)
+        logging.info(f'[feature_engineering] Loaded {initial_rows} rows')
         
-        if final_rows == 0:
-            raise ValueError("No valid rows remaining after feature engineering")
+        result = build_features(df, config, profiler)
+        df_clean = result['data']
+        final_rows = len(df_clean)
         
         # Save results
         output_dir = Path(output_path).parent
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Save features CSV
-        df_clean.to_csv(output_path, index=True, index_label='date')
+        with profiler.stage('write'):
+            df_clean.to_csv(output_path, index=True, index_label='date')
         logging.info(f'[feature_engineering] Saved features to {output_path}')
+        profiler.finish()
         
         # Save feature metadata
-        feature_info = {
-            'task': 'feature_engineering',
-            'created_features': available_features + target_cols,
-            'config_used': config,
-            'data_summary': {
-                'initial_rows': initial_rows,
-                'final_rows': final_rows,
-                'dropped_rows': dropped_rows,
-                'features_created': len(available_features),
-                'date_range': {
-                    'start': df_clean.index.min().isoformat(),
-                    'end': df_clean.index.max().isoformat()
-                }
-            },
-            'validation_results': {
-                'feature_correlations': correlations if config['validation_enabled'] else None,
-                'high_correlation_warnings': len(high_corr_pairs) if config['validation_enabled'] else 0
-            },
-            'execution_info': {
-                'creation_time': start_time.isoformat(),
-                'input_file': str(input_path),
-                'output_file': str(output_path),
-                'config_file': str(config_path) if config_path else None
-            }
-        }
+        feature_info = feature_info_record(result, config, initial_rows, {
+            'creation_time': start_time.isoformat(),
+            'input_file': str(input_path),
+            'output_file': str(output_path),
+            'config_file': str(config_path) if config_path else None
+        }, profiler.report())
         
-        feature_info_path = output_dir / 'feature_info.json'
         with open(feature_info_path, 'w') as f:
             json.dump(feature_info, f, indent=2, default=str)
         
@@ -263,18 +427,31 @@ def feature_engineering_task(input_path: str, output_path: str, config_path: Opt
         
         logging.info(f'[feature_engineering] Task completed successfully in {duration:.2f} seconds')
         
+        summary = {
+            'features_created': len(result['features']) + len(result['target_columns']),
+            'rows_processed': final_rows,
+            'config_used': config
+        }
+        if cache is not None:
+            cache.put(cache_key, {
+                'features.csv': output_path,
+                'feature_info.json': str(feature_info_path)
+            }, metadata=summary)
+        
         return {
             'status': 'success',
             'input_path': input_path,
             'output_path': output_path,
-            'features_created': len(available_features) + len(target_cols),
-            'rows_processed': final_rows,
+            **summary,
             'duration_seconds': duration,
             'feature_info_path': str(feature_info_path),
-            'config_used': config
+            'cache_hit': False,
+            'cache_key': cache_key,
+            'profile': profiler.report()
         }
         
     except Exception as e:
+        profiler.finish()
         logging.error(f'[feature_engineering] Task failed: {str(e)}')
         return {
             'status': 'failed',
@@ -285,6 +462,131 @@ def feature_engineering_task(input_path: str, output_path: str, config_path: Opt
         }
 
 
+def _init_batch_worker(log_level: int) -> None:
+    """Configure logging in pool workers (spawned workers start unconfigured)."""
+    logging.basicConfig(level=log_level, format='%(asctime)s [%(levelname)s] [pid %(process)d] %(message)s')
+
+
+def _process_batch_file(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the task for one file of a batch, retrying failed attempts.
+    
+    Failures are returned as a result record rather than raised, so a single
+    bad file never aborts the rest of the batch.
+    """
+    def attempt():
+        result = feature_engineering_task(
+            job['input_path'], job['output_path'], job['config_path'],
+            feature_info_path=job['feature_info_path'], **job['task_kwargs']
+        )
+        if result['status'] != 'success':
+            raise RuntimeError(result['error'])
+        return result
+    
+    start = time.perf_counter()
+    try:
+        result = retry_with_backoff(n_tries=job['retries'], base_delay=job['retry_delay'])(attempt)()
+    except Exception as e:
+        result = {
+            'status': 'failed',
+            'error': str(e),
+            'input_path': job['input_path'],
+            'output_path': job['output_path']
+        }
+    result['wall_seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(input_paths: List[str], output_dir: str, config_path: Optional[str] = None,
+              workers: Optional[int] = None, retries: int = 2, retry_delay: float = 1.0,
+              summary_path: Optional[str] = None, profile_dump_dir: Optional[str] = None,
+              **task_kwargs) -> Dict[str, Any]:
+    """
+    Run feature engineering over many files on a process pool.
+    
+    Each input ``<name>.csv`` produces ``<name>_features.csv`` and
+    ``<name>_feature_info.json`` in ``output_dir``. Every file is retried with
+    ``retry_with_backoff``; files that still fail are recorded in the summary.
+    
+    Args:
+        input_paths: Cleaned input CSVs
+        output_dir: Directory for all outputs and the batch summary
+        config_path: Optional feature configuration JSON shared by all files
+        workers: Process pool size (default: number of CPUs)
+        retries: Attempts per file
+        retry_delay: Base backoff delay between attempts in seconds
+        summary_path: Where to write the summary JSON
+            (default: ``output_dir/batch_summary.json``)
+        profile_dump_dir: Optional directory for one cProfile dump per file
+            (``<name>.prof``)
+        **task_kwargs: Extra arguments for ``feature_engineering_task``
+            (cache_dir, force, cache_max_bytes)
+        
+    Returns:
+        dict: Batch summary with per-file results
+    """
+    if retries < 1:
+        raise ValueError(f"retries must be >= 1 (attempts per file), got {retries}")
+    stems = [Path(p).stem for p in input_paths]
+    duplicates = sorted({s for s in stems if stems.count(s) > 1})
+    if duplicates:
+        raise ValueError(f"Input files share names, outputs would collide: {duplicates}")
+    
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if profile_dump_dir:
+        Path(profile_dump_dir).mkdir(parents=True, exist_ok=True)
+    jobs = [{
+        'input_path': str(path),
+        'output_path': str(out_dir / f'{stem}_features.csv'),
+        'feature_info_path': str(out_dir / f'{stem}_feature_info.json'),
+        'config_path': config_path,
+        'retries': retries,
+        'retry_delay': retry_delay,
+        'task_kwargs': dict(task_kwargs, profile_dump=str(Path(profile_dump_dir) / f'{stem}.prof'))
+                       if profile_dump_dir else task_kwargs
+    } for path, stem in zip(input_paths, stems)]
+    
+    start_time = datetime.utcnow()
+    logging.info(f'[feature_engineering] Batch of {len(jobs)} files on {workers or "all"} workers')
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(logging.getLogger().getEffectiveLevel(),)) as pool:
+        results = list(pool.map(_process_batch_file, jobs))
+    duration = (datetime.utcnow() - start_time).total_seconds()
+    
+    failed = [r for r in results if r['status'] != 'success']
+    summary = {
+        'task': 'feature_engineering_batch',
+        'creation_time': start_time.isoformat(),
+        'duration_seconds': duration,
+        'workers': workers,
+        'files_total': len(results),
+        'files_succeeded': len(results) - len(failed),
+        'files_failed': len(failed),
+        'rows_processed': sum(r.get('rows_processed', 0) for r in results),
+        'failures': [{'input_path': r['input_path'], 'error': r['error']} for r in failed],
+        'results': [{
+            'input_path': r['input_path'],
+            'output_path': r['output_path'],
+            'status': r['status'],
+            'rows_processed': r.get('rows_processed'),
+            'duration_seconds': r.get('duration_seconds'),
+            'wall_seconds': r['wall_seconds'],
+            'cache_hit': r.get('cache_hit', False),
+            'error': r.get('error')
+        } for r in results]
+    }
+    
+    summary_file = Path(summary_path) if summary_path else out_dir / 'batch_summary.json'
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2, default=str)
+    summary['summary_path'] = str(summary_file)
+    
+    logging.info(f'[feature_engineering] Batch finished in {duration:.2f}s: '
+                 f'{summary["files_succeeded"]} succeeded, {summary["files_failed"]} failed')
+    return summary
+
+
 def main(argv=None):
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -294,6 +596,9 @@ def main(argv=None):
 Examples:
   %(prog)s --input data/cleaned.csv --output data/features.csv
   %(prog)s --input data/cleaned.csv --output data/features.csv --config config.json --log-level DEBUG
+  %(prog)s --input data/cleaned.csv --output data/features.csv --cache-dir .task_cache --force
+  %(prog)s --input-glob 'data/cleaned/*.csv' --output-dir data/features --workers 4
+  %(prog)s --input data/cleaned.csv --output data/features.csv --profile --profile-dump fe.prof
   
 Configuration File Example (JSON):
   {
@@ -302,17 +607,42 @@ Configuration File Example (JSON):
     "price_range_enabled": true,
     "lagged_features_enabled": true,
     "validation_enabled": true,
-    "target_variable": "close_next"
+    "target_variable": "close_next",
+    "correlation_threshold": 0.8,
+    "correlation_sample_size": null,
+    "store_correlation_matrix": true,
+    "technical_indicators": {"ema": {"span": 12}, "rsi": {"window": 14},
+                             "bollinger": {"window": 20, "num_std": 2},
+                             "atr": {"window": 14}, "zscore": {"window": 20}}
   }
         """
     )
     
-    parser.add_argument('--input', required=True, 
+    parser.add_argument('--input', 
                        help='Path to cleaned AAPL data CSV')
-    parser.add_argument('--output', required=True, 
+    parser.add_argument('--output', 
                        help='Path to save features CSV')
+    parser.add_argument('--input-glob',
+                       help='Batch mode: glob of cleaned CSVs (quote it to avoid shell expansion)')
+    parser.add_argument('--output-dir',
+                       help='Batch mode: directory for features, metadata and batch_summary.json')
+    parser.add_argument('--workers', type=int,
+                       help='Batch mode: number of worker processes (default: CPU count)')
+    parser.add_argument('--retries', type=int, default=2,
+                       help='Batch mode: attempts per file before it is marked failed (default: 2)')
     parser.add_argument('--config', 
                        help='Optional path to feature configuration JSON')
+    parser.add_argument('--cache-dir',
+                       help='Enable the task cache in this directory (skips unchanged runs)')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 2,
+                       help='Evict least recently used cache entries beyond this size (default: 512)')
+    parser.add_argument('--force', action='store_true',
+                       help='Recompute even if a cached result exists')
+    parser.add_argument('--profile', action='store_true',
+                       help='Record per-stage wall/CPU time and peak RSS in feature_info.json')
+    parser.add_argument('--profile-dump',
+                       help='Also write cProfile stats to this file (inspect with pstats/snakeviz); '
+                            'in batch mode a directory that receives one <name>.prof per input')
     parser.add_argument('--log-level', default='INFO', 
                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        help='Logging level (default: INFO)')
@@ -321,6 +651,14 @@ Configuration File Example (JSON):
     
     args = parser.parse_args(argv)
     
+    batch_mode = bool(args.input_glob or args.output_dir)
+    if batch_mode and (args.input or args.output):
+        parser.error('use either --input/--output or --input-glob/--output-dir, not both')
+    if batch_mode and not (args.input_glob and args.output_dir):
+        parser.error('batch mode needs both --input-glob and --output-dir')
+    if not batch_mode and not (args.input and args.output):
+        parser.error('--input and --output are required')
+    
     # Setup logging
     log_format = '%(asctime)s [%(levelname)s] %(message)s'
     log_level = getattr(logging, args.log_level)
@@ -332,17 +670,49 @@ Configuration File Example (JSON):
                           handlers=[logging.StreamHandler(sys.stdout)])
     
     # Validate input arguments
-    if not Path(args.input).exists():
-        print(f"❌ Error: Input file does not exist: {args.input}", file=sys.stderr)
-        sys.exit(1)
-    
     if args.config and not Path(args.config).exists():
         print(f"❌ Error: Config file does not exist: {args.config}", file=sys.stderr)
         sys.exit(1)
     
+    task_kwargs = {
+        'cache_dir': args.cache_dir,
+        'force': args.force,
+        'cache_max_bytes': int(args.cache_max_mb * 1024 ** 2),
+        'profile': args.profile
+    }
+    
+    if batch_mode:
+        input_paths = sorted(glob.glob(args.input_glob))
+        if not input_paths:
+            print(f"❌ Error: No files match: {args.input_glob}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            summary = run_batch(input_paths, args.output_dir, args.config,
+                                workers=args.workers, retries=args.retries,
+                                profile_dump_dir=args.profile_dump, **task_kwargs)
+        except Exception as e:
+            logging.error(f"Unexpected error: {str(e)}")
+            print(f"❌ Batch feature engineering failed: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        
+        if not args.quiet:
+            print(f"\n{'✅' if not summary['files_failed'] else '⚠️'} Batch feature engineering finished")
+            print(f"   Files: {summary['files_succeeded']}/{summary['files_total']} succeeded")
+            print(f"   Rows processed: {summary['rows_processed']}")
+            print(f"   Duration: {summary['duration_seconds']:.2f}s")
+            print(f"   Summary: {summary['summary_path']}")
+        for failure in summary['failures']:
+            print(f"❌ {failure['input_path']}: {failure['error']}", file=sys.stderr)
+        sys.exit(1 if summary['files_failed'] else 0)
+    
+    if not Path(args.input).exists():
+        print(f"❌ Error: Input file does not exist: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    
     # Execute task
     try:
-        result = feature_engineering_task(args.input, args.output, args.config)
+        result = feature_engineering_task(args.input, args.output, args.config,
+                                          profile_dump=args.profile_dump, **task_kwargs)
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
         print(f"❌ Feature engineering failed with unexpected error: {str(e)}", file=sys.stderr)
@@ -352,11 +722,17 @@ Configuration File Example (JSON):
     if result['status'] == 'success':
         if not args.quiet:
             print(f"\n✅ Feature engineering completed successfully!")
+            if result.get('cache_hit'):
+                print(f"   Cache: hit ({result['cache_key'][:12]}), outputs restored")
             print(f"   Features created: {result['features_created']}")
             print(f"   Rows processed: {result['rows_processed']}")
             print(f"   Duration: {result['duration_seconds']:.2f}s")
             print(f"   Output: {result['output_path']}")
             print(f"   Metadata: {result['feature_info_path']}")
+            if result.get('profile', {}).get('enabled'):
+                slowest = sorted(result['profile']['stages'], key=lambda r: -r['wall_seconds'])[:3]
+                print("   Slowest stages: " + ", ".join(
+                    f"{r['stage']} {r['wall_seconds']:.3f}s" for r in slowest))
         sys.exit(0)
     else:
         print(f"❌ Feature engineering failed: {result['error']}", file=sys.stderr)
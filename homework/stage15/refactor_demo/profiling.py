@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Task Profiling
+Stage 15: Orchestration & System Design
+
+Records wall time, CPU time and memory for each named stage of a pipeline
+task, so regressions can be traced to the stage that caused them as data
+grows. Optionally wraps the whole task in cProfile and dumps pstats output.
+
+Usage:
+    profiler = StageProfiler(cprofile_path='task.prof') if profile else NullProfiler()
+    with profiler.stage('load'):
+        df = pd.read_csv(path)
+    ...
+    feature_info['profile'] = profiler.report()
+"""
+
+import cProfile
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Process high-water mark of resident memory in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Current resident memory in MB."""
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 ** 2
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class StageProfiler:
+    """
+    Collects per-stage timing and memory measurements.
+
+    For each stage the report holds wall and CPU seconds, resident memory at
+    the start and end of the stage, and the process peak RSS afterwards.
+    ``peak_rss_growth_mb`` is non-zero only for stages that set a new
+    high-water mark, which points at the stage that drives peak memory.
+    """
+
+    def __init__(self, cprofile_path: Optional[str] = None):
+        self.stages: List[Dict[str, Any]] = []
+        self.cprofile_path = cprofile_path
+        self._cprofile = cProfile.Profile() if cprofile_path else None
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the enclosed block as one stage."""
+        rss_start = _current_rss_mb()
+        peak_start = _peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'stage': name,
+                'wall_seconds': round(time.perf_counter() - wall_start, 6),
+                'cpu_seconds': round(time.process_time() - cpu_start, 6),
+                'rss_start_mb': rss_start,
+                'rss_end_mb': _current_rss_mb(),
+                'peak_rss_mb': _peak_rss_mb(),
+            }
+            if peak_start is not None:
+                record['peak_rss_growth_mb'] = record['peak_rss_mb'] - peak_start
+            self.stages.append(record)
+            logging.debug(f'[profile] {name}: {record["wall_seconds"]:.4f}s wall, '
+                          f'{record["cpu_seconds"]:.4f}s cpu, peak RSS {record["peak_rss_mb"]} MB')
+
+    def finish(self) -> None:
+        """Stop cProfile (if enabled) and write the pstats dump."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            logging.info(f'[profile] cProfile stats written to {self.cprofile_path}')
+            self._cprofile = None
+
+    def report(self) -> Dict[str, Any]:
+        """Stage records plus totals, ready to embed in task metadata."""
+        return {
+            'enabled': True,
+            'total_wall_seconds': round(time.perf_counter() - self._started, 6),
+            'peak_rss_mb': _peak_rss_mb(),
+            'stages': self.stages,
+            'cprofile_dump': self.cprofile_path,
+        }
+
+
+class NullProfiler:
+    """Drop-in replacement for StageProfiler that records nothing."""
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def finish(self) -> None:
+        pass
+
+    def report(self) -> Dict[str, Any]:
+        return {'enabled': False}
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Retry With Backoff
+Stage 15: Orchestration & System Design
+
+``retry_with_backoff`` decorates both plain and ``async def`` functions;
+coroutines back off with ``asyncio.sleep`` so the event loop keeps serving
+other calls. A ``RetryBudget`` shared by many concurrent callers caps the
+number of retries to a fraction of the calls made and opens a circuit after
+consecutive failures, so a failing provider gets a handful of probes instead
+of thousands of retries. Attempts, retries and total backoff time are
+counted in ``RetryStats``.
+
+Usage:
+    budget = RetryBudget(ratio=0.1, failure_threshold=5, cooldown=30)
+
+    @retry_with_backoff(n_tries=4, base_delay=0.5, budget=budget)
+    async def fetch(session, ticker):
+        ...
+
+    await asyncio.gather(*(fetch(session, t) for t in tickers))
+    print(budget.stats.as_dict())
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import threading
+import time
+from functools import wraps
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the function while the circuit is open."""
+
+
+class RetryStats:
+    """Thread-safe counters for retried calls."""
+
+    FIELDS = ('calls', 'attempts', 'retries', 'successes', 'failures',
+              'retries_denied', 'short_circuited')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+            self.backoff_seconds = 0.0
+
+    def add(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {name: getattr(self, name) for name in self.FIELDS}
+            result['backoff_seconds'] = round(self.backoff_seconds, 6)
+            return result
+
+
+class RetryBudget:
+    """
+    Retry allowance and circuit breaker shared across calls.
+
+    Retries are paid from a token bucket: every call deposits ``ratio``
+    tokens (up to ``capacity``), every retry withdraws one, so sustained
+    retries stay at about ``ratio`` per call however many calls run at once.
+    After ``failure_threshold`` consecutive failed attempts the circuit opens
+    and calls fail fast with CircuitOpenError for ``cooldown`` seconds; then
+    one probe call is let through, and its outcome closes or reopens it.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10,
+                 capacity: Optional[float] = None,
+                 failure_threshold: Optional[int] = None, cooldown: float = 30.0):
+        """
+        Args:
+            ratio: Retry tokens earned per call
+            min_retries: Tokens available before any call was made
+            capacity: Maximum tokens saved up (default: min_retries)
+            failure_threshold: Consecutive failed attempts that open the
+                circuit (None disables the breaker)
+            cooldown: Seconds the circuit stays open before a probe
+        """
+        self.ratio = ratio
+        self.capacity = float(capacity if capacity is not None else min_retries)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.stats = RetryStats()
+        self._lock = threading.Lock()
+        self._tokens = float(min_retries)
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'."""
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return 'open'
+            return 'half_open'
+
+    def allow_attempt(self) -> bool:
+        """Whether an attempt may go out now (claims the probe when half open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def deposit(self) -> None:
+        """Credit a new call."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry token; False when the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through after one ended without a verdict."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._probing or (self.failure_threshold is not None
+                                 and self._consecutive_failures >= self.failure_threshold):
+                if self._opened_at is None or self._probing:
+                    logging.warning(f'[retry] Circuit open after {self._consecutive_failures} '
+                                    f'consecutive failures; cooling down {self.cooldown:.0f}s')
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+def _backoff_delay(attempt: int, base_delay: float, exponential: bool, jitter: bool) -> float:
+    delay = base_delay * (2 ** attempt) if exponential else base_delay
+    if jitter:
+        delay += random.uniform(0, delay * 0.1)  # 0-10% jitter
+    return delay
+
+
+def retry_with_backoff(n_tries: int = 3, base_delay: float = 1.0,
+                       exponential: bool = True, jitter: bool = True,
+                       exceptions: tuple = (Exception,),
+                       budget: Optional[RetryBudget] = None,
+                       stats: Optional[RetryStats] = None):
+    """
+    Enhanced retry decorator with exponential backoff and jitter.
+
+    Works on regular functions (blocking ``time.sleep``) and on coroutine
+    functions (``asyncio.sleep``). The wrapper exposes its counters as
+    ``wrapper.stats``.
+
+    Args:
+        n_tries: Maximum number of attempts
+        base_delay: Base delay in seconds
+        exponential: Use exponential backoff (2^attempt * base_delay)
+        jitter: Add random jitter to prevent thundering herd
+        exceptions: Tuple of exceptions to catch and retry
+        budget: Shared RetryBudget limiting retries and tripping the circuit
+        stats: Counters to update (default: the budget's, else a new RetryStats)
+    Raises:
+        ValueError: If n_tries < 1 (the wrapped function would never be called)
+    """
+    if n_tries < 1:
+        raise ValueError(f"n_tries must be >= 1, got {n_tries}")
+
+    def decorator(func):
+        counters = stats if stats is not None else (budget.stats if budget is not None else RetryStats())
+
+        def before_attempt(attempt: int, last_exception: Optional[BaseException]) -> None:
+            if budget is not None and not budget.allow_attempt():
+                counters.add('short_circuited')
+                raise CircuitOpenError(
+                    f'Circuit open, not calling {func.__qualname__}') from last_exception
+            counters.add('attempts')
+            if attempt:
+                counters.add('retries')
+
+        def after_failure(attempt: int, e: BaseException) -> Optional[float]:
+            """Backoff delay before the next attempt, or None to give up."""
+            counters.add('failures')
+            if budget is not None:
+                budget.record_failure()
+            if attempt >= n_tries - 1:  # Don't delay on last attempt
+                logging.error(f'[retry] All {n_tries} attempts failed. Last error: {str(e)}')
+                return None
+            if budget is not None and not budget.withdraw():
+                counters.add('retries_denied')
+                logging.error(f'[retry] Retry budget exhausted, giving up after attempt '
+                              f'{attempt + 1}/{n_tries}: {str(e)}')
+                return None
+            delay = _backoff_delay(attempt, base_delay, exponential, jitter)
+            counters.add('backoff_seconds', delay)
+            logging.warning(
+                f'[retry] Attempt {attempt + 1}/{n_tries} failed: {str(e)}. '
+                f'Retrying in {delay:.2f}s...'
+            )
+            return delay
+
+        def on_call() -> None:
+            counters.add('calls')
+            if budget is not None:
+                budget.deposit()
+
+        def on_success() -> None:
+            counters.add('successes')
+            if budget is not None:
+                budget.record_success()
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                on_call()
+                last_exception = None
+                for attempt in range(n_tries):
+                    before_attempt(attempt, last_exception)
+                    try:
+                        result = await func(*args, **kwargs)
+                    except exceptions as e:
+                        last_exception = e
+                        delay = after_failure(attempt, e)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                    except BaseException:
+                        if budget is not None:
+                            budget.release_probe()
+                        raise
+                    else:
+                        on_success()
+                        return result
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                on_call()
+                last_exception = None
+                for attempt in range(n_tries):
+                    before_attempt(attempt, last_exception)
+                    try:
+                        result = func(*args, **kwargs)
+                    except exceptions as e:
+                        last_exception = e
+                        delay = after_failure(attempt, e)
+                        if delay is None:
+                            raise
+                        time.sleep(delay)
+                    except BaseException:
+                        if budget is not None:
+                            budget.release_probe()
+                        raise
+                    else:
+                        on_success()
+                        return result
+
+        wrapper.stats = counters
+        return wrapper
+    return decorator
@@ -0,0 +1,717 @@
+#!/usr/bin/env python3
+"""
+AAPL Pipeline Runner
+Stage 15: Orchestration & System Design
+
+Lightweight in-process DAG executor for the pipeline in orchestration_plan.md:
+
+    data_ingestion -> data_cleaning -> feature_engineering -> model_training
+        -> model_evaluation -> reporting
+    data_cleaning -> data_profile -> reporting
+
+Tasks whose dependencies are satisfied run concurrently on a thread pool.
+DataFrames are handed from task to task in memory; only checkpointed results
+(the raw download, the model, evaluation and report, plus whatever the
+``checkpoints`` config lists) are written to disk. A run is fingerprinted by
+the task's external inputs, parameters, code and the output its dependencies
+last produced (checkpoint digests, or a per-run id for tasks without a
+checkpoint), and the fingerprint plus checkpoint digests are kept in a JSON
+state file. A task whose fingerprint is unchanged and whose checkpoint is
+still intact is skipped; every task downstream of one that reruns reruns
+too. If a task has to run, skipped dependencies are read
+back from their checkpoints, and dependencies without one are recomputed.
+Per-task wall time, rows processed and cache hit/miss land in the same state
+file (see create_dag_diagram.py for the overlay).
+
+Usage:
+    python run_pipeline.py --config pipeline_config.json
+    python run_pipeline.py --config pipeline_config.json --start-task feature_engineering
+    python run_pipeline.py --provider fake --force data_cleaning --max-workers 2
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import (  # also puts project/src on sys.path
+    build_features, feature_info_record, load_feature_config
+)
+from task_cache import file_digest
+
+import acquisition
+import cleaning
+import data_profiler
+import evaluation
+import indicators
+
+STAGE13_UTILS = Path(__file__).resolve().parents[2] / 'stage13' / 'src' / 'utils.py'
+
+DEFAULT_PIPELINE_CONFIG = {
+    'ticker': 'AAPL',
+    'start': '2023-01-01',
+    'end': '2024-01-01',
+    'provider': 'yahoo',           # 'fake' generates deterministic offline data
+    'data_dir': 'data',
+    'model_dir': 'model',
+    'reports_dir': 'reports',
+    'download_cache_dir': 'data/cache',   # the fetcher keeps one subdirectory per provider
+    'feature_config': None,        # path to a feature_engineering config JSON
+    'drop_threshold': 0.5,
+    'test_fraction': 0.2,
+    'n_boot': 500,
+    'max_workers': 4,
+    'checkpoints': ['feature_engineering'],   # intermediate results to persist
+    'state_path': '.pipeline_state.json'
+}
+
+
+class Task:
+    """
+    One node of the pipeline DAG.
+
+    ``fn(task, upstream)`` does the work. ``upstream`` maps each dependency
+    name to the value that dependency produced, handed over in memory; fn
+    returns a dict with ``value`` (passed on to downstream tasks) and
+    optionally ``rows``. A checkpointed task also writes its ``outputs``
+    files, and ``load(task)`` reads them back when a downstream task needs
+    the value but this task was skipped as up to date. A task without a
+    checkpoint keeps its result in memory only.
+
+    The fingerprint covers the external ``inputs`` files (those no task
+    produces, e.g. a config file), ``params``, the source of ``fn`` plus any
+    ``sources`` files, and the output versions of the dependencies (see
+    Pipeline.output_version), so new upstream data invalidates everything
+    below it.
+    """
+
+    def __init__(self, name: str, fn: Callable[['Task', Dict[str, Any]], Optional[Dict[str, Any]]],
+                 deps: Iterable[str] = (), inputs: Iterable[str] = (),
+                 outputs: Iterable[str] = (), params: Optional[Dict[str, Any]] = None,
+                 sources: Iterable[str] = (), label: Optional[str] = None,
+                 checkpoint: bool = True, load: Optional[Callable[['Task'], Any]] = None):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.inputs = [str(p) for p in inputs]
+        self.outputs = [str(p) for p in outputs]
+        self.params = params or {}
+        self.sources = [str(p) for p in sources]
+        self.label = label or name
+        self.checkpoint = checkpoint and bool(self.outputs)
+        self.load = load
+
+    def fingerprint(self, upstream: Optional[Dict[str, str]] = None) -> str:
+        """Hash of external inputs, parameters, code and upstream output versions."""
+        payload = {
+            'inputs': {p: file_digest(p) if Path(p).exists() else None for p in self.inputs},
+            'params': self.params,
+            'code': hashlib.sha256(inspect.getsource(self.fn).encode()).hexdigest(),
+            'sources': {Path(p).name: file_digest(p) for p in self.sources},
+            'upstream': upstream or {},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Pipeline:
+    """
+    DAG of Tasks with concurrent execution, in-memory handoff between tasks
+    and fingerprint-based skipping.
+
+    State file layout::
+
+        {"tasks": {name: {"status", "cache", "checkpoint", "fingerprint",
+                          "output_digests", "run_id", "duration_seconds",
+                          "compute_seconds", "rows", "started", "finished",
+                          "error"}},
+         "last_run": {"started", "finished", "wall_seconds", "tasks"}}
+    """
+
+    def __init__(self, tasks: Iterable[Task], state_path: str = '.pipeline_state.json',
+                 max_workers: int = 4):
+        self.tasks: Dict[str, Task] = {}
+        for task in tasks:
+            if task.name in self.tasks:
+                raise ValueError(f"Duplicate task name: {task.name}")
+            self.tasks[task.name] = task
+        for task in self.tasks.values():
+            unknown = [d for d in task.deps if d not in self.tasks]
+            if unknown:
+                raise ValueError(f"Task {task.name} depends on unknown tasks: {unknown}")
+        self.order = self.topological_order()
+        self.state_path = Path(state_path)
+        self.max_workers = max_workers
+        self.state = self.load_state()
+        self.artifacts: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def topological_order(self) -> List[str]:
+        """Task names in dependency order (ties keep declaration order)."""
+        remaining = {name: set(task.deps) for name, task in self.tasks.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle among tasks: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def edges(self) -> List[tuple]:
+        """(upstream, downstream) pairs."""
+        return [(dep, name) for name in self.order for dep in self.tasks[name].deps]
+
+    def _closure(self, start: str, upstream: bool) -> set:
+        """start plus all of its ancestors (upstream) or descendants."""
+        found, frontier = {start}, [start]
+        while frontier:
+            current = frontier.pop()
+            if upstream:
+                nxt = self.tasks[current].deps
+            else:
+                nxt = [n for n, t in self.tasks.items() if current in t.deps]
+            for name in nxt:
+                if name not in found:
+                    found.add(name)
+                    frontier.append(name)
+        return found
+
+    def select(self, start_task: Optional[str] = None, end_task: Optional[str] = None) -> List[str]:
+        """Tasks downstream of start_task and upstream of end_task, in order."""
+        for name in (start_task, end_task):
+            if name is not None and name not in self.tasks:
+                raise ValueError(f"Unknown task: {name}")
+        selected = set(self.tasks)
+        if start_task is not None:
+            selected &= self._closure(start_task, upstream=False)
+        if end_task is not None:
+            selected &= self._closure(end_task, upstream=True)
+        return [name for name in self.order if name in selected]
+
+    def load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, 'r') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f'[pipeline] Ignoring unreadable state file {self.state_path}: {e}')
+        return {'tasks': {}}
+
+    def save_state(self) -> None:
+        """Atomically rewrite the state file (called under the lock)."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(f'.{self.state_path.name}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2, default=str)
+        os.replace(tmp, self.state_path)
+
+    def output_version(self, name: str) -> Any:
+        """
+        What a task last produced: its checkpoint digests, or the id of the
+        run that computed it when the result only lived in memory.
+        """
+        record = self.state['tasks'].get(name, {})
+        return record.get('output_digests') if record.get('checkpoint') else record.get('run_id')
+
+    def fingerprint(self, task: Task) -> str:
+        """Fingerprint of a task against the current upstream output versions."""
+        with self._lock:
+            upstream = {dep: self.output_version(dep) for dep in task.deps}
+        return task.fingerprint(upstream)
+
+    def fingerprints(self) -> Dict[str, str]:
+        """Fingerprint of every task as of the last run."""
+        return {name: self.fingerprint(self.tasks[name]) for name in self.order}
+
+    def outputs_intact(self, task: Task) -> bool:
+        """Checkpoint files exist and match the digests of the last run."""
+        digests = self.state['tasks'].get(task.name, {}).get('output_digests') or {}
+        return all(Path(p).exists() and digests.get(p) == file_digest(p) for p in task.outputs)
+
+    def is_up_to_date(self, task: Task, fingerprint: str) -> bool:
+        """Same fingerprint as the last successful run and checkpoints untouched."""
+        record = self.state['tasks'].get(task.name)
+        if not record or record.get('status') not in ('success', 'skipped'):
+            return False
+        if record.get('fingerprint') != fingerprint:
+            return False
+        if bool(record.get('checkpoint')) != task.checkpoint:
+            return False
+        return not task.checkpoint or self.outputs_intact(task)
+
+    def plan(self, selected: List[str], force: set, fingerprints: Dict[str, str]) -> List[str]:
+        """
+        Tasks that have to execute.
+
+        Stale or forced tasks run, and so does every selected task downstream
+        of one that runs (its input changes). A task that runs needs the
+        values of its dependencies: a skipped dependency with an intact
+        checkpoint is loaded from disk, any other one has to run as well
+        (even outside the selection). Both rules are applied until nothing
+        changes.
+        """
+        to_run = {name for name in selected
+                  if name in force or not self.is_up_to_date(self.tasks[name], fingerprints[name])}
+        while True:
+            before = len(to_run)
+            for name in self.order:
+                if name in selected and any(dep in to_run for dep in self.tasks[name].deps):
+                    to_run.add(name)
+            for name in reversed(self.order):
+                if name not in to_run:
+                    continue
+                for dep in self.tasks[name].deps:
+                    task = self.tasks[dep]
+                    loadable = task.checkpoint and task.load is not None and self.outputs_intact(task)
+                    if dep not in to_run and not loadable:
+                        if dep not in selected:
+                            logging.info(f'[pipeline] {dep}: rerunning, {name} needs its in-memory result')
+                        to_run.add(dep)
+            if len(to_run) == before:
+                return [name for name in self.order if name in to_run]
+
+    def _upstream(self, task: Task) -> Dict[str, Any]:
+        """Dependency values: from memory, else loaded from their checkpoints."""
+        values = {}
+        for dep in task.deps:
+            with self._lock:
+                loaded = dep in self.artifacts
+                value = self.artifacts.get(dep)
+            if not loaded:
+                # read outside the lock so other tasks are not held up by disk I/O;
+                # if two tasks load the same checkpoint, the first one published wins
+                logging.info(f'[pipeline] {task.name}: loading {dep} from checkpoint')
+                value = self.tasks[dep].load(self.tasks[dep])
+                with self._lock:
+                    value = self.artifacts.setdefault(dep, value)
+            values[dep] = value
+        return values
+
+    def _execute(self, task: Task, run: bool) -> Dict[str, Any]:
+        """Run (or skip) one task and return its state record."""
+        started = datetime.utcnow()
+        t0 = time.perf_counter()
+        previous = self.state['tasks'].get(task.name, {})
+        if not run:
+            logging.info(f'[pipeline] {task.name}: up to date, skipped')
+            return {
+                **previous,
+                'status': 'skipped',
+                'cache': 'hit',
+                'duration_seconds': time.perf_counter() - t0,
+                'started': started.isoformat(),
+                'finished': datetime.utcnow().isoformat(),
+                'error': None
+            }
+
+        missing = [p for p in task.inputs if not Path(p).exists()]
+        if missing:
+            raise FileNotFoundError(f"Missing inputs for {task.name}: {missing}")
+        logging.info(f'[pipeline] {task.name}: running')
+        # dependencies have finished, so this sees the outputs they just produced
+        fingerprint = self.fingerprint(task)
+        result = task.fn(task, self._upstream(task)) or {}
+        with self._lock:
+            self.artifacts[task.name] = result.get('value')
+        duration = time.perf_counter() - t0
+        if task.checkpoint:
+            missing = [p for p in task.outputs if not Path(p).exists()]
+            if missing:
+                raise RuntimeError(f"Task {task.name} did not produce: {missing}")
+        logging.info(f'[pipeline] {task.name}: done in {duration:.2f}s'
+                     + (f', {result["rows"]} rows' if result.get('rows') is not None else ''))
+        return {
+            'status': 'success',
+            'cache': 'miss',
+            'checkpoint': task.checkpoint,
+            'fingerprint': fingerprint,
+            'output_digests': {p: file_digest(p) for p in task.outputs} if task.checkpoint else {},
+            'run_id': uuid.uuid4().hex,
+            'duration_seconds': duration,
+            'compute_seconds': duration,
+            'rows': result.get('rows'),
+            'started': started.isoformat(),
+            'finished': datetime.utcnow().isoformat(),
+            'error': None
+        }
+
+    def run(self, start_task: Optional[str] = None, end_task: Optional[str] = None,
+            force: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Execute the selected part of the DAG.
+
+        A task starts as soon as all of its dependencies succeeded or were
+        skipped as up to date; tasks downstream of a failure are marked
+        ``blocked``. Results move between tasks in memory and are released
+        once their last consumer has finished.
+
+        Args:
+            start_task: Run this task and everything downstream of it
+            end_task: Stop after this task (and everything it needs)
+            force: Task names to rerun even if up to date ('all' for every task)
+
+        Returns:
+            dict: Run summary with one record per executed or skipped task
+        """
+        selected = self.select(start_task, end_task)
+        force = set(selected) if 'all' in set(force) else set(force)
+        fingerprints = self.fingerprints()
+        to_run = set(self.plan(selected, force, fingerprints))
+        scheduled = [name for name in self.order if name in to_run or name in selected]
+        pending = {name: {d for d in self.tasks[name].deps if d in scheduled} for name in scheduled}
+        consumers = {name: sum(1 for n in to_run if name in self.tasks[n].deps) for name in self.tasks}
+        records: Dict[str, Dict[str, Any]] = {}
+        self.artifacts = {}
+        run_started = datetime.utcnow()
+        t0 = time.perf_counter()
+        logging.info(f'[pipeline] {len(to_run)} of {len(scheduled)} tasks to run on '
+                     f'{self.max_workers} workers: {[n for n in scheduled if n in to_run]}')
+
+        def finish(name: str, record: Dict[str, Any]) -> None:
+            records[name] = record
+            with self._lock:
+                self.state['tasks'][name] = record
+                self.save_state()
+                if name in to_run:
+                    # drop upstream values nobody else is waiting for
+                    for dep in self.tasks[name].deps:
+                        consumers[dep] -= 1
+                        if consumers[dep] <= 0:
+                            self.artifacts.pop(dep, None)
+                    if consumers[name] <= 0:
+                        self.artifacts.pop(name, None)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    future = pool.submit(self._execute, self.tasks[name], name in to_run)
+                    running[future] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        finish(name, future.result())
+                    except Exception as e:
+                        logging.error(f'[pipeline] {name}: failed: {e}')
+                        finish(name, {'status': 'failed', 'cache': 'miss', 'error': str(e),
+                                      'duration_seconds': None, 'rows': None,
+                                      'finished': datetime.utcnow().isoformat()})
+                        blocked = self._closure(name, upstream=False) - {name}
+                        for other in [n for n in pending if n in blocked]:
+                            del pending[other]
+                            finish(other, {'status': 'blocked', 'cache': None,
+                                           'error': f'upstream task {name} failed',
+                                           'duration_seconds': None, 'rows': None})
+                        continue
+                    for deps in pending.values():
+                        deps.discard(name)
+        self.artifacts = {}
+
+        summary = {
+            'started': run_started.isoformat(),
+            'finished': datetime.utcnow().isoformat(),
+            'wall_seconds': time.perf_counter() - t0,
+            'tasks': {name: records[name]['status'] for name in scheduled if name in records}
+        }
+        with self._lock:
+            self.state['last_run'] = summary
+            self.save_state()
+        summary['records'] = {name: records[name] for name in scheduled if name in records}
+        summary['status'] = 'success' if all(r['status'] in ('success', 'skipped')
+                                             for r in records.values()) else 'failed'
+        return summary
+
+
+def _load_stage13_utils():
+    """Import homework/stage13/src/utils.py without clashing with project/src/utils.py."""
+    spec = importlib.util.spec_from_file_location('stage13_utils', STAGE13_UTILS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _read_price_csv(path: str) -> pd.DataFrame:
+    """Price CSV written by a pipeline task, indexed by date."""
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    df.index.name = 'date'
+    return df
+
+
+def build_aapl_pipeline(config: Dict[str, Any]) -> Pipeline:
+    """
+    Wire the project functions into the AAPL pipeline DAG.
+
+    DataFrames move between tasks in memory. The raw download, the model,
+    the evaluation and the report are always written; the cleaned data and
+    the features only when listed in ``config['checkpoints']``.
+
+    Args:
+        config: Pipeline configuration (see DEFAULT_PIPELINE_CONFIG)
+
+    Returns:
+        Pipeline: Ready-to-run pipeline
+    """
+    cfg = {**DEFAULT_PIPELINE_CONFIG, **config}
+    stem = cfg['ticker'].lower()
+    data_dir, reports_dir = Path(cfg['data_dir']), Path(cfg['reports_dir'])
+    checkpoints = set(cfg['checkpoints'] or [])
+    paths = {
+        'raw': data_dir / 'raw' / f'{stem}_raw.csv',
+        'cleaned': data_dir / 'processed' / f'{stem}_cleaned.csv',
+        'features': data_dir / 'processed' / f'{stem}_features.csv',
+        'feature_info': data_dir / 'processed' / f'{stem}_feature_info.json',
+        'profile': reports_dir / f'{stem}_data_profile.csv',
+        'model': Path(cfg['model_dir']) / f'{stem}_model.pkl',
+        'evaluation': reports_dir / f'{stem}_evaluation.json',
+        'report': reports_dir / f'{stem}_pipeline_report.md',
+    }
+    paths = {k: str(v) for k, v in paths.items()}
+    feature_config = load_feature_config(cfg['feature_config'])
+
+    def ensure_parent(path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def data_ingestion(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        provider = acquisition.FakeProvider() if cfg['provider'] == 'fake' else acquisition.YahooProvider()
+        ensure_parent(paths['raw'])
+        # cached bars live under <download_cache_dir>/<provider>/, so fake data
+        # is never served for a yahoo run of the same ticker
+        df = acquisition.fetch_stock_data(cfg['ticker'], cfg['start'], cfg['end'], paths['raw'],
+                                          cache_dir=cfg['download_cache_dir'], provider=provider)
+        if df.empty:
+            raise ValueError(f"No data downloaded for {cfg['ticker']}")
+        df.index.name = 'date'
+        return {'rows': len(df), 'value': df}
+
+    def data_cleaning(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        # the raw frame may be shared with other consumers, so clean a copy
+        df = upstream['data_ingestion'].copy()
+        df = cleaning.drop_missing(df, threshold=cfg['drop_threshold'], inplace=True)
+        numeric = df.select_dtypes(include=np.number).columns.tolist()
+        df = cleaning.fill_missing_median(df, numeric, inplace=True)
+        if task.checkpoint:
+            ensure_parent(paths['cleaned'])
+            df.to_csv(paths['cleaned'], index_label='date')
+        return {'rows': len(df), 'value': df}
+
+    def data_profile(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        table = data_profiler.profile_chunks([upstream['data_cleaning']]).to_table()
+        ensure_parent(paths['profile'])
+        table.to_csv(paths['profile'])
+        return {'rows': int(table.loc['count'].max()), 'value': table}
+
+    def feature_engineering(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        df = upstream['data_cleaning']
+        started = datetime.utcnow()
+        result = build_features(df, feature_config)
+        features = result['data']
+        if task.checkpoint:
+            ensure_parent(paths['features'])
+            features.to_csv(paths['features'], index=True, index_label='date')
+            info = feature_info_record(result, feature_config, len(df), {
+                'creation_time': started.isoformat(),
+                'input_file': None,
+                'output_file': paths['features'],
+                'config_file': cfg['feature_config']
+            })
+            with open(paths['feature_info'], 'w') as f:
+                json.dump(info, f, indent=2, default=str)
+        target = feature_config['target_variable']
+        columns = [c for c in result['features'] + result['target_columns'] if c != target]
+        return {'rows': len(features), 'value': {'data': features, 'features': columns, 'target': target}}
+
+    def load_features(task: Task) -> Dict[str, Any]:
+        with open(paths['feature_info'], 'r') as f:
+            info = json.load(f)
+        target = info['config_used']['target_variable']
+        columns = [c for c in info['created_features'] if c != target]
+        df = pd.read_csv(paths['features'], index_col='date', parse_dates=['date'])
+        return {'data': df, 'features': columns, 'target': target}
+
+    def model_training(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        stage13 = _load_stage13_utils()
+        frame = upstream['feature_engineering']
+        df, columns, target = frame['data'], frame['features'], frame['target']
+        split = int(len(df) * (1 - cfg['test_fraction']))
+        if split < 2 or split >= len(df):
+            raise ValueError(f"Cannot split {len(df)} rows with test_fraction={cfg['test_fraction']}")
+        train = df.iloc[:split]
+        model = stage13.train_model(train[columns].to_numpy(), train[target].to_numpy())
+        bundle = {'model': model, 'features': columns, 'target': target,
+                  'train_rows': split, 'split_date': df.index[split].isoformat()}
+        ensure_parent(paths['model'])
+        with open(paths['model'], 'wb') as f:
+            pickle.dump(bundle, f)
+        return {'rows': split, 'value': bundle}
+
+    def load_model(task: Task) -> Dict[str, Any]:
+        with open(paths['model'], 'rb') as f:
+            return pickle.load(f)
+
+    def model_evaluation(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        stage13 = _load_stage13_utils()
+        bundle = upstream['model_training']
+        df = upstream['feature_engineering']['data']
+        test = df.iloc[bundle['train_rows']:]
+        y_true = test[bundle['target']].to_numpy()
+        metrics = stage13.evaluate_model(bundle['model'], test[bundle['features']].to_numpy(), y_true)
+        y_pred = metrics.pop('predictions')
+        results = {
+            'ticker': cfg['ticker'],
+            'target': bundle['target'],
+            'features': bundle['features'],
+            'test_rows': len(test),
+            'test_start': test.index.min().isoformat(),
+            'test_end': test.index.max().isoformat(),
+            'metrics': {k: float(v) for k, v in metrics.items()},
+            'bootstrap': {
+                name: evaluation.bootstrap_metric(y_true, y_pred, fn, n_boot=cfg['n_boot'])
+                for name, fn in (('rmse', evaluation.rmse), ('mae', evaluation.mae))
+            }
+        }
+        ensure_parent(paths['evaluation'])
+        with open(paths['evaluation'], 'w') as f:
+            json.dump(results, f, indent=2)
+        return {'rows': len(test), 'value': results}
+
+    def load_evaluation(task: Task) -> Dict[str, Any]:
+        with open(paths['evaluation'], 'r') as f:
+            return json.load(f)
+
+    def reporting(task: Task, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        results = upstream['model_evaluation']
+        profile = upstream['data_profile']
+        metrics = results['metrics']
+        lines = [
+            f"# {results['ticker']} Pipeline Report",
+            '',
+            f"Generated {datetime.utcnow().isoformat(timespec='seconds')}Z for "
+            f"{cfg['start']} to {cfg['end']}.",
+            '',
+            '## Model Evaluation',
+            '',
+            f"Target `{results['target']}`, test window {results['test_start'][:10]} to "
+            f"{results['test_end'][:10]} ({results['test_rows']} rows).",
+            '',
+            '| Metric | Value | 95% bootstrap CI |',
+            '|--------|-------|------------------|',
+        ]
+        for name in ('rmse', 'mae', 'r2', 'mse'):
+            ci = results['bootstrap'].get(name)
+            ci_text = f"[{ci['lo']:.4f}, {ci['hi']:.4f}]" if ci else '-'
+            lines.append(f"| {name.upper()} | {metrics[name]:.4f} | {ci_text} |")
+        lines += ['', '## Cleaned Data Profile', '', '```', profile.round(4).to_string(), '```', '']
+        ensure_parent(paths['report'])
+        with open(paths['report'], 'w') as f:
+            f.write('\n'.join(lines))
+        return {'rows': results['test_rows']}
+
+    fetch_params = {k: cfg[k] for k in ('ticker', 'start', 'end', 'provider')}
+    tasks = [
+        Task('data_ingestion', data_ingestion, outputs=[paths['raw']], params=fetch_params,
+             sources=[acquisition.__file__], load=lambda task: _read_price_csv(paths['raw']),
+             label='Data Ingestion\n(fetch_stock_data)'),
+        Task('data_cleaning', data_cleaning, deps=['data_ingestion'], outputs=[paths['cleaned']],
+             params={'drop_threshold': cfg['drop_threshold']}, sources=[cleaning.__file__],
+             checkpoint='data_cleaning' in checkpoints,
+             load=lambda task: _read_price_csv(paths['cleaned']),
+             label='Data Cleaning\n(median fill, drop sparse)'),
+        Task('data_profile', data_profile, deps=['data_cleaning'], outputs=[paths['profile']],
+             sources=[data_profiler.__file__], load=lambda task: pd.read_csv(paths['profile'], index_col=0),
+             label='Data Profile\n(profile_chunks)'),
+        Task('feature_engineering', feature_engineering, deps=['data_cleaning'],
+             inputs=[cfg['feature_config']] if cfg['feature_config'] else [],
+             outputs=[paths['features'], paths['feature_info']], params={'config': feature_config},
+             sources=[inspect.getsourcefile(build_features), indicators.__file__],
+             checkpoint='feature_engineering' in checkpoints, load=load_features,
+             label='Feature Engineering\n(technical indicators)'),
+        Task('model_training', model_training, deps=['feature_engineering'], outputs=[paths['model']],
+             params={'test_fraction': cfg['test_fraction']}, sources=[str(STAGE13_UTILS)],
+             load=load_model, label='Model Training\n(linear regression)'),
+        Task('model_evaluation', model_evaluation, deps=['model_training', 'feature_engineering'],
+             outputs=[paths['evaluation']], params={'n_boot': cfg['n_boot']},
+             sources=[str(STAGE13_UTILS), evaluation.__file__], load=load_evaluation,
+             label='Model Evaluation\n(metrics, bootstrap CI)'),
+        Task('reporting', reporting, deps=['model_evaluation', 'data_profile'],
+             outputs=[paths['report']], label='Reporting\n(markdown summary)'),
+    ]
+    return Pipeline(tasks, state_path=cfg['state_path'], max_workers=cfg['max_workers'])
+
+
+def load_pipeline_config(config_path: Optional[str] = None, **overrides) -> Dict[str, Any]:
+    """Defaults, then the JSON config file, then non-None overrides."""
+    config = dict(DEFAULT_PIPELINE_CONFIG)
+    if config_path:
+        with open(config_path, 'r') as f:
+            config.update(json.load(f))
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    return config
+
+
+def main(argv=None):
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description='Run the AAPL pipeline DAG')
+    parser.add_argument('--config', help='Pipeline configuration JSON')
+    parser.add_argument('--start-task', help='Run this task and everything downstream of it')
+    parser.add_argument('--end-task', help='Stop after this task')
+    parser.add_argument('--force', nargs='*',
+                        help="Rerun these tasks even if up to date ('all' or no names: every task)")
+    parser.add_argument('--max-workers', type=int, help='Concurrent tasks (default: from config)')
+    parser.add_argument('--provider', choices=['yahoo', 'fake'], help='Market data provider')
+    parser.add_argument('--state', dest='state_path', help='State file with fingerprints and timings')
+    parser.add_argument('--list', action='store_true', help='Print the task order and exit')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    config = load_pipeline_config(args.config, max_workers=args.max_workers,
+                                  provider=args.provider, state_path=args.state_path)
+    pipeline = build_aapl_pipeline(config)
+    if args.list:
+        for name in pipeline.select(args.start_task, args.end_task):
+            print(f"{name:<22} <- {', '.join(pipeline.tasks[name].deps) or '-'}")
+        return
+
+    # a bare --force means every task
+    force = [] if args.force is None else (args.force or ['all'])
+    summary = pipeline.run(args.start_task, args.end_task, force=force)
+
+    print(f"\n{'✅' if summary['status'] == 'success' else '❌'} Pipeline {summary['status']} "
+          f"in {summary['wall_seconds']:.2f}s")
+    print(f"   {'task':<22}{'status':<10}{'cache':<7}{'seconds':>9}{'rows':>9}")
+    for name, record in summary['records'].items():
+        seconds = record.get('duration_seconds')
+        print(f"   {name:<22}{record['status']:<10}{record.get('cache') or '-':<7}"
+              f"{seconds if seconds is None else round(seconds, 3)!s:>9}{record.get('rows')!s:>9}")
+        if record.get('error'):
+            print(f"      {record['error']}", file=sys.stderr)
+    sys.exit(0 if summary['status'] == 'success' else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Task Cache
+Stage 15: Orchestration & System Design
+
+Pipeline tasks are meant to be idempotent: the same inputs, configuration and
+code must always produce the same outputs. This module turns that promise into
+a cache. Each task run is keyed by a SHA-256 hash of its input file contents,
+its merged configuration and the source code that produced it; when the key is
+already present the cached artifacts are restored instead of recomputed.
+
+Usage:
+    cache = TaskCache('.task_cache', max_bytes=500 * 1024 ** 2)
+    key = cache.make_key([input_path], config, code_version([__file__]))
+    entry = cache.get(key)
+    if entry is None:
+        ...  # run the task
+        cache.put(key, {'features.csv': output_path}, metadata=summary)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 ** 2  # 512 MB
+MANIFEST_NAME = 'manifest.json'
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        path: Path to the file
+        chunk_size: Bytes read per chunk (keeps memory flat for large files)
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def code_version(source_paths: Iterable[str]) -> str:
+    """
+    Fingerprint the source files that implement a task.
+
+    Any edit to the listed files changes the fingerprint, which invalidates
+    every cache entry produced by the old code.
+
+    Args:
+        source_paths: Python files whose contents define the task behaviour
+
+    Returns:
+        str: Hex digest over the concatenated file digests
+    """
+    h = hashlib.sha256()
+    for path in sorted(str(p) for p in source_paths):
+        h.update(Path(path).name.encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()
+
+
+class TaskCache:
+    """
+    Directory-backed cache of task artifacts keyed by content hash.
+
+    Layout::
+
+        <cache_dir>/<key>/manifest.json   # metadata + last access time
+        <cache_dir>/<key>/<artifact>      # cached output files
+
+    Entries are written to a temporary directory and renamed into place, so a
+    crashed run never leaves a half-written entry behind. When the total size
+    exceeds ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, input_paths: Iterable[str], config: Dict[str, Any],
+                 code_fingerprint: str) -> str:
+        """
+        Build the cache key for one task invocation.
+
+        Args:
+            input_paths: Files the task reads (hashed by content, not path)
+            config: Fully merged task configuration
+            code_fingerprint: Result of ``code_version`` for the task sources
+
+        Returns:
+            str: Hex digest identifying this exact combination
+        """
+        payload = {
+            'inputs': [file_digest(p) for p in input_paths],
+            'config': config,
+            'code': code_fingerprint,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cache entry and mark it as recently used.
+
+        Returns:
+            dict or None: Manifest with an ``artifacts`` mapping of name to
+            cached file path, or None on a cache miss
+        """
+        entry_dir = self.cache_dir / key
+        manifest_path = entry_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f'[task_cache] Discarding unreadable entry {key[:12]}: {e}')
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        artifacts = {name: entry_dir / name for name in manifest.get('artifacts', [])}
+        if not all(path.exists() for path in artifacts.values()):
+            logging.warning(f'[task_cache] Entry {key[:12]} is incomplete, discarding')
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        os.utime(manifest_path, None)  # LRU bookkeeping
+        manifest['artifacts'] = {name: str(path) for name, path in artifacts.items()}
+        return manifest
+
+    def put(self, key: str, artifacts: Dict[str, str],
+            metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Store task outputs under ``key`` and evict old entries if needed.
+
+        Args:
+            key: Cache key from ``make_key``
+            artifacts: Mapping of artifact name to the file to copy in
+            metadata: JSON-serialisable task summary stored with the entry
+
+        Returns:
+            dict: The stored manifest
+        """
+        manifest = {
+            'key': key,
+            'created': time.time(),
+            'artifacts': sorted(artifacts),
+            'metadata': metadata or {},
+        }
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f'.{key[:12]}-', dir=self.cache_dir))
+        try:
+            for name, src in artifacts.items():
+                shutil.copy2(src, tmp_dir / name)
+            with open(tmp_dir / MANIFEST_NAME, 'w') as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            entry_dir = self.cache_dir / key
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir)
+            tmp_dir.rename(entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logging.info(f'[task_cache] Stored entry {key[:12]} ({len(artifacts)} artifacts)')
+        self.evict()
+        return manifest
+
+    @staticmethod
+    def restore(manifest: Dict[str, Any], targets: Dict[str, str]) -> None:
+        """
+        Copy cached artifacts to the locations the caller expects.
+
+        Args:
+            manifest: Result of ``get``
+            targets: Mapping of artifact name to destination path
+        """
+        for name, dest in targets.items():
+            dest_path = Path(dest)
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(manifest['artifacts'][name], dest_path)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """List cache entries with their size and last access time."""
+        result = []
+        for entry_dir in self.cache_dir.iterdir():
+            manifest_path = entry_dir / MANIFEST_NAME
+            if not entry_dir.is_dir() or not manifest_path.exists():
+                continue
+            size = sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+            result.append({
+                'key': entry_dir.name,
+                'path': entry_dir,
+                'size_bytes': size,
+                'last_used': manifest_path.stat().st_mtime,
+            })
+        return result
+
+    def size_bytes(self) -> int:
+        """Total size of all cache entries."""
+        return sum(e['size_bytes'] for e in self.entries())
+
+    def evict(self) -> List[str]:
+        """
+        Remove least recently used entries until the cache fits ``max_bytes``.
+
+        Returns:
+            list: Keys of the evicted entries
+        """
+        entries = sorted(self.entries(), key=lambda e: e['last_used'])
+        total = sum(e['size_bytes'] for e in entries)
+        evicted = []
+
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            shutil.rmtree(oldest['path'], ignore_errors=True)
+            total -= oldest['size_bytes']
+            evicted.append(oldest['key'])
+
+        if evicted:
+            logging.info(f'[task_cache] Evicted {len(evicted)} entries, cache now {total} bytes')
+        return evicted
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: analyze_numeric engine vs pandas describe()/groupby()
+
+Times analyze_numeric on a synthetic long-format panel (one row per ticker
+observation) against the pandas calls it replaces, ungrouped and grouped,
+with and without percentiles. pandas has no single call for grouped
+count/mean/std/min/max plus quantiles, so that case is compared against
+groupby().agg() followed by groupby().quantile().
+
+Usage:
+    python bench_analyze_numeric.py
+    python bench_analyze_numeric.py --rows 20000000 --groups 5000 --cols 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils import analyze_numeric
+
+STATS = ['mean', 'std', 'min', 'max', 'count']
+
+
+def best_time(fn, repeat):
+    """Best wall time over ``repeat`` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='analyze_numeric benchmark')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--groups', type=int, default=5000)
+    parser.add_argument('--cols', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.standard_normal((args.rows, args.cols)),
+                      columns=[f'x{i}' for i in range(args.cols)])
+    df['ticker'] = pd.Series(rng.integers(0, args.groups, args.rows)).astype(str)
+    numeric = df.drop(columns='ticker')
+    pct = [0.25, 0.5, 0.75]
+
+    cases = [
+        ('ungrouped', lambda: analyze_numeric(df), lambda: numeric.describe(percentiles=pct)),
+        ('grouped', lambda: analyze_numeric(df, 'ticker'),
+         lambda: numeric.groupby(df['ticker']).agg(STATS)),
+        ('grouped + percentiles', lambda: analyze_numeric(df, 'ticker', percentiles=pct),
+         lambda: (numeric.groupby(df['ticker']).agg(STATS),
+                  numeric.groupby(df['ticker']).quantile(pct))),
+    ]
+
+    print(f'{args.rows} rows, {args.cols} columns, {args.groups} groups')
+    print(f'{"case":<24}{"engine (s)":>12}{"pandas (s)":>12}{"ratio":>8}')
+    for name, engine, reference in cases:
+        engine_time = best_time(engine, args.repeat)
+        pandas_time = best_time(reference, args.repeat)
+        print(f'{name:<24}{engine_time:>12.2f}{pandas_time:>12.2f}{pandas_time / engine_time:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
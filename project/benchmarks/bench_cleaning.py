@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of the cleaning functions, copy vs inplace=True
+
+Builds a wide float64 frame of the requested size with a share of missing
+values, then runs fill_missing_median, drop_missing and normalize_data over
+every column in both modes. For each run it reports the extra memory
+allocated at peak (tracemalloc, which sees NumPy buffers) as an absolute size
+and as a multiple of the frame size, plus the wall time.
+
+The frame itself is not counted, so the copy mode of fill/normalize is
+expected near 1x (the result frame) and the in-place mode near zero (one
+column of scratch at a time). drop_missing needs a boolean mask (1/8x) to
+count missing values; pandas < 3 additionally copies the surviving columns
+when dropping, in either mode. You need roughly twice --gb of free RAM for
+the copy runs.
+
+Usage:
+    python bench_cleaning.py              # 5 GB frame
+    python bench_cleaning.py --gb 0.5 --cols 200
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cleaning import drop_missing, fill_missing_median, normalize_data
+
+
+def make_frame(n_bytes, n_cols, missing, seed=0):
+    """float64 frame of about n_bytes with a fraction of NaNs per column."""
+    n_rows = max(int(n_bytes // (8 * n_cols)), 1)
+    rng = np.random.default_rng(seed)
+    values = rng.standard_normal((n_rows, n_cols))
+    values[rng.random((n_rows, n_cols)) < missing] = np.nan
+    # a tenth of the columns are mostly empty so drop_missing has work to do
+    sparse = max(n_cols // 10, 1)
+    values[:, :sparse][rng.random((n_rows, sparse)) < 0.6] = np.nan
+    return pd.DataFrame(values, columns=[f'f{i}' for i in range(n_cols)], copy=False)
+
+
+def measure(fn):
+    """Wall time and peak bytes allocated while running fn()."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak memory of cleaning functions')
+    parser.add_argument('--gb', type=float, default=5.0, help='Frame size in GB (default: 5)')
+    parser.add_argument('--cols', type=int, default=500, help='Number of columns')
+    parser.add_argument('--missing', type=float, default=0.05, help='Fraction of NaNs')
+    args = parser.parse_args()
+
+    n_bytes = int(args.gb * 1024 ** 3)
+    cases = [
+        ('fill_missing_median', lambda df, inplace: fill_missing_median(df, list(df.columns), inplace=inplace)),
+        ('drop_missing', lambda df, inplace: drop_missing(df, 0.5, inplace=inplace)),
+        ('normalize_data', lambda df, inplace: normalize_data(df, list(df.columns), inplace=inplace)),
+    ]
+
+    print(f'pandas {pd.__version__}, frame ~{args.gb:.2f} GB, {args.cols} columns, '
+          f'{args.missing:.0%} missing')
+    print(f'{"function":<22}{"mode":<10}{"time (s)":>10}{"peak extra":>14}{"x frame":>10}')
+    for name, fn in cases:
+        for inplace in (False, True):
+            df = make_frame(n_bytes, args.cols, args.missing)
+            frame_bytes = df.memory_usage(index=False).sum()
+            elapsed, peak = measure(lambda: fn(df, inplace))
+            mode = 'inplace' if inplace else 'copy'
+            print(f'{name:<22}{mode:<10}{elapsed:>10.2f}{peak / 1024 ** 3:>11.2f} GB'
+                  f'{peak / frame_bytes:>10.2f}')
+            del df
+            gc.collect()
+
+
+if __name__ == '__main__':
+    main()
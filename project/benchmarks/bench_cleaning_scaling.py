@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CleaningPipeline fit/transform scaling with n_jobs
+
+Fits and transforms a wide frame with 1, 2, 4, ... worker threads and reports
+the best-of-N wall time, the speedup over n_jobs=1 and whether the fitted
+statistics and the cleaned frame are bit-identical to the single-threaded
+result. Speedup is capped by the physical cores available (the script prints
+os.cpu_count()) and by memory bandwidth for the element-wise transform.
+
+Usage:
+    python bench_cleaning_scaling.py
+    python bench_cleaning_scaling.py --rows 200000 --cols 2000 --jobs 1 2 4 8 16
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cleaning import CleaningPipeline
+
+
+def best_time(fn, repeat):
+    """Best wall time over ``repeat`` runs, plus the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def make_frame(n_rows, n_cols, missing, seed=0):
+    """Wide float64 frame with a fraction of NaNs."""
+    rng = np.random.default_rng(seed)
+    values = rng.standard_normal((n_rows, n_cols))
+    values[rng.random((n_rows, n_cols)) < missing] = np.nan
+    return pd.DataFrame(values, columns=[f'f{i}' for i in range(n_cols)], copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CleaningPipeline n_jobs scaling')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--cols', type=int, default=2000)
+    parser.add_argument('--missing', type=float, default=0.05)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols, args.missing)
+    columns = list(df.columns)
+    print(f'{args.rows} rows x {args.cols} columns '
+          f'({df.memory_usage(index=False).sum() / 1024 ** 3:.2f} GB), cpu_count={os.cpu_count()}')
+    print(f'{"n_jobs":>6}{"fit (s)":>10}{"speedup":>9}{"transform (s)":>15}{"speedup":>9}{"identical":>11}')
+
+    baseline = None
+    for n_jobs in args.jobs:
+        pipeline = CleaningPipeline(columns, columns, drop_threshold=0.5, n_jobs=n_jobs)
+        fit_time, _ = best_time(lambda: pipeline.fit(df), args.repeat)
+        transform_time, cleaned = best_time(lambda: pipeline.transform(df), args.repeat)
+
+        if baseline is None:
+            baseline = (fit_time, transform_time, pipeline.medians_, cleaned)
+        identical = (np.array_equal(pipeline.medians_, baseline[2], equal_nan=True)
+                     and cleaned.equals(baseline[3]))
+        print(f'{n_jobs:>6}{fit_time:>10.3f}{baseline[0] / fit_time:>8.2f}x'
+              f'{transform_time:>15.3f}{baseline[1] / transform_time:>8.2f}x{str(identical):>11}')
+
+
+if __name__ == '__main__':
+    main()
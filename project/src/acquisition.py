@@ -1,7 +1,342 @@
-import yfinance as yf
+"""
+Market Data Acquisition
+Stage 04: Data Acquisition and Ingestion
+
+fetch_stock_data() downloads one ticker to CSV. StockDataFetcher adds a local
+Parquet cache per ticker that remembers which date ranges were already
+downloaded, so repeated runs only request the missing ranges, and
+fetch_many() downloads many tickers concurrently under a shared rate limit.
+
+Providers are plain objects with fetch(ticker, start, end) returning an OHLCV
+DataFrame indexed by date; YahooProvider talks to Yahoo Finance and
+FakeProvider generates deterministic local data for tests and offline work.
+
+Example:
+    fetcher = StockDataFetcher(cache_dir='data/cache', max_workers=4, rate_limit=2)
+    frames = fetcher.fetch_many(['AAPL', 'MSFT'], '2020-01-01', '2024-01-01')
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
-def fetch_stock_data(ticker, start, end, save_path):
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+class YahooProvider:
+    """Daily OHLCV bars from Yahoo Finance (yfinance is imported lazily)."""
+
+    def __init__(self, flatten: bool = True, **download_kwargs):
+        """
+        Args:
+            flatten (bool): Reduce yfinance's (field, ticker) columns to field
+                names and drop the index timezone, as the cache requires;
+                False returns yf.download's frame unchanged
+            **download_kwargs: Passed to yf.download (e.g. auto_adjust);
+                yfinance's own defaults apply otherwise
+        """
+        self.flatten = flatten
+        self.download_kwargs = download_kwargs
+
+    @property
+    def name(self) -> str:
+        """Cache namespace; download options that change prices are part of it."""
+        options = ','.join(f'{k}={v}' for k, v in sorted(self.download_kwargs.items()))
+        return f'yahoo-{options}' if options else 'yahoo'
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        """
+        Download bars for [start, end).
+        Args:
+            ticker (str): Stock ticker symbol
+            start, end: Dates; end is exclusive, as in yfinance
+        Returns:
+            pd.DataFrame: OHLCV columns indexed by date
+        """
+        import yfinance as yf
+
+        df = yf.download(ticker, start=start, end=end, progress=False, **self.download_kwargs)
+        if not self.flatten:
+            return df
+        if isinstance(df.columns, pd.MultiIndex):
+            # newer yfinance returns (field, ticker) columns even for one ticker
+            df.columns = df.columns.get_level_values(0)
+        df.index = pd.DatetimeIndex(df.index).tz_localize(None)
+        df.index.name = 'Date'
+        return df
+
+
+class FakeProvider:
+    """
+    Deterministic synthetic bars for tests and offline development.
+    Prices are a trend plus seeded noise per ticker on business days from
+    1990 onwards. The noise for a row depends only on (ticker, date), so a
+    row is identical no matter how the requested range is split. Every call
+    is recorded in ``calls``.
+    """
+
+    ORIGIN = pd.Timestamp('1990-01-01')
+    name = 'fake'
+
+    def __init__(self, start_price: float = 100.0, delay: float = 0.0,
+                 fail_tickers: Iterable[str] = ()):
+        """
+        Args:
+            start_price (float): Price level at the start of 1990
+            delay (float): Seconds to sleep per call (simulates network latency)
+            fail_tickers (iterable): Tickers whose fetch raises ConnectionError
+        """
+        self.start_price = start_price
+        self.delay = delay
+        self.fail_tickers = set(fail_tickers)
+        self.calls: List[Tuple[str, pd.Timestamp, pd.Timestamp]] = []
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        with self._lock:
+            self.calls.append((ticker, start, end))
+        if self.delay:
+            time.sleep(self.delay)
+        if ticker in self.fail_tickers:
+            raise ConnectionError(f"Simulated failure for {ticker}")
+
+        dates = pd.bdate_range(max(start, self.ORIGIN), end - pd.Timedelta(days=1))
+        # business-day offset from the origin keys each row, independent of the range
+        steps = np.busday_count(self.ORIGIN.date(), dates.values.astype('datetime64[D]'))
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        noise = rng.standard_normal((int(steps.max(initial=-1)) + 1, 4))[steps]
+        close = self.start_price * np.exp(0.0002 * steps + 0.02 * noise[:, 0] + 0.1 * np.sin(steps / 50))
+        open_ = close * (1 + 0.005 * noise[:, 1])
+        high = np.maximum(open_, close) * (1 + 0.01 * np.abs(noise[:, 2]))
+        low = np.minimum(open_, close) * (1 - 0.01 * np.abs(noise[:, 3]))
+        volume = (1e6 * (1 + np.abs(noise[:, 0]))).astype(np.int64)
+        return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close,
+                             'Adj Close': close, 'Volume': volume},
+                            index=pd.DatetimeIndex(dates, name='Date'))
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most ``rate`` acquisitions per second."""
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        """
+        Args:
+            rate (float): Sustained calls per second (None or 0 disables limiting)
+            burst (int): Calls allowed back to back before waiting
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _merge_ranges(ranges: List[Tuple[pd.Timestamp, pd.Timestamp]]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Union of half-open date ranges, sorted and with touching ranges joined."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_ranges(covered, start: pd.Timestamp, end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Parts of [start, end) not inside any covered range."""
+    gaps, cursor = [], start
+    for cov_start, cov_end in _merge_ranges(covered):
+        if cov_end <= cursor:
+            continue
+        if cov_start >= end:
+            break
+        if cov_start > cursor:
+            gaps.append((cursor, cov_start))
+        cursor = max(cursor, cov_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class StockDataFetcher:
+    """
+    Cached, concurrent access to daily bars.
+
+    Cache layout::
+
+        <cache_dir>/<provider>/<TICKER>.parquet   # all bars downloaded so far
+        <cache_dir>/<provider>/<TICKER>.json      # date ranges already requested
+
+    The provider directory comes from the provider's ``name`` attribute
+    (class name otherwise), so bars from different sources, e.g. FakeProvider
+    and Yahoo, never mix even when they share a cache_dir.
+
+    The coverage file is what makes incremental fetching correct: weekends
+    and holidays inside a downloaded range have no rows, but once requested
+    they are known to be empty and are not asked for again. A range for which
+    the provider returned nothing is only recorded when it holds no business
+    day; otherwise it is asked for again next time, since yfinance also
+    returns an empty frame on network errors and rate limits. Ranges reaching
+    today or later are only recorded up to yesterday, since the latest bar
+    may still change.
+    """
+
+    def __init__(self, provider=None, cache_dir: str = 'data/cache', max_workers: int = 4,
+                 rate_limit: Optional[float] = 2.0):
+        """
+        Args:
+            provider: Object with fetch(ticker, start, end); defaults to YahooProvider
+            cache_dir (str): Root directory of the per-provider, per-ticker cache
+            max_workers (int): Tickers downloaded concurrently by fetch_many
+            rate_limit (float): Provider calls per second across all threads
+                (None disables the limit)
+        """
+        self.provider = provider if provider is not None else YahooProvider()
+        self.provider_name = str(getattr(self.provider, 'name', type(self.provider).__name__))
+        self.cache_dir = Path(cache_dir) / self.provider_name.replace('/', '_')
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate_limit)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def _cache_key(ticker: str) -> str:
+        """File name stem of a ticker; tickers differing only in case share it."""
+        return ticker.upper().replace('/', '_')
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(self._cache_key(ticker), threading.Lock())
+
+    def _paths(self, ticker: str) -> Tuple[Path, Path]:
+        safe = self._cache_key(ticker)
+        return self.cache_dir / f'{safe}.parquet', self.cache_dir / f'{safe}.json'
+
+    def _load(self, ticker: str):
+        data_path, meta_path = self._paths(ticker)
+        data = pd.read_parquet(data_path) if data_path.exists() else None
+        covered = []
+        if meta_path.exists() and data is not None:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta.get('provider') != self.provider_name:
+                logging.warning(f'[acquisition] {ticker}: cache written by {meta.get("provider")!r}, '
+                                f'not {self.provider_name!r}; downloading again')
+                return None, []
+            covered = [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in meta['ranges']]
+        return data, covered
+
+    def _store(self, ticker: str, data: pd.DataFrame, covered) -> None:
+        """Write data, then coverage, each via a temporary file and rename."""
+        data_path, meta_path = self._paths(ticker)
+        tmp_data = data_path.with_suffix('.parquet.tmp')
+        data.to_parquet(tmp_data)
+        os.replace(tmp_data, data_path)
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+        with open(tmp_meta, 'w') as f:
+            json.dump({'ticker': ticker, 'provider': self.provider_name,
+                       'ranges': [[a.strftime('%Y-%m-%d'), b.strftime('%Y-%m-%d')] for a, b in covered]},
+                      f, indent=2)
+        os.replace(tmp_meta, meta_path)
+
+    def fetch(self, ticker: str, start, end, refresh: bool = False) -> pd.DataFrame:
+        """
+        Bars for [start, end), downloading only ranges not cached yet.
+        Args:
+            ticker (str): Stock ticker symbol
+            start, end: Dates (end exclusive)
+            refresh (bool): Ignore the cache and download the whole range
+        Returns:
+            pd.DataFrame: OHLCV bars indexed by date
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        with self._ticker_lock(ticker):
+            data, covered = (None, []) if refresh else self._load(ticker)
+            gaps = _missing_ranges(covered, start, end)
+
+            new_parts, fetched = [], []
+            for gap_start, gap_end in gaps:
+                self.limiter.acquire()
+                logging.info(f'[acquisition] {ticker}: downloading {gap_start.date()} to {gap_end.date()}')
+                part = self.provider.fetch(ticker, gap_start, gap_end)
+                if part is not None and len(part):
+                    new_parts.append(part)
+                    fetched.append((gap_start, gap_end))
+                elif len(pd.bdate_range(gap_start, gap_end - pd.Timedelta(days=1))) == 0:
+                    fetched.append((gap_start, gap_end))
+                else:
+                    # possibly a failed download: keep the range uncovered
+                    logging.warning(f'[acquisition] {ticker}: no rows for {gap_start.date()} '
+                                    f'to {gap_end.date()}; not cached')
+
+            if gaps:
+                frames = ([data] if data is not None else []) + new_parts
+                if frames:
+                    data = pd.concat(frames)
+                    data = data[~data.index.duplicated(keep='last')].sort_index()
+                elif data is None:
+                    data = pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+                today = pd.Timestamp.today().normalize()
+                settled = [(a, min(b, today)) for a, b in fetched if a < today]
+                self._store(ticker, data, _merge_ranges(covered + settled))
+            else:
+                logging.info(f'[acquisition] {ticker}: served from cache')
+
+        return data.loc[(data.index >= start) & (data.index < end)]
+
+    def fetch_many(self, tickers: Iterable[str], start, end, refresh: bool = False,
+                   raise_errors: bool = False) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch several tickers concurrently (max_workers threads, shared rate limit).
+        Args:
+            tickers (iterable): Ticker symbols
+            start, end: Dates (end exclusive)
+            refresh (bool): Ignore the cache
+            raise_errors (bool): Re-raise the first failure instead of logging it
+        Returns:
+            dict: ticker -> DataFrame for every ticker that succeeded
+        """
+        tickers = list(dict.fromkeys(tickers))
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {ticker: pool.submit(self.fetch, ticker, start, end, refresh) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    logging.error(f'[acquisition] {ticker}: download failed: {e}')
+        return results
+
+
+def fetch_stock_data(ticker, start, end, save_path, cache_dir=None, provider=None):
     """
     Fetch historical stock data from Yahoo Finance and save as CSV.
     Args:
@@ -9,9 +344,19 @@ def fetch_stock_data(ticker, start, end, save_path):
         start (str): Start date (YYYY-MM-DD)
         end (str): End date (YYYY-MM-DD)
         save_path (str): Path to save CSV file
+        cache_dir (str, optional): Reuse and extend a StockDataFetcher cache
+            so only missing date ranges are downloaded
+        provider (optional): Data provider (defaults to Yahoo Finance)
     Returns:
-        pd.DataFrame: Downloaded stock data
+        pd.DataFrame: Downloaded stock data. Without cache_dir and provider
+        this is yf.download's frame with yfinance's defaults, as before; the
+        cache stores flattened columns and a timezone-naive index
     """
-    df = yf.download(ticker, start=start, end=end)
+    if provider is None:
+        provider = YahooProvider(flatten=cache_dir is not None)
+    if cache_dir is not None:
+        df = StockDataFetcher(provider, cache_dir=cache_dir, rate_limit=None).fetch(ticker, start, end)
+    else:
+        df = provider.fetch(ticker, start, end)
     df.to_csv(save_path)
     return df
@@ -0,0 +1,341 @@
+"""
+Walk-Forward Backtesting for Linear Models
+Stage 10b: Modeling - Time Series
+
+Rolling-origin evaluation: the model is fitted on the rows before each test
+window and scored on the window, then the origin moves forward by ``step``
+rows. Training windows either expand from the first row or slide with a
+fixed length.
+
+Refitting OLS from scratch costs O(train rows) per fold. Here the sufficient
+statistics X'X and X'y are accumulated once as running sums over the rows
+(split at the fold boundaries), so the statistics of any training window
+are a difference of two running sums, and every fold's normal equations are
+solved in one batched ``np.linalg.solve`` call. Predictions and per-fold mae/rmse/r2_score are
+computed for all folds at once on a (folds, test rows) grid. Tickers are
+independent and run on a thread pool (NumPy releases the GIL in the batched
+kernels).
+
+Numerical note: running sums over the whole series lose precision for
+sliding windows late in a long (e.g. trending) series, since the difference
+of two large sums is taken. The running sums restart at blocks about one
+training window long, on data centered on the block mean, and each window is
+re-centered on its own mean before solving (see _range_moments); coefficients
+then match a per-fold least-squares fit to ~1e-9 even at millions of rows.
+Memory is O(rows * features + folds * features^2): no (rows, features,
+features) array is formed.
+
+Example:
+    folds = walk_forward_backtest(df, ['return_lag_1', 'rolling_volatility'], 'close_next',
+                                  by='ticker', initial_train=252, test_size=21)
+    folds.groupby('ticker')[['mae', 'rmse', 'r2_score']].mean()
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from cleaning import _resolve_n_jobs
+
+METRICS = ('mae', 'rmse', 'r2_score')
+
+
+def walk_forward_splits(n_rows: int, initial_train: int, test_size: int, step: Optional[int] = None,
+                        window: Optional[int] = None, gap: int = 0) -> np.ndarray:
+    """
+    Row ranges of every walk-forward fold.
+    Args:
+        n_rows: Rows in the series
+        initial_train: Training rows of the first fold
+        test_size: Rows per test window (the last window may be shorter)
+        step: Rows the origin moves per fold (default: test_size)
+        window: Fixed training length (sliding window); None expands from row 0
+        gap: Rows skipped between training and test (embargo for overlapping targets)
+    Returns:
+        np.ndarray of shape (folds, 4): train_start, train_end, test_start,
+        test_end (end exclusive)
+    """
+    step = test_size if step is None else step
+    if initial_train < 1 or test_size < 1 or step < 1 or gap < 0:
+        raise ValueError("initial_train, test_size and step must be >= 1 and gap >= 0")
+    if window is not None and window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    train_end = np.arange(initial_train, n_rows - gap, step)
+    if len(train_end) == 0:
+        return np.empty((0, 4), dtype=np.int64)
+    test_start = train_end + gap
+    test_end = np.minimum(test_start + test_size, n_rows)
+    if window is None:
+        train_start = np.zeros_like(train_end)
+    else:
+        train_start = np.maximum(train_end - window, 0)
+    return np.column_stack([train_start, train_end, test_start, test_end]).astype(np.int64)
+
+
+def walk_forward_ols(X: np.ndarray, y: np.ndarray,
+                     splits: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fit OLS with intercept on every training range and predict its test range.
+    Args:
+        X: Features, shape (rows, features) or (rows,)
+        y: Target, shape (rows,)
+        splits: Output of walk_forward_splits()
+    Returns:
+        tuple: (coefficients of shape (folds, 1 + features) with the intercept
+        first, predictions of shape (folds, max test rows) padded with NaN,
+        test row index of the same shape padded with -1)
+    """
+    X = np.asarray(X, dtype=np.float64)
+    X = X.reshape(len(X), -1)
+    y = np.asarray(y, dtype=np.float64)
+    n_folds, n_features = len(splits), X.shape[1]
+    p = n_features + 1
+    if n_folds == 0:
+        return np.empty((0, p)), np.empty((0, 0)), np.empty((0, 0), dtype=np.int64)
+
+    train_start, train_end, test_start, test_end = splits.T
+    count, mean, scatter = _range_moments(np.column_stack([X, y]), train_start, train_end)
+    # centered normal equations of every fold; the intercept follows from the means
+    beta = _solve_normal_equations(scatter[:, :-1, :-1], scatter[:, :-1, -1])
+    coefs = np.empty((n_folds, p))
+    coefs[:, 1:] = beta
+    coefs[:, 0] = mean[:, -1] - np.einsum('fk,fk->f', mean[:, :-1], beta)
+
+    width = int((test_end - test_start).max())
+    rows = test_start[:, None] + np.arange(width)[None, :]
+    valid = rows < test_end[:, None]
+    rows = np.where(valid, rows, -1)
+    preds = np.einsum('ftk,fk->ft', X[np.where(valid, rows, 0)], beta) + coefs[:, :1]
+    preds[~valid] = np.nan
+    return coefs, preds, rows
+
+
+def _range_moments(W: np.ndarray, starts: np.ndarray,
+                   ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Row count, column means and scatter matrix (cross-products centered on
+    the means) of W[start:end] for every range.
+
+    Rows are split into blocks at least as long as the longest range, so a
+    range covers the tail of one block and the head of the next at most.
+    Inside a block rows are centered on the block mean, the products of each
+    column pair are summed between consecutive range boundaries with
+    np.add.reduceat (one pair at a time, so there is no (rows, q, q)
+    temporary), and the segment sums are accumulated with a cumulative sum
+    that restarts at every block. Both parts of a range are re-centered on
+    the range mean before they are added, as in indicators._rolling_moments.
+    Returns:
+        tuple: counts (ranges,), means (ranges, q), scatter (ranges, q, q)
+    """
+    n, q = W.shape
+    block = max(int((ends - starts).max()), 1)
+    n_blocks = -(-n // block)
+    block_starts = np.arange(n_blocks) * block
+    centers = np.add.reduceat(W, block_starts, axis=0) / np.diff(np.append(block_starts, n))[:, None]
+    Wc = W - np.repeat(centers, block, axis=0)[:n]
+
+    # segments between consecutive boundaries never cross a block
+    cuts = np.unique(np.concatenate([starts, ends, block_starts]))
+    cuts = cuts[cuts < n]
+    seg_block = cuts // block
+    seg_count = np.diff(np.append(cuts, n)).astype(np.float64)
+    seg_sum = np.add.reduceat(Wc, cuts, axis=0)
+    seg_scatter = np.empty((len(cuts), q, q))
+    product = np.empty(n)
+    for i in range(q):
+        for j in range(i, q):
+            np.multiply(Wc[:, i], Wc[:, j], out=product)
+            seg_scatter[:, i, j] = seg_scatter[:, j, i] = np.add.reduceat(product, cuts)
+    del Wc, product
+
+    # exclusive running sums inside each block on a (blocks, segments) grid
+    first = np.searchsorted(cuts, block_starts)
+    pos = np.arange(len(cuts)) - first[seg_block]
+    width = int(pos.max()) + 1
+    head, totals = [], []
+    for seg in (seg_count, seg_sum, seg_scatter):
+        grid = np.zeros((n_blocks, width + 1) + seg.shape[1:])
+        grid[seg_block, pos + 1] = seg
+        np.cumsum(grid, axis=1, out=grid)
+        head.append(grid[seg_block, pos])
+        totals.append(grid[:, -1])
+
+    def head_at(b, x):
+        """Sums over [block start, x) of block b, x in cuts or the block end"""
+        at_end = x >= np.minimum((b + 1) * block, n)
+        k = np.minimum(np.searchsorted(cuts, x), len(cuts) - 1)
+        return [np.where(at_end.reshape((-1,) + (1,) * (h.ndim - 1)), t[b], h[k])
+                for h, t in zip(head, totals)]
+
+    # part A: rows of the range in the block of its last row; part B: the rest
+    b_end = np.minimum(np.maximum(ends - 1, starts) // block, n_blocks - 1)
+    b_start = np.minimum(starts // block, n_blocks - 1)
+    upper = head_at(b_end, ends)
+    lower = head_at(b_end, np.maximum(starts, b_end * block))
+    part_a = [u - l for u, l in zip(upper, lower)]
+    split = b_start < b_end
+    before = head_at(b_start, starts)
+    part_b = [np.where(split.reshape((-1,) + (1,) * (t.ndim - 1)), t[b_start] - h, 0.0)
+              for h, t in zip(before, totals)]
+
+    count = part_a[0] + part_b[0]
+    safe = np.maximum(count, 1.0)[:, None]
+    mean = (part_a[0][:, None] * centers[b_end] + part_a[1]
+            + part_b[0][:, None] * centers[b_start] + part_b[1]) / safe
+    scatter = np.zeros((len(starts), q, q))
+    for (m, s1, s2), center in ((part_a, centers[b_end]), (part_b, centers[b_start])):
+        # sum of (w - mean)(w - mean)' from sums centered on the block center
+        d = center - mean
+        scatter += (s2 + s1[:, :, None] * d[:, None, :] + d[:, :, None] * s1[:, None, :]
+                    + m[:, None, None] * d[:, :, None] * d[:, None, :])
+    return count, mean, scatter
+
+
+def _solve_normal_equations(gram: np.ndarray, moment: np.ndarray) -> np.ndarray:
+    """Batched solve of gram @ beta = moment; singular folds use the pseudo-inverse."""
+    try:
+        return np.linalg.solve(gram, moment[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        pass
+    beta = np.empty_like(moment)
+    rank = np.linalg.matrix_rank(gram)
+    full = rank == gram.shape[-1]
+    if full.any():
+        beta[full] = np.linalg.solve(gram[full], moment[full][..., None])[..., 0]
+    if (~full).any():
+        # minimum-norm solution, as SimpleLinReg's pinv fit
+        beta[~full] = (np.linalg.pinv(gram[~full]) @ moment[~full][..., None])[..., 0]
+    return beta
+
+
+def fold_metrics(y: np.ndarray, preds: np.ndarray, rows: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    mae, rmse and r2_score of every fold at once.
+    Args:
+        y: Target, shape (rows,)
+        preds: Predictions from walk_forward_ols()
+        rows: Test row index from walk_forward_ols()
+    Returns:
+        dict of arrays with one value per fold (r2_score is NaN for a
+        constant test target)
+    """
+    valid = rows >= 0
+    actual = np.where(valid, np.asarray(y, dtype=np.float64)[np.where(valid, rows, 0)], np.nan)
+    count = valid.sum(axis=1)
+    err = np.where(valid, actual - preds, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(actual, axis=1) / count
+        ss_res = np.sum(err ** 2, axis=1)
+        ss_tot = np.nansum((actual - mean[:, None]) ** 2, axis=1)
+        return {
+            'mae': np.sum(np.abs(err), axis=1) / count,
+            'rmse': np.sqrt(ss_res / count),
+            'r2_score': np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan),
+        }
+
+
+def _backtest_frame(df: pd.DataFrame, features: List[str], target: str, params: dict,
+                    return_predictions: bool) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """Folds (and optionally predictions) of a single series."""
+    data = df.dropna(subset=list(features) + [target])
+    splits = walk_forward_splits(len(data), **params)
+    X, y = data[features].to_numpy(dtype=np.float64), data[target].to_numpy(dtype=np.float64)
+    coefs, preds, rows = walk_forward_ols(X, y, splits)
+    metrics = fold_metrics(y, preds, rows)
+    labels = data.index
+    folds = pd.DataFrame({
+        'fold': np.arange(len(splits)),
+        'train_start': labels[splits[:, 0]] if len(splits) else [],
+        'train_end': labels[splits[:, 1] - 1] if len(splits) else [],
+        'test_start': labels[splits[:, 2]] if len(splits) else [],
+        'test_end': labels[splits[:, 3] - 1] if len(splits) else [],
+        'n_train': splits[:, 1] - splits[:, 0],
+        'n_test': splits[:, 3] - splits[:, 2],
+        **metrics,
+        'intercept': coefs[:, 0],
+    })
+    for j, name in enumerate(features):
+        folds[f'coef_{name}'] = coefs[:, j + 1]
+    predictions = None
+    if return_predictions:
+        valid = rows >= 0
+        fold_ids = np.broadcast_to(np.arange(len(splits))[:, None], rows.shape)[valid]
+        predictions = pd.DataFrame({
+            'fold': fold_ids,
+            'y_true': y[rows[valid]],
+            'y_pred': preds[valid],
+        }, index=labels[rows[valid]])
+    return folds, predictions
+
+
+def walk_forward_backtest(df: pd.DataFrame, features: List[str], target: str,
+                          initial_train: int, test_size: int, step: Optional[int] = None,
+                          window: Optional[int] = None, gap: int = 0, by: Optional[str] = None,
+                          n_jobs: int = None, return_predictions: bool = False):
+    """
+    Walk-forward OLS backtest with per-fold metrics.
+    Assumption: rows are in time order (within each group); rows with a
+    missing feature or target are dropped before the folds are laid out.
+    Args:
+        df: Data indexed by date (the index labels the fold boundaries)
+        features: Feature columns
+        target: Target column
+        initial_train: Training rows of the first fold
+        test_size: Rows per test window
+        step: Rows the origin moves per fold (default: test_size)
+        window: Fixed training length; None expands the training window
+        gap: Rows skipped between training and test
+        by: Group column (e.g. 'ticker'); every group is backtested separately
+        n_jobs: Threads for groups (None = 1, -1 = all cores); results do not
+            depend on it
+        return_predictions: Also return the out-of-sample predictions
+    Returns:
+        pd.DataFrame with one row per fold: boundaries, n_train, n_test, mae,
+        rmse, r2_score and coefficients (plus a ``by`` column); with
+        return_predictions, a (folds, predictions) tuple
+    """
+    params = {'initial_train': initial_train, 'test_size': test_size, 'step': step,
+              'window': window, 'gap': gap}
+    if by is None:
+        folds, predictions = _backtest_frame(df, features, target, params, return_predictions)
+        return (folds, predictions) if return_predictions else folds
+
+    groups = [(key, part) for key, part in df.groupby(by, sort=True)]
+
+    def run(item):
+        return _backtest_frame(item[1], features, target, params, return_predictions)
+
+    n_jobs = min(_resolve_n_jobs(n_jobs), max(len(groups), 1))
+    if n_jobs > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(run, groups))
+    else:
+        results = [run(item) for item in groups]
+
+    fold_frames, prediction_frames = [], []
+    for (key, _), (folds, predictions) in zip(groups, results):
+        fold_frames.append(folds.assign(**{by: key}))
+        if predictions is not None:
+            prediction_frames.append(predictions.assign(**{by: key}))
+    columns = [by] + [c for c in fold_frames[0].columns if c != by] if fold_frames else [by]
+    folds = pd.concat(fold_frames, ignore_index=True)[columns] if fold_frames else pd.DataFrame(columns=columns)
+    if not return_predictions:
+        return folds
+    predictions = pd.concat(prediction_frames) if prediction_frames else pd.DataFrame()
+    return folds, predictions
+
+
+def summarize_folds(folds: pd.DataFrame, by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Mean, std, min and max of each metric across folds.
+    Args:
+        folds: Output of walk_forward_backtest()
+        by: Group column to summarize per group
+    Returns:
+        pd.DataFrame of metric statistics
+    """
+    metrics = list(METRICS)
+    if by is None:
+        return folds[metrics].agg(['mean', 'std', 'min', 'max'])
+    return folds.groupby(by)[metrics].agg(['mean', 'std', 'min', 'max'])
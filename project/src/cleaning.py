@@ -1,49 +1,471 @@
+import json
+import os
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List
 
-def fill_missing_median(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+from sketches import DEFAULT_K, KLLSketch, rank_error
+
+def _copy_on_write() -> bool:
+    """True when pandas copy-on-write is active (opt-in for 2.x, always on from 3.0)."""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except (KeyError, pd.errors.OptionError):
+        return False
+
+def _target_frame(df: pd.DataFrame, inplace: bool) -> pd.DataFrame:
+    """
+    Frame that the cleaning functions write into.
+    With inplace=True this is df itself. Under copy-on-write a shallow copy is
+    enough: only the columns that get replaced are materialised, the rest keep
+    sharing memory with df. Without copy-on-write a deep copy is required so the
+    result never aliases the caller's data.
+    """
+    if inplace:
+        return df
+    return df.copy(deep=not _copy_on_write())
+
+def _writable_values(df: pd.DataFrame, col) -> np.ndarray:
+    """
+    Float array backing df[col] that can be modified in place, or None.
+    Under copy-on-write pandas never hands out a writable view; callers then
+    write through .loc (inplace) or replace just that column (copy).
+    """
+    values = df[col].to_numpy(copy=False)
+    if values.dtype.kind == 'f' and values.flags.writeable and values.base is not None:
+        return values
+    return None
+
+def fill_missing_median(df: pd.DataFrame, columns: list, inplace: bool = False) -> pd.DataFrame:
     """
     Fill missing values in specified columns with the median of each column.
     Assumption: Only numeric columns are passed. Median is robust to outliers.
     Args:
         df: Input DataFrame
         columns: List of columns to process
+        inplace: Modify df instead of returning a copy; only the missing cells
+            of the target columns are written, nothing else is allocated
     Returns:
-        DataFrame with filled missing values
+        DataFrame with filled missing values (df itself when inplace=True)
     """
-    df_filled = df.copy()
+    out = _target_frame(df, inplace)
     for col in columns:
-        if col in df.columns:
-            df_filled[col] = df[col].fillna(df[col].median())
-    return df_filled
+        if col not in out.columns:
+            continue
+        values = _writable_values(out, col)
+        if values is not None:
+            mask = np.isnan(values)
+            if mask.any():
+                values[mask] = np.nanmedian(values)
+            continue
+        mask = out[col].isna().to_numpy()
+        if not mask.any():
+            continue
+        median = out[col].median()
+        if inplace and out[col].dtype.kind == 'f':
+            # Under copy-on-write .loc writes into the existing block when nothing
+            # else references it; df[col] = ... would keep the old block alive
+            # until every column had been replaced
+            out.loc[mask, col] = median
+        else:
+            out[col] = out[col].fillna(median)
+    return out
 
-def drop_missing(df: pd.DataFrame, threshold: float = 0.5) -> pd.DataFrame:
+def drop_missing(df: pd.DataFrame, threshold: float = 0.5, inplace: bool = False) -> pd.DataFrame:
     """
     Drop columns with missing value ratio exceeding threshold.
     Assumption: Columns with too many missing values are not useful for analysis.
     Args:
         df: Input DataFrame
         threshold: Maximum allowed missing ratio (0-1)
+        inplace: Drop the columns from df instead of returning a copy
     Returns:
-        DataFrame with columns removed
+        DataFrame with columns removed (df itself when inplace=True)
     """
-    missing_ratios = df.isnull().mean()
+    # count() skips NaNs without materialising a boolean frame
+    missing_ratios = 1 - df.count() / max(len(df), 1)
     cols_to_drop = missing_ratios[missing_ratios > threshold].index
+    if inplace:
+        if len(cols_to_drop):
+            df.drop(columns=cols_to_drop, inplace=True)
+        return df
     return df.drop(columns=cols_to_drop)
 
-def normalize_data(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+def normalize_data(df: pd.DataFrame, columns: list, inplace: bool = False) -> pd.DataFrame:
     """
-    Normalize specified columns to [0,1] range using MinMaxScaler.
+    Normalize specified columns to [0,1] range (same result as MinMaxScaler).
     Assumption: Only numeric columns are passed. Scaling improves ML performance.
     Args:
         df: Input DataFrame
         columns: List of columns to normalize
+        inplace: Modify df instead of returning a copy; float columns are
+            scaled in their existing buffers (at most one column of scratch)
     Returns:
-        DataFrame with normalized columns
+        DataFrame with normalized columns (df itself when inplace=True)
     """
-    df_norm = df.copy()
-    scaler = MinMaxScaler()
+    out = _target_frame(df, inplace)
     for col in columns:
-        if col in df.columns:
-            df_norm[col] = scaler.fit_transform(df[[col]])
-    return df_norm
+        if col not in out.columns:
+            continue
+        values = _writable_values(out, col)
+        if values is not None:
+            source = values
+        else:
+            source = out[col].to_numpy()
+            if source.dtype.kind != 'f':
+                source = source.astype(np.float64)
+        lo, hi = np.nanmin(source), np.nanmax(source)
+        scale = hi - lo if hi > lo else 1.0  # constant column -> 0, as MinMaxScaler does
+        if values is not None:
+            np.subtract(values, lo, out=values)
+            np.divide(values, scale, out=values)
+        elif inplace and out[col].dtype.kind == 'f':
+            out.loc[:, col] = (source - lo) / scale
+        else:
+            out[col] = (source - lo) / scale
+    return out
+
+def _resolve_n_jobs(n_jobs: int = None) -> int:
+    """Worker count for n_jobs, using the scikit-learn convention (-1 = all cores)."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return max(int(n_jobs), 1)
+
+def _column_blocks(n_columns: int, n_jobs: int, min_block: int = 8) -> List[slice]:
+    """Contiguous column slices, about four per worker to even out the load."""
+    if n_jobs <= 1 or n_columns <= min_block:
+        return [slice(0, n_columns)]
+    n_blocks = min(4 * n_jobs, -(-n_columns // min_block))
+    edges = np.linspace(0, n_columns, n_blocks + 1).astype(int)
+    return [slice(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+def _map_column_blocks(fn: Callable[[slice], object], n_columns: int, n_jobs: int) -> list:
+    """
+    Run fn(block) for every column block, on a thread pool when n_jobs > 1.
+    NumPy releases the GIL inside reductions and element-wise kernels, so the
+    blocks run truly in parallel. Each column is always computed by the same
+    code on the same data, and results come back in block order, so the output
+    does not depend on n_jobs.
+    """
+    blocks = _column_blocks(n_columns, n_jobs)
+    if len(blocks) == 1:
+        return [fn(blocks[0])]
+    with ThreadPoolExecutor(max_workers=min(n_jobs, len(blocks))) as pool:
+        return list(pool.map(fn, blocks))
+
+def _column_stats(values: np.ndarray):
+    """Per-column nanmedian, nanmin and nanmax (NaN for all-NaN columns)."""
+    with np.errstate(all='ignore'):
+        medians = np.nanmedian(values, axis=0) if len(values) else np.full(values.shape[1], np.nan)
+        mins = np.nanmin(values, axis=0, initial=np.inf, where=~np.isnan(values))
+        maxs = np.nanmax(values, axis=0, initial=-np.inf, where=~np.isnan(values))
+    return medians, mins, maxs
+
+class CleaningPipeline:
+    """
+    Fit/transform version of fill_missing_median, drop_missing and normalize_data.
+    Assumption: statistics fitted on training data are the ones to apply at
+    serving time, so batch jobs and the API clean identically.
+
+    fit() computes every median, min/max and missing ratio in one pass over the
+    selected columns; transform() applies them to all columns at once as NumPy
+    array operations. The fitted state round-trips through save()/load() as JSON.
+    For data larger than memory, fit_chunks()/transform_chunks() do the same in
+    two streaming passes (see clean_parquet()).
+
+    Example:
+        pipeline = CleaningPipeline(fill_columns=cols, normalize_columns=cols,
+                                    drop_threshold=0.5).fit(train_df)
+        pipeline.save('model/cleaning_pipeline.json')
+        clean_df = CleaningPipeline.load('model/cleaning_pipeline.json').transform(batch_df)
+    """
+
+    def __init__(self, fill_columns: list = None, normalize_columns: list = None,
+                 drop_threshold: float = None, n_jobs: int = None):
+        """
+        Args:
+            fill_columns: Numeric columns whose NaNs are filled with the fitted median
+            normalize_columns: Numeric columns scaled to [0,1] with the fitted min/max
+            drop_threshold: Drop columns whose fitted missing ratio exceeds this
+                (None keeps every column)
+            n_jobs: Threads used for fitting and transforming column blocks
+                (None = 1, -1 = all cores); results are identical for any value.
+                A runtime setting, not saved with the fitted state.
+        """
+        self.fill_columns = list(fill_columns or [])
+        self.normalize_columns = list(normalize_columns or [])
+        self.drop_threshold = drop_threshold
+        self.n_jobs = n_jobs
+        self.columns_ = None
+
+    def fit(self, df: pd.DataFrame) -> "CleaningPipeline":
+        """
+        Compute medians, min/max and missing ratios from df.
+        Args:
+            df: Training DataFrame
+        Returns:
+            The fitted pipeline
+        """
+        wanted = self.fill_columns + [c for c in self.normalize_columns if c not in self.fill_columns]
+        self.columns_ = [c for c in wanted if c in df.columns]
+
+        # each block copies out only its own columns, so extraction runs in parallel too
+        stats = _map_column_blocks(
+            lambda block: _column_stats(df[self.columns_[block]].to_numpy(dtype=np.float64)),
+            len(self.columns_), _resolve_n_jobs(self.n_jobs))
+        self.medians_, self.mins_, self.maxs_ = (np.concatenate(parts) for parts in zip(*stats))
+        empty = ~np.isfinite(self.mins_)
+        self.mins_[empty], self.maxs_[empty] = np.nan, np.nan
+
+        # count() skips NaNs without materialising a boolean frame
+        self._set_missing_ratios(df.count(), len(df))
+        self.median_rank_error_ = 0.0
+        return self
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame], sketch_k: int = DEFAULT_K) -> "CleaningPipeline":
+        """
+        Fit from a stream of DataFrame chunks without holding the data in memory.
+        Min/max and missing ratios are exact; medians come from a KLL sketch per
+        column, so each fitted median is an observed value whose rank is within
+        median_rank_error_ * n of the true middle (99% confidence, ~1.3% for
+        the default k=200). Unlike pandas, an even count is not averaged.
+        Args:
+            chunks: Iterable of DataFrames with the same columns
+            sketch_k: KLL accuracy parameter (memory per column grows linearly)
+        Returns:
+            The fitted pipeline
+        """
+        wanted = self.fill_columns + [c for c in self.normalize_columns if c not in self.fill_columns]
+        counts, n_rows = None, 0
+        sketches, mins, maxs = {}, {}, {}
+        n_jobs = _resolve_n_jobs(self.n_jobs)
+        for chunk in chunks:
+            present = [c for c in wanted if c in chunk.columns]
+            for col in present:
+                if col in self.fill_columns and col not in sketches:
+                    sketches[col] = KLLSketch(sketch_k)
+            values = chunk[present].to_numpy(dtype=np.float64)
+
+            def update_block(block):
+                # every sketch is touched by exactly one block, so no locking
+                part = values[:, block]
+                with np.errstate(all='ignore'):
+                    lo = np.nanmin(part, axis=0, initial=np.inf, where=~np.isnan(part))
+                    hi = np.nanmax(part, axis=0, initial=-np.inf, where=~np.isnan(part))
+                for j, col in enumerate(present[block]):
+                    if col in sketches:
+                        sketches[col].update(part[:, j])
+                return lo, hi
+
+            bounds = _map_column_blocks(update_block, len(present), n_jobs)
+            if bounds:
+                lo, hi = (np.concatenate(parts) for parts in zip(*bounds))
+                for j, col in enumerate(present):
+                    mins[col] = min(mins.get(col, np.inf), lo[j])
+                    maxs[col] = max(maxs.get(col, -np.inf), hi[j])
+            chunk_counts = chunk.count()
+            counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+            n_rows += len(chunk)
+
+        self.columns_ = [c for c in wanted if c in mins]
+        self.medians_ = np.array([sketches[c].quantile(0.5) if c in sketches else np.nan
+                                  for c in self.columns_], dtype=np.float64)
+        self.mins_ = np.array([mins[c] for c in self.columns_], dtype=np.float64)
+        self.maxs_ = np.array([maxs[c] for c in self.columns_], dtype=np.float64)
+        empty = ~np.isfinite(self.mins_)
+        self.mins_[empty], self.maxs_[empty] = np.nan, np.nan
+        self._set_missing_ratios(counts if counts is not None else pd.Series(dtype=float), n_rows)
+        self.median_rank_error_ = rank_error(sketch_k) if sketches else 0.0
+        return self
+
+    def _set_missing_ratios(self, counts: pd.Series, n_rows: int) -> None:
+        """Missing ratio per column from non-null counts, and the columns to drop."""
+        self.missing_ratios_ = (1 - counts / max(n_rows, 1)).to_dict()
+        if self.drop_threshold is None:
+            self.drop_columns_ = []
+        else:
+            self.drop_columns_ = [c for c, r in self.missing_ratios_.items() if r > self.drop_threshold]
+
+    def _check_fitted(self):
+        if self.columns_ is None:
+            raise ValueError("CleaningPipeline is not fitted; call fit() or load() first")
+
+    def _apply(self, values: np.ndarray, columns: slice = slice(None)) -> np.ndarray:
+        """Fill and scale a (rows, columns_[columns]) float array in place."""
+        fill_mask = np.isin(self.columns_[columns], self.fill_columns)
+        if fill_mask.any():
+            # a full mask selects a view, so the block is updated without copies
+            block = values if fill_mask.all() else values[:, fill_mask]
+            np.copyto(block, self.medians_[columns][fill_mask], where=np.isnan(block))
+            if block is not values:
+                values[:, fill_mask] = block
+
+        norm_mask = np.isin(self.columns_[columns], self.normalize_columns)
+        if norm_mask.any():
+            lo = self.mins_[columns][norm_mask]
+            scale = self.maxs_[columns][norm_mask] - lo
+            scale[~(scale > 0)] = 1.0  # constant column -> 0, as MinMaxScaler does
+            block = values if norm_mask.all() else values[:, norm_mask]
+            np.subtract(block, lo, out=block)
+            np.divide(block, scale, out=block)
+            if block is not values:
+                values[:, norm_mask] = block
+        return values
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply the fitted cleaning to df (missing columns are skipped).
+        Args:
+            df: DataFrame to clean
+        Returns:
+            Cleaned copy of df
+        """
+        self._check_fitted()
+        out = df.drop(columns=[c for c in self.drop_columns_ if c in df.columns])
+        present = [c for c in self.columns_ if c in out.columns]
+        if not present:
+            return out
+
+        if len(present) < len(self.columns_):
+            return self._subset(present).transform(out)
+
+        values = out[self.columns_].to_numpy(dtype=np.float64, copy=True)
+        # blocks are disjoint column slices of values, filled in place
+        _map_column_blocks(lambda block: self._apply(values[:, block], block),
+                           len(self.columns_), _resolve_n_jobs(self.n_jobs))
+        out[self.columns_] = values
+        return out
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fit on df and return the cleaned df."""
+        return self.fit(df).transform(df)
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Apply transform() to each chunk lazily (second pass of streaming cleaning)."""
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def transform_row(self, row) -> list:
+        """
+        Clean a single record without building a DataFrame (for the API).
+        Args:
+            row: Sequence of values ordered like columns_ (None/NaN allowed)
+        Returns:
+            List of cleaned floats
+        """
+        self._check_fitted()
+        values = np.array([[np.nan if v is None else v for v in row]], dtype=np.float64)
+        if values.shape[1] != len(self.columns_):
+            raise ValueError(f"Expected {len(self.columns_)} values ordered as {self.columns_}")
+        return self._apply(values)[0].tolist()
+
+    def _subset(self, columns: list) -> "CleaningPipeline":
+        """Pipeline restricted to the given fitted columns."""
+        idx = [self.columns_.index(c) for c in columns]
+        sub = CleaningPipeline(self.fill_columns, self.normalize_columns, self.drop_threshold, self.n_jobs)
+        sub.columns_ = list(columns)
+        sub.medians_, sub.mins_, sub.maxs_ = self.medians_[idx], self.mins_[idx], self.maxs_[idx]
+        sub.missing_ratios_, sub.drop_columns_ = self.missing_ratios_, []
+        sub.median_rank_error_ = self.median_rank_error_
+        return sub
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable fitted state."""
+        self._check_fitted()
+        return {
+            'fill_columns': self.fill_columns,
+            'normalize_columns': self.normalize_columns,
+            'drop_threshold': self.drop_threshold,
+            'columns': self.columns_,
+            'medians': self.medians_.tolist(),
+            'mins': self.mins_.tolist(),
+            'maxs': self.maxs_.tolist(),
+            'missing_ratios': self.missing_ratios_,
+            'drop_columns': self.drop_columns_,
+            'median_rank_error': self.median_rank_error_,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "CleaningPipeline":
+        """Rebuild a fitted pipeline from to_dict() output."""
+        pipeline = cls(state['fill_columns'], state['normalize_columns'], state['drop_threshold'])
+        pipeline.columns_ = list(state['columns'])
+        pipeline.medians_ = np.array(state['medians'], dtype=np.float64)
+        pipeline.mins_ = np.array(state['mins'], dtype=np.float64)
+        pipeline.maxs_ = np.array(state['maxs'], dtype=np.float64)
+        pipeline.missing_ratios_ = dict(state['missing_ratios'])
+        pipeline.drop_columns_ = list(state['drop_columns'])
+        pipeline.median_rank_error_ = float(state.get('median_rank_error', 0.0))
+        return pipeline
+
+    def save(self, path: str) -> None:
+        """Write the fitted state to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "CleaningPipeline":
+        """Load a fitted pipeline saved with save()."""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+def iter_parquet_chunks(path: str, batch_size: int = 65536, columns: list = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet file as a stream of DataFrames.
+    Args:
+        path: Parquet file
+        batch_size: Rows per chunk (bounds memory use)
+        columns: Subset of columns to read (None reads all)
+    Returns:
+        Iterator of DataFrame chunks
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        # drop pandas metadata so a stored index comes back as an ordinary column
+        yield batch.replace_schema_metadata(None).to_pandas()
+
+def clean_parquet(input_path: str, output_path: str, fill_columns: list = None,
+                  normalize_columns: list = None, drop_threshold: float = None,
+                  batch_size: int = 65536, sketch_k: int = DEFAULT_K,
+                  n_jobs: int = None) -> CleaningPipeline:
+    """
+    Two-pass out-of-core cleaning of a Parquet file larger than memory.
+    Pass one streams the fit columns into CleaningPipeline.fit_chunks() (sketch
+    medians, exact min/max and missing ratios); pass two streams every chunk
+    through transform() into output_path. Peak memory is one chunk plus the
+    sketches, independent of the file size.
+    Args:
+        input_path: Source Parquet file
+        output_path: Destination Parquet file
+        fill_columns: Columns imputed with the (approximate) median
+        normalize_columns: Columns scaled to [0,1]
+        drop_threshold: Drop columns whose missing ratio exceeds this
+        batch_size: Rows per chunk
+        sketch_k: KLL accuracy parameter, see sketches.rank_error()
+        n_jobs: Threads per chunk, see CleaningPipeline
+    Returns:
+        The fitted pipeline (save() it to reuse the statistics at serving time)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pipeline = CleaningPipeline(fill_columns, normalize_columns, drop_threshold, n_jobs)
+    pipeline.fit_chunks(iter_parquet_chunks(input_path, batch_size), sketch_k=sketch_k)
+
+    # Fixed output schema: per-chunk inference would flip types on all-null chunks
+    source = pq.ParquetFile(input_path).schema_arrow.remove_metadata()
+    fields = [pa.field(f.name, pa.float64()) if f.name in pipeline.columns_ else f
+              for f in source if f.name not in pipeline.drop_columns_]
+    schema = pa.schema(fields)
+
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for chunk in pipeline.transform_chunks(iter_parquet_chunks(input_path, batch_size)):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    return pipeline
@@ -0,0 +1,275 @@
+"""
+Chunked, Mergeable Data Profiling
+
+File-level counterpart of utils.analyze_numeric for CSV/Parquet files that
+do not fit in memory. Each chunk is reduced to a ProfilePartial holding, per
+group and numeric column, the count, mean, sum of squared deviations (M2),
+min, max and optionally a KLL quantile sketch. Partials merge exactly (Chan et
+al. pairwise update for mean/M2), so chunks can be profiled on a process pool
+and combined in any grouping; they are merged in chunk order, which keeps the
+output deterministic.
+
+Differences from analyze_numeric on the same data:
+    - count/mean/std/min/max agree to floating point rounding.
+    - Percentiles come from KLL sketches: each one is an observed value whose
+      rank is within sketches.rank_error(sketch_k) (~1.3% for k=200, 99%
+      confidence) of the requested rank, instead of an interpolated value.
+
+Example:
+    table = profile_file('data/raw/prices.parquet', group_col='ticker',
+                         percentiles=[0.05, 0.5, 0.95], workers=4)
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from sketches import DEFAULT_K, KLLSketch
+from utils import (_group_segments, _numeric_columns, _percentile_label,
+                   _resolve_percentiles, _segment_stats, _stats_table)
+
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+
+class ProfilePartial:
+    """
+    Mergeable aggregates for one slice of a dataset.
+
+    Arrays are (groups, columns); an ungrouped profile has a single group.
+    Minima/maxima use +/-inf for "no values yet" so merging is a plain
+    fmin/fmax.
+    """
+
+    def __init__(self, grouped: bool, groups: pd.Index, columns: List, dtypes: dict,
+                 count: np.ndarray, mean: np.ndarray, m2: np.ndarray,
+                 mins: np.ndarray, maxs: np.ndarray, sketches: Optional[dict] = None):
+        self.grouped = grouped
+        self.groups = groups
+        self.columns = list(columns)
+        self.dtypes = dict(dtypes)
+        self.count, self.mean, self.m2 = count, mean, m2
+        self.mins, self.maxs = mins, maxs
+        self.sketches = sketches
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, group_col: str = None,
+                   sketch_k: Optional[int] = None) -> "ProfilePartial":
+        """
+        Aggregate one in-memory chunk.
+        Args:
+            df: Chunk of the dataset
+            group_col: Column to group by (None or absent: ungrouped)
+            sketch_k: Build KLL sketches with this k (None skips percentiles)
+        Returns:
+            ProfilePartial for the chunk
+        """
+        numeric_df, grouped = _numeric_columns(df, group_col)
+        values = numeric_df.to_numpy(dtype=np.float64)
+        if grouped:
+            order, starts, groups = _group_segments(df[group_col])
+            values = np.take(values, order, axis=0)
+        else:
+            starts, groups = np.zeros(1, dtype=np.int64), [0]
+
+        stats = _segment_stats(values, starts)
+        count = stats['count']
+        with np.errstate(invalid='ignore'):
+            m2 = np.where(count > 1, stats['std'] ** 2 * (count - 1), 0.0)
+        mean = np.where(count > 0, stats['mean'], 0.0)
+        mins = np.where(count > 0, stats['min'], np.inf)
+        maxs = np.where(count > 0, stats['max'], -np.inf)
+
+        sketches = None
+        if sketch_k is not None:
+            sketches = {}
+            ends = np.append(starts[1:], len(values))
+            for g, (start, end) in enumerate(zip(starts, ends)):
+                for j, col in enumerate(numeric_df.columns):
+                    if count[g, j]:
+                        sketches[(groups[g], col)] = KLLSketch(sketch_k).update(values[start:end, j])
+
+        return cls(grouped, pd.Index(groups), numeric_df.columns, numeric_df.dtypes.to_dict(),
+                   count, mean, m2, mins, maxs, sketches)
+
+    def merge(self, other: "ProfilePartial") -> "ProfilePartial":
+        """
+        Fold another partial into this one (groups and columns are unioned).
+        Args:
+            other: Partial from another chunk of the same dataset
+        Returns:
+            The merged partial (self)
+        """
+        groups = self.groups.union(other.groups) if self.grouped else self.groups
+        columns = self.columns + [c for c in other.columns if c not in self.dtypes]
+        shape = (len(groups), len(columns))
+
+        def aligned(part, name, fill):
+            out = np.full(shape, fill)
+            rows = groups.get_indexer(part.groups)
+            cols = [columns.index(c) for c in part.columns]
+            out[np.ix_(rows, cols)] = getattr(part, name)
+            return out
+
+        na, nb = aligned(self, 'count', 0.0), aligned(other, 'count', 0.0)
+        ma, mb = aligned(self, 'mean', 0.0), aligned(other, 'mean', 0.0)
+        n = na + nb
+        delta = mb - ma
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = np.where(n > 0, ma + delta * nb / n, 0.0)
+            cross = np.where(n > 0, delta * delta * na * nb / n, 0.0)
+        self.m2 = aligned(self, 'm2', 0.0) + aligned(other, 'm2', 0.0) + cross
+        self.mins = np.fmin(aligned(self, 'mins', np.inf), aligned(other, 'mins', np.inf))
+        self.maxs = np.fmax(aligned(self, 'maxs', -np.inf), aligned(other, 'maxs', -np.inf))
+        self.count = n
+
+        for col, dtype in other.dtypes.items():
+            self.dtypes[col] = np.result_type(self.dtypes[col], dtype) if col in self.dtypes else dtype
+        if self.sketches is not None and other.sketches is not None:
+            for key, sketch in other.sketches.items():
+                if key in self.sketches:
+                    self.sketches[key].merge(sketch)
+                else:
+                    self.sketches[key] = sketch
+        else:
+            self.sketches = None
+        self.groups, self.columns = groups, columns
+        return self
+
+    def to_table(self, group_col: str = None, percentiles: list = None) -> pd.DataFrame:
+        """
+        Final statistics in the same layout as analyze_numeric.
+        Args:
+            group_col: Name for the group index (grouped profiles)
+            percentiles: Quantiles in [0, 1]; same defaults as analyze_numeric
+        Returns:
+            pd.DataFrame
+        """
+        percentiles = _resolve_percentiles(self.grouped, percentiles)
+        if percentiles and self.sketches is None:
+            raise ValueError("Percentiles need a profile built with sketch_k set")
+
+        count = self.count
+        empty = count == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / (count - 1))
+        std[count < 2] = np.nan
+        stats = {
+            'count': count,
+            'mean': np.where(empty, np.nan, self.mean),
+            'std': std,
+            'min': np.where(empty, np.nan, self.mins),
+            'max': np.where(empty, np.nan, self.maxs),
+        }
+        if percentiles:
+            estimates = np.full((len(percentiles),) + count.shape, np.nan)
+            for g, group in enumerate(self.groups):
+                for j, col in enumerate(self.columns):
+                    sketch = self.sketches.get((group, col))
+                    if sketch is not None:
+                        estimates[:, g, j] = sketch.quantiles(percentiles)
+            for q, estimate in zip(percentiles, estimates):
+                stats[_percentile_label(q)] = estimate
+
+        dtypes = [self.dtypes[c] for c in self.columns]
+        index = pd.Index(self.groups, name=group_col) if self.grouped else None
+        return _stats_table(stats, self.columns, dtypes, percentiles, index=index)
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], group_col: str = None,
+                   sketch_k: Optional[int] = DEFAULT_K) -> Optional[ProfilePartial]:
+    """
+    Profile an iterable of DataFrame chunks in this process.
+    Args:
+        chunks: DataFrames with the same columns
+        group_col: Column to group by
+        sketch_k: KLL accuracy parameter (None skips percentiles)
+    Returns:
+        Merged ProfilePartial, or None when there were no chunks
+    """
+    partial = None
+    for chunk in chunks:
+        part = ProfilePartial.from_frame(chunk, group_col, sketch_k)
+        partial = part if partial is None else partial.merge(part)
+    return partial
+
+
+def _profile_row_group(path: str, index: int, columns: Optional[List[str]],
+                       group_col: Optional[str], sketch_k: Optional[int]) -> ProfilePartial:
+    """Worker: read and profile one Parquet row group."""
+    import pyarrow.parquet as pq
+
+    table = pq.ParquetFile(path).read_row_group(index, columns=columns)
+    return ProfilePartial.from_frame(table.replace_schema_metadata(None).to_pandas(),
+                                     group_col, sketch_k)
+
+
+def _profile_frame(df: pd.DataFrame, group_col: Optional[str],
+                   sketch_k: Optional[int]) -> ProfilePartial:
+    """Worker: profile a chunk shipped from the reading process."""
+    return ProfilePartial.from_frame(df, group_col, sketch_k)
+
+
+def profile_file(path: str, group_col: str = None, percentiles: list = None,
+                 chunksize: int = 250_000, workers: int = None, columns: list = None,
+                 sketch_k: int = DEFAULT_K) -> pd.DataFrame:
+    """
+    Profile a CSV or Parquet file chunk by chunk.
+    Without workers, chunks are read and profiled in this process, so memory
+    stays at one chunk. With workers, Parquet row groups are read by the
+    workers themselves; CSV chunks are parsed here and shipped to the pool,
+    with at most 2 * workers chunks in flight.
+    Args:
+        path: .csv or .parquet/.pq file
+        group_col: Column to group by
+        percentiles: Quantiles in [0, 1]; same defaults as analyze_numeric
+        chunksize: Rows per chunk (CSV and in-process Parquet)
+        workers: Process pool size (None or 1 runs in process)
+        columns: Subset of columns to read (group_col is added)
+        sketch_k: KLL accuracy parameter for the percentiles
+    Returns:
+        pd.DataFrame in the analyze_numeric layout
+    """
+    is_parquet = Path(path).suffix.lower() in PARQUET_SUFFIXES
+    if columns is not None and group_col and group_col not in columns:
+        columns = list(columns) + [group_col]
+    grouped = bool(group_col) and (columns is None or group_col in columns)
+    # sketches are only worth building when percentiles will be reported
+    k = sketch_k if _resolve_percentiles(grouped, percentiles) else None
+
+    if is_parquet:
+        from cleaning import iter_parquet_chunks
+        chunks = iter_parquet_chunks(path, chunksize, columns)
+    else:
+        chunks = pd.read_csv(path, chunksize=chunksize, usecols=columns)
+
+    if not workers or workers <= 1:
+        partial = profile_chunks(chunks, group_col, k)
+    else:
+        partial = None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            if is_parquet:
+                import pyarrow.parquet as pq
+                n_groups = pq.ParquetFile(path).num_row_groups
+                futures = [pool.submit(_profile_row_group, str(path), i, columns, group_col, k)
+                           for i in range(n_groups)]
+                for future in futures:
+                    part = future.result()
+                    partial = part if partial is None else partial.merge(part)
+            else:
+                pending = []
+                for chunk in chunks:
+                    pending.append(pool.submit(_profile_frame, chunk, group_col, k))
+                    if len(pending) >= 2 * workers:
+                        part = pending.pop(0).result()
+                        partial = part if partial is None else partial.merge(part)
+                for future in pending:
+                    part = future.result()
+                    partial = part if partial is None else partial.merge(part)
+
+    if partial is None:
+        raise ValueError(f"No rows to profile in {path}")
+    if not partial.columns:
+        raise ValueError("No numeric columns to analyze")
+    return partial.to_table(group_col, percentiles)
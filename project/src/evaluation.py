@@ -11,6 +11,8 @@ from scipy import stats
 from typing import Dict, List, Tuple, Callable, Any
 import warnings
 
+import imputation
+
 # Set default plotting style
 plt.rcParams['figure.figsize'] = (10, 6)
 sns.set_style("whitegrid")
@@ -29,6 +31,151 @@ class SimpleLinReg:
         """Make predictions"""
         return self.intercept_ + self.coef_[0] * X.ravel()
 
+class GroupedLinReg:
+    """
+    One linear regression per group (segment, ticker, ...) fitted in a single pass.
+
+    Rows are sorted by group code once; per-group sums are taken with
+    np.add.reduceat, features are centered on their group means, and the
+    (groups, p, p) normal equations are solved with one batched pinv. Cost is
+    O(rows * p^2) plus O(groups * p^3), with no Python loop over groups, and
+    memory O(rows * p + groups * p^2).
+
+    Groups whose features do not vary (e.g. a single row) get the
+    minimum-norm slope of the centered problem: slope 0 and the group mean
+    as intercept.
+    """
+
+    def fit(self, X, y, groups):
+        """
+        Fit one model per group
+
+        Parameters:
+        -----------
+        X : array-like
+            Features, shape (n,) or (n, p)
+        y : array-like
+            Targets, shape (n,)
+        groups : array-like
+            Group label of every row
+
+        Returns:
+        --------
+        GroupedLinReg : The fitted model
+        """
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(len(X), -1)
+        y = np.asarray(y, dtype=np.float64)
+        codes, uniques = pd.factorize(np.asarray(groups), sort=True)
+        keep = codes >= 0
+        order = np.argsort(codes[keep], kind='stable')
+        sorted_codes = codes[keep][order]
+        Xs, ys = X[keep][order], y[keep][order]
+        if len(ys) == 0:
+            raise ValueError("No rows with a group label to fit")
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        present = sorted_codes[starts]
+
+        n = np.diff(np.r_[starts, len(ys)]).astype(np.float64)
+        x_mean = np.add.reduceat(Xs, starts, axis=0) / n[:, None]
+        y_mean = np.add.reduceat(ys, starts) / n
+        local = _group_positions(starts, len(ys))
+        Xc = Xs - x_mean[local]
+        yc = ys - y_mean[local]
+        # upper-triangle products one pair at a time (no (n, p, p) temporary), mirrored
+        p = Xc.shape[1]
+        sxx = np.empty((len(starts), p, p))
+        product = np.empty(len(ys))
+        for i in range(p):
+            for j in range(i, p):
+                np.multiply(Xc[:, i], Xc[:, j], out=product)
+                sxx[:, i, j] = sxx[:, j, i] = np.add.reduceat(product, starts)
+        sxy = np.add.reduceat(Xc * yc[:, None], starts, axis=0)
+        syy = np.add.reduceat(yc * yc, starts)
+
+        coef = (np.linalg.pinv(sxx) @ sxy[:, :, None])[:, :, 0]
+        sse = np.maximum(syy - np.einsum('gp,gp->g', coef, sxy), 0.0)
+
+        self.groups_ = pd.Index(uniques[present])
+        self.coef_ = coef
+        self.intercept_ = y_mean - np.einsum('gp,gp->g', coef, x_mean)
+        self.n_obs_ = n.astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.rmse_ = np.sqrt(sse / n)
+            self.r2_ = np.where(syy > 0, 1 - sse / syy, np.nan)
+        return self
+
+    def predict(self, X, groups):
+        """
+        Make predictions with each row's group model (NaN for unseen groups)
+
+        Parameters:
+        -----------
+        X : array-like
+            Features, shape (n,) or (n, p)
+        groups : array-like
+            Group label of every row
+
+        Returns:
+        --------
+        np.ndarray : Predictions
+        """
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(len(X), -1)
+        codes = self.groups_.get_indexer(np.asarray(groups))
+        seen = codes >= 0
+        pred = np.full(len(X), np.nan)
+        pred[seen] = self.intercept_[codes[seen]] + np.einsum('np,np->n', X[seen], self.coef_[codes[seen]])
+        return pred
+
+    def coef_table(self, feature_names: List[str] = None) -> pd.DataFrame:
+        """
+        Coefficients and in-sample fit statistics per group
+
+        Parameters:
+        -----------
+        feature_names : list
+            Names of the coefficient columns (default: coef_0, coef_1, ...)
+
+        Returns:
+        --------
+        pd.DataFrame : One row per group with n_obs, intercept, coefficients, rmse and r2
+        """
+        names = feature_names or [f'coef_{j}' for j in range(self.coef_.shape[1])]
+        table = pd.DataFrame(self.coef_, index=self.groups_, columns=names)
+        table.insert(0, 'intercept', self.intercept_)
+        table.insert(0, 'n_obs', self.n_obs_)
+        table['rmse'] = self.rmse_
+        table['r2'] = self.r2_
+        return table
+
+def _group_positions(starts: np.ndarray, n: int) -> np.ndarray:
+    """Group position of every sorted row, from the group start offsets"""
+    return np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+def fit_grouped(df: pd.DataFrame, group_col: str, x_cols: List[str],
+                y_col: str) -> GroupedLinReg:
+    """
+    Fit a GroupedLinReg from dataframe columns (rows with missing values are skipped)
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Data with group, feature and target columns
+    group_col : str
+        Column name for grouping
+    x_cols : list
+        Feature column names
+    y_col : str
+        Target column name
+
+    Returns:
+    --------
+    GroupedLinReg : The fitted model
+    """
+    data = df.dropna(subset=[group_col] + list(x_cols) + [y_col])
+    return GroupedLinReg().fit(data[x_cols].to_numpy(), data[y_col].to_numpy(), data[group_col].to_numpy())
+
 def mean_impute(a: np.ndarray) -> np.ndarray:
     """Impute missing values with mean"""
     m = np.nanmean(a)
@@ -48,8 +195,8 @@ def zero_fill(a: np.ndarray) -> np.ndarray:
     return np.where(np.isnan(a), 0, a)
 
 def forward_fill(a: np.ndarray) -> np.ndarray:
-    """Forward fill missing values"""
-    return pd.Series(a).fillna(method='ffill').fillna(method='bfill').values
+    """Forward fill missing values (leading gaps take the first observed value)"""
+    return imputation.forward_fill(a, backfill=True)
 
 def drop_missing(a: np.ndarray) -> np.ndarray:
     """Drop missing values"""
@@ -0,0 +1,345 @@
+"""
+Vectorized Missing-Value Imputation
+Stage 11: Evaluation & Risk Communication
+
+Column-batched versions of the single-array imputers in evaluation.py. Every
+function takes a 1-D array or a 2-D (rows, columns) array and fills all
+columns in one pass:
+
+- mean_impute / median_impute: column (or per-group) statistic
+- forward_fill / backward_fill: last / next observed value
+- interpolate: linear interpolation by row position or by a time axis
+
+Passing ``groups`` (segment, ticker, ...) computes statistics per group and
+keeps fills and interpolation from crossing group boundaries. Rows are
+assumed to be in time order within each group; groups need not be contiguous.
+
+Forward/backward fill and interpolation avoid a pandas round trip and any
+Python loop over groups or columns: the columns are stacked into one
+sequence in which the missing cells form runs of consecutive positions, and
+the observed cells just before and after each run are both neighbours of
+every hole in it. Beyond one pass over the missing-value mask, work scales
+with the number of missing cells.
+Grouped means use ``np.add.reduceat`` over
+rows sorted by group. Grouped medians use the pandas groupby kernel.
+
+With ``copy=False`` the input array is filled in place and returned; it must
+be a writable float ndarray. Only the missing cells are written.
+
+Example:
+    X = forward_fill(df[cols].to_numpy(), groups=df['ticker'].to_numpy())
+    results = scenario_sensitivity_analysis(x_raw, y, imputation_scenarios(groups=segments))
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+
+from cleaning import _target_frame
+
+STATISTICS = ('mean', 'median')
+
+
+def _as_float_2d(a, copy: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Output array (same shape as a) and a 2-D view of it."""
+    if copy:
+        out = np.array(a, dtype=np.float64)
+    else:
+        if not (isinstance(a, np.ndarray) and a.dtype.kind == 'f' and a.flags.writeable):
+            raise ValueError("copy=False needs a writable float ndarray")
+        out = a
+    if out.ndim > 2:
+        raise ValueError(f"Expected a 1-D or 2-D array, got {out.ndim} dimensions")
+    return out, out[:, None] if out.ndim == 1 else out
+
+
+def _group_layout(groups, n: int) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """
+    Row order that makes groups contiguous, and the group start offsets.
+    The order is stable (time order is kept within a group) and None when
+    the rows are already grouped.
+    """
+    if groups is None:
+        return None, np.zeros(1 if n else 0, dtype=np.int64)
+    codes, _ = pd.factorize(np.asarray(groups))
+    if len(codes) != n:
+        raise ValueError(f"groups has {len(codes)} labels for {n} rows")
+    order = None
+    if n and (np.diff(codes) < 0).any():
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if n else np.zeros(0, dtype=np.int64)
+    return order, starts
+
+
+def _holes(missing: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Missing cells in column-major order: (flat, rows, cols), where
+    flat = col * rows_total + row is the cell's position with columns stacked.
+    """
+    flat = np.flatnonzero(missing.T.ravel())
+    cols, rows = np.divmod(flat, len(missing))
+    return flat, rows, cols
+
+
+def _group_bounds(n: int, starts: np.ndarray, flat: np.ndarray,
+                  rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Stacked positions of the first row and one past the last row of each hole's group."""
+    base = flat - rows
+    if len(starts) == 1:
+        return base, base + n
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))[rows]
+    return base + starts[group], base + np.r_[starts[1:], n][group]
+
+
+def _previous_observed(n: int, starts: np.ndarray, flat: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    Row of the previous observed value of every missing cell within its
+    column and group (-1 if none).
+
+    With the columns stacked, the missing cells form runs of consecutive
+    positions and the previous observed cell is the one just before the run.
+    Run starts are carried forward with maximum.accumulate over the holes
+    only, so no array of observed positions is built.
+    """
+    breaks = np.flatnonzero(np.diff(flat) != 1) + 1
+    run = np.zeros(len(flat), dtype=np.int64)
+    run[breaks] = breaks
+    run_first = flat[np.maximum.accumulate(run)]
+    first, _ = _group_bounds(n, starts, flat, rows)
+    return np.where(run_first > first, run_first - 1 - (flat - rows), -1)
+
+
+def _next_observed(n: int, starts: np.ndarray, flat: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Row of the next observed value of every missing cell within its column and group (n if none)."""
+    breaks = np.flatnonzero(np.diff(flat) != 1)
+    run = np.full(len(flat), len(flat) - 1, dtype=np.int64)
+    run[breaks] = breaks
+    run_last = flat[np.minimum.accumulate(run[::-1])[::-1]]
+    _, end = _group_bounds(n, starts, flat, rows)
+    return np.where(run_last + 1 < end, run_last + 1 - (flat - rows), n)
+
+
+def _gather(x: np.ndarray, src: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """x[src, cols] with NaN where src is a "none" marker (-1 or len(x))."""
+    found = (src >= 0) & (src < len(x))
+    return np.where(found, x[np.where(found, src, 0), cols], np.nan)
+
+
+def _fill(a, groups, copy: bool, filler: Callable) -> np.ndarray:
+    """
+    Shared driver: order rows by group, let filler compute replacement values
+    for the missing cells, and write them back.
+    filler(x, missing, starts, flat, rows, cols) returns the values for x[rows, cols].
+    """
+    out, out2d = _as_float_2d(a, copy)
+    order, starts = _group_layout(groups, len(out2d))
+    x = out2d if order is None else out2d[order]
+    missing = np.isnan(x)
+    flat, rows, cols = _holes(missing)
+    if len(flat) == 0:
+        return out
+    values = filler(x, missing, starts, flat, rows, cols)
+    if order is None:
+        out2d[rows, cols] = values
+    else:
+        out2d[order[rows], cols] = values
+    return out
+
+
+def _group_statistic(x: np.ndarray, missing: np.ndarray, starts: np.ndarray,
+                     statistic: str) -> np.ndarray:
+    """Per-group, per-column mean or median ignoring NaNs; shape (groups, columns)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if len(starts) == 1:
+            return (np.nanmean if statistic == 'mean' else np.nanmedian)(x, axis=0)[None, :]
+        if statistic == 'mean':
+            counts = np.add.reduceat(~missing, starts, axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.add.reduceat(np.where(missing, 0.0, x), starts, axis=0) / counts
+    # grouped medians need a per-group selection; pandas' groupby kernel does
+    # it in one pass over the (already contiguous) groups
+    group_pos = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(x)]))
+    return pd.DataFrame(x, copy=False).groupby(group_pos, sort=True).median().to_numpy()
+
+
+def _statistic_filler(statistic: str, fallback: bool) -> Callable:
+    if statistic not in STATISTICS:
+        raise ValueError(f"statistic must be one of {STATISTICS}, got {statistic!r}")
+
+    def filler(x, missing, starts, flat, rows, cols):
+        stats = _group_statistic(x, missing, starts, statistic)
+        if fallback and len(starts) > 1 and np.isnan(stats).any():
+            # groups without any observed value take the column statistic
+            overall = _group_statistic(x, missing, np.zeros(1, dtype=np.int64), statistic)
+            stats = np.where(np.isnan(stats), overall, stats)
+        group_pos = np.searchsorted(starts, rows, side='right') - 1
+        return stats[group_pos, cols]
+
+    return filler
+
+
+def mean_impute(a, groups=None, fallback: bool = True, copy: bool = True) -> np.ndarray:
+    """
+    Fill missing values with the column mean (per group when groups is given).
+    Args:
+        a: 1-D or 2-D array (rows, columns)
+        groups: Optional group label per row
+        fallback: Groups with no observed value use the overall column mean
+        copy: False fills a in place
+    Returns:
+        Filled array (all-NaN columns stay NaN)
+    """
+    return _fill(a, groups, copy, _statistic_filler('mean', fallback))
+
+
+def median_impute(a, groups=None, fallback: bool = True, copy: bool = True) -> np.ndarray:
+    """
+    Fill missing values with the column median (per group when groups is given).
+    Args:
+        a: 1-D or 2-D array (rows, columns)
+        groups: Optional group label per row
+        fallback: Groups with no observed value use the overall column median
+        copy: False fills a in place
+    Returns:
+        Filled array (all-NaN columns stay NaN)
+    """
+    return _fill(a, groups, copy, _statistic_filler('median', fallback))
+
+
+def forward_fill(a, groups=None, backfill: bool = False, copy: bool = True) -> np.ndarray:
+    """
+    Carry the last observed value forward, within each group.
+    Args:
+        a: 1-D or 2-D array (rows, columns), rows in time order
+        groups: Optional group label per row
+        backfill: Also fill leading gaps with the first observed value
+            (the ffill-then-bfill behavior of evaluation.forward_fill)
+        copy: False fills a in place
+    Returns:
+        Filled array; leading gaps stay NaN unless backfill=True
+    """
+    def filler(x, missing, starts, flat, rows, cols):
+        prev = _previous_observed(len(x), starts, flat, rows)
+        if backfill:
+            prev = np.where(prev < 0, _next_observed(len(x), starts, flat, rows), prev)
+        return _gather(x, prev, cols)
+
+    return _fill(a, groups, copy, filler)
+
+
+def backward_fill(a, groups=None, copy: bool = True) -> np.ndarray:
+    """
+    Carry the next observed value backward, within each group.
+    Args:
+        a: 1-D or 2-D array (rows, columns), rows in time order
+        groups: Optional group label per row
+        copy: False fills a in place
+    Returns:
+        Filled array; trailing gaps stay NaN
+    """
+    def filler(x, missing, starts, flat, rows, cols):
+        return _gather(x, _next_observed(len(x), starts, flat, rows), cols)
+
+    return _fill(a, groups, copy, filler)
+
+
+def interpolate(a, groups=None, positions=None, fill_edges: bool = True,
+                copy: bool = True) -> np.ndarray:
+    """
+    Linear interpolation between the neighbouring observed values, within each group.
+    Args:
+        a: 1-D or 2-D array (rows, columns), rows in time order
+        groups: Optional group label per row
+        positions: Optional time axis per row (numbers or datetime64); values
+            are interpolated in time rather than by row count, so uneven gaps
+            (weekends, halts) are weighted correctly
+        fill_edges: Fill leading/trailing gaps with the nearest observed value
+        copy: False fills a in place
+    Returns:
+        Filled array
+    """
+    if positions is not None:
+        positions = np.asarray(positions)
+        if positions.dtype.kind == 'M':
+            positions = positions.astype('datetime64[ns]').astype(np.int64)
+        positions = positions.astype(np.float64)
+        n_rows = len(np.asarray(a))
+        if len(positions) != n_rows:
+            raise ValueError(f"positions has {len(positions)} values for {n_rows} rows")
+        if groups is not None:
+            order, _ = _group_layout(groups, len(positions))
+            if order is not None:
+                positions = positions[order]
+
+    def filler(x, missing, starts, flat, rows, cols):
+        p = _previous_observed(len(x), starts, flat, rows)
+        q = _next_observed(len(x), starts, flat, rows)
+        left, right = _gather(x, p, cols), _gather(x, q, cols)
+        t = np.arange(len(x), dtype=np.float64) if positions is None else positions
+        inner = (p >= 0) & (q < len(x))
+        t_left = t[np.where(inner, p, 0)]
+        span = t[np.where(inner, q, 0)] - t_left
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(span > 0, (t[rows] - t_left) / span, 0.0)
+        edge = np.where(p >= 0, left, right) if fill_edges else np.nan
+        return np.where(inner, left + weight * (right - left), edge)
+
+    return _fill(a, groups, copy, filler)
+
+
+def impute_frame(df: pd.DataFrame, columns, method: str = 'forward_fill', by: Optional[str] = None,
+                 time_col: Optional[str] = None, inplace: bool = False, **kwargs) -> pd.DataFrame:
+    """
+    Apply one imputation method to several DataFrame columns at once.
+    Args:
+        df: Input DataFrame (rows in time order within each group)
+        columns: Numeric columns to fill
+        method: 'mean', 'median', 'forward_fill', 'backward_fill' or 'interpolate'
+        by: Group column (e.g. 'ticker')
+        time_col: Time column for interpolate (default: row position)
+        inplace: Modify df instead of returning a copy
+        **kwargs: Passed to the imputer (fallback, backfill, fill_edges)
+    Returns:
+        DataFrame with filled columns (df itself when inplace=True)
+    """
+    imputers = {'mean': mean_impute, 'median': median_impute, 'forward_fill': forward_fill,
+                'backward_fill': backward_fill, 'interpolate': interpolate}
+    if method not in imputers:
+        raise ValueError(f"method must be one of {list(imputers)}, got {method!r}")
+    columns = [c for c in columns if c in df.columns]
+    if method == 'interpolate' and time_col is not None:
+        kwargs['positions'] = df[time_col].to_numpy()
+    groups = df[by].to_numpy() if by is not None else None
+    filled = imputers[method](df[columns].to_numpy(dtype=np.float64), groups=groups, **kwargs)
+    out = _target_frame(df, inplace)
+    out[columns] = filled
+    return out
+
+
+def imputation_scenarios(groups=None, positions=None) -> Dict[str, Callable]:
+    """
+    Imputers as single-argument scenarios for evaluation.scenario_sensitivity_analysis.
+    Args:
+        groups: Optional group label per row; adds per-group variants
+        positions: Optional time axis per row for the interpolation scenarios
+    Returns:
+        dict of scenario name -> fn(x) returning the filled array
+    """
+    scenarios = {
+        'mean_impute': mean_impute,
+        'median_impute': median_impute,
+        'forward_fill': partial(forward_fill, backfill=True),
+        'interpolate': partial(interpolate, positions=positions),
+    }
+    if groups is not None:
+        scenarios.update({
+            'group_mean_impute': partial(mean_impute, groups=groups),
+            'group_median_impute': partial(median_impute, groups=groups),
+            'group_forward_fill': partial(forward_fill, groups=groups, backfill=True),
+            'group_interpolate': partial(interpolate, groups=groups, positions=positions),
+        })
+    return scenarios
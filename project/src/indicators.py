@@ -0,0 +1,393 @@
+"""
+Rolling-Window Technical Indicator Kernels
+
+O(n) NumPy implementations of the rolling and recursive indicators used by the
+feature engineering steps (moving averages, volatility, EMA, RSI, Bollinger
+bands, ATR, rolling z-scores). Every kernel works along axis 0, so a 2-D array
+with one column per ticker is processed in a single call without per-row Python.
+
+Numerical notes:
+    - Rolling sums come from cumulative sums that restart every ``block`` rows,
+      on values centered by their block mean. Rounding error is bounded by the
+      block length instead of growing with the full series length.
+    - Recursive filters (EMA/Wilder smoothing) use the closed form of the
+      recurrence, evaluated in blocks short enough that the decay factors never
+      overflow.
+    - NaN handling mirrors pandas: rolling windows need ``min_periods`` valid
+      values, and EMAs skip missing observations (``ignore_na=True``).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BLOCK = 4096
+
+
+def _as_float(x) -> np.ndarray:
+    """Convert input to a float64 array (views are kept when possible)."""
+    return np.asarray(x, dtype=np.float64)
+
+
+def _rolling_moments(x, window: int, min_periods: Optional[int], block: int,
+                     squares: bool = True):
+    """
+    Windowed count, sum and sum of squares for every row, in O(n).
+
+    Rows are split into blocks of at least ``window`` rows. Inside a block the
+    values are centered on the block mean and accumulated with a cumulative
+    sum that restarts at the block boundary. A window crosses at most one
+    boundary; the part that falls in the previous block is re-centered on the
+    current block mean before it is added. Everything is slicing on the
+    (blocks, rows, ...) view, so there are no gathers.
+
+    Returns:
+        tuple: (count, centered sum, centered sum of squares or None,
+        row center, min_periods mask), where the sums are relative to the
+        row center
+    """
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    x = _as_float(x)
+    n, tail = x.shape[0], x.shape[1:]
+    block = max(block, window)
+    n_blocks = max(-(-n // block), 1)
+    pad = n_blocks * block - n
+    complete = n > 0 and not np.isnan(x).any()
+    if pad:
+        # Padding rows come after every real row, so they never enter a window
+        filler = np.broadcast_to(x[-1], (pad,) + tail) if complete else np.full((pad,) + tail, np.nan)
+        x = np.concatenate([x, filler])
+
+    xb = x.reshape((n_blocks, block) + tail)
+    if complete:
+        # Fast path without missing values: running counts are just 1..block
+        centers = xb.mean(axis=1)
+        xc = xb - centers[:, None]
+        cum_count = np.broadcast_to(
+            np.arange(1, block + 1, dtype=np.float64).reshape((1, block) + (1,) * len(tail)),
+            xb.shape)
+    else:
+        valid = ~np.isnan(xb)
+        counts = valid.sum(axis=1)
+        xc = np.where(valid, xb, 0.0)
+        centers = xc.sum(axis=1) / np.maximum(counts, 1)
+        xc -= centers[:, None]
+        xc[~valid] = 0.0
+        cum_count = valid.cumsum(axis=1, dtype=np.float64)
+    sums = [cum_count, xc.cumsum(axis=1)]
+    if squares:
+        xc *= xc
+        sums.append(xc.cumsum(axis=1))
+    del xc
+
+    out = [c.copy() for c in sums]
+    for o, c in zip(out, sums):
+        o[:, window:] -= c[:, :-window]
+
+    if n_blocks > 1:
+        # Rows r < window reach back into the previous block: add its tail
+        prev = [c[:-1, -1:] - c[:-1, block - window:] for c in sums]
+        n1, t1 = prev[0], prev[1]
+        d = (centers[:-1] - centers[1:])[:, None]
+        if squares:
+            out[2][1:, :window] += prev[2] + 2.0 * d * t1 + n1 * d * d
+        out[1][1:, :window] += t1 + n1 * d
+        out[0][1:, :window] += n1
+
+    flat = (n_blocks * block,) + tail
+    count, s1 = out[0].reshape(flat)[:n], out[1].reshape(flat)[:n]
+    s2 = out[2].reshape(flat)[:n] if squares else None
+    row_center = np.broadcast_to(centers[:, None], (n_blocks, block) + tail).reshape(flat)[:n]
+
+    min_periods = window if min_periods is None else min_periods
+    enough = count >= max(min_periods, 1)
+    return count, s1, s2, row_center, enough
+
+
+def rolling_mean(x, window: int, min_periods: Optional[int] = None,
+                 block: int = DEFAULT_BLOCK) -> np.ndarray:
+    """
+    Trailing rolling mean, equivalent to ``pd.Series.rolling(window).mean()``.
+
+    Args:
+        x: 1-D series or 2-D array (rows = time, columns = series)
+        window: Window length in rows
+        min_periods: Minimum valid values per window (default: window)
+        block: Cumulative-sum restart interval (numerical stability)
+
+    Returns:
+        np.ndarray: Rolling mean with NaN where the window is incomplete
+    """
+    count, s1, _, center, enough = _rolling_moments(x, window, min_periods, block,
+                                                    squares=False)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(enough, s1 / count + center, np.nan)
+
+
+def rolling_std(x, window: int, ddof: int = 1, min_periods: Optional[int] = None,
+                block: int = DEFAULT_BLOCK) -> np.ndarray:
+    """
+    Trailing rolling standard deviation (pandas ``.rolling(window).std(ddof)``).
+
+    Args:
+        x: 1-D series or 2-D array (rows = time, columns = series)
+        window: Window length in rows
+        ddof: Delta degrees of freedom (1 = sample, 0 = population)
+        min_periods: Minimum valid values per window (default: window)
+        block: Cumulative-sum restart interval (numerical stability)
+
+    Returns:
+        np.ndarray: Rolling standard deviation
+    """
+    count, s1, s2, _, enough = _rolling_moments(x, window, min_periods, block)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (s2 - s1 * s1 / count) / (count - ddof)
+    return np.sqrt(np.where(enough & (count - ddof > 0), np.maximum(var, 0.0), np.nan))
+
+
+def rolling_zscore(x, window: int, ddof: int = 1,
+                   min_periods: Optional[int] = None) -> np.ndarray:
+    """
+    Rolling z-score: distance of each value from its trailing window mean,
+    in units of the trailing window standard deviation.
+    """
+    x = _as_float(x)
+    mean = rolling_mean(x, window, min_periods)
+    std = rolling_std(x, window, ddof, min_periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (x - mean) / std
+    z[~np.isfinite(z)] = np.nan
+    return z
+
+
+def ema(x, span: Optional[float] = None, alpha: Optional[float] = None,
+        min_periods: int = 0) -> np.ndarray:
+    """
+    Exponential moving average without bias adjustment.
+
+    Equivalent to ``pd.Series.ewm(span=..., adjust=False, ignore_na=True).mean()``:
+    the average starts at the first valid value and missing observations hold
+    the previous value.
+
+    Args:
+        x: 1-D series or 2-D array (rows = time, columns = series)
+        span: Span of the EMA (alpha = 2 / (span + 1))
+        alpha: Smoothing factor in (0, 1]; overrides span
+        min_periods: Valid observations required before emitting a value
+
+    Returns:
+        np.ndarray: Exponential moving average
+    """
+    if alpha is None:
+        if span is None or span < 1:
+            raise ValueError("Provide span >= 1 or alpha in (0, 1]")
+        alpha = 2.0 / (span + 1.0)
+    if not 0 < alpha <= 1:
+        raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+
+    x = _as_float(x)
+    if len(x) and not np.isnan(x).any():
+        # Fast path: constant decay, so the powers can be precomputed once
+        out = np.empty_like(x)
+        out[0] = x[0]
+        out[1:] = _geometric_filter(alpha * x[1:], 1.0 - alpha, x[0])
+        if min_periods > 1:
+            out[:min_periods - 1] = np.nan
+        return out
+
+    valid = ~np.isnan(x)
+    seen = np.cumsum(valid, axis=0)
+    started = seen > 0
+    first = seen == 1
+    first &= valid
+
+    if alpha == 1.0:
+        out = _ffill_valid(x, valid)
+    else:
+        # y_t = d_t * y_{t-1} + w_t * x_t, seeded with the first valid value
+        init = np.where(first, x, 0.0).sum(axis=0)
+        step = valid & ~first
+        log_decay = np.where(step, np.log1p(-alpha), 0.0)
+        weighted = np.where(step, alpha * np.nan_to_num(x), 0.0)
+        out = _linear_recurrence(log_decay, weighted, init, alpha)
+
+    out = np.where(started, out, np.nan)
+    if min_periods > 1:
+        out = np.where(seen >= min_periods, out, np.nan)
+    return out
+
+
+def _ffill_valid(x: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Forward fill NaNs along axis 0 using index propagation."""
+    idx = np.where(valid, np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1)), 0)
+    idx = np.maximum.accumulate(idx, axis=0)
+    return np.take_along_axis(x, idx, axis=0) if x.ndim > 1 else x[idx]
+
+
+def _linear_recurrence(log_decay: np.ndarray, weighted: np.ndarray,
+                       init, alpha: float) -> np.ndarray:
+    """
+    Evaluate ``y_t = exp(log_decay_t) * y_{t-1} + weighted_t`` in closed form.
+
+    Within a block, ``y_t = P_t * (y_start + sum_k weighted_k / P_k)`` with
+    ``P_t`` the cumulative decay. Blocks are sized so ``1 / P_k`` stays far
+    from overflow; only the block boundaries are visited in Python.
+    """
+    n = log_decay.shape[0]
+    max_log = 600.0
+    block = max(1, int(max_log / -np.log1p(-alpha)))
+    out = np.empty_like(weighted)
+    state = np.asarray(init, dtype=np.float64)
+
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        L = np.cumsum(log_decay[start:stop], axis=0)
+        acc = np.cumsum(weighted[start:stop] * np.exp(-L), axis=0)
+        out[start:stop] = np.exp(L) * (state + acc)
+        state = out[stop - 1]
+    return out
+
+
+def _geometric_filter(v: np.ndarray, r: float, state) -> np.ndarray:
+    """Evaluate ``y_t = r * y_{t-1} + v_t`` starting from ``state``, blockwise."""
+    out = np.empty_like(v)
+    if r == 0.0:
+        out[:] = v
+        return out
+    block = max(1, int(600.0 / -np.log(r)))
+    powers = r ** np.arange(1, min(block, len(v)) + 1, dtype=np.float64)
+    powers = powers.reshape((-1,) + (1,) * (v.ndim - 1))
+    state = np.asarray(state, dtype=np.float64)
+
+    for start in range(0, len(v), block):
+        stop = min(start + block, len(v))
+        p = powers[:stop - start]
+        out[start:stop] = p * (state + np.cumsum(v[start:stop] / p, axis=0))
+        state = out[stop - 1]
+    return out
+
+
+def wilder_smooth(x, window: int) -> np.ndarray:
+    """Wilder's smoothing (EMA with alpha = 1 / window, min_periods = window)."""
+    return ema(x, alpha=1.0 / window, min_periods=window)
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing.
+
+    Args:
+        close: Closing prices (1-D or 2-D, rows = time)
+        window: Look-back period
+
+    Returns:
+        np.ndarray: RSI in [0, 100], NaN for the first ``window`` rows
+    """
+    close = _as_float(close)
+    out = np.full_like(close, np.nan)
+    if len(close) < 2:
+        return out
+    # Row 0 has no previous close; smoothing starts on the first difference
+    delta = close[1:] - close[:-1]
+    gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+    avg_gain = wilder_smooth(gain, window)
+    avg_loss = wilder_smooth(loss, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[1:] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def bollinger_bands(close, window: int = 20, num_std: float = 2.0,
+                    ddof: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger bands around a rolling mean.
+
+    Returns:
+        tuple: (middle, upper, lower) bands
+    """
+    mid = rolling_mean(close, window)
+    width = num_std * rolling_std(close, window, ddof=ddof)
+    return mid, mid + width, mid - width
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    """
+    Average True Range with Wilder smoothing.
+
+    True range is the largest of high - low, |high - previous close| and
+    |low - previous close|; the first row falls back to high - low.
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    true_range = np.fmax(high - low,
+                         np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return wilder_smooth(true_range, window)
+
+
+def shift(x, periods: int = 1) -> np.ndarray:
+    """Shift along axis 0, filling vacated rows with NaN (like ``Series.shift``)."""
+    x = _as_float(x)
+    out = np.full_like(x, np.nan)
+    if periods > 0:
+        out[periods:] = x[:-periods]
+    elif periods < 0:
+        out[:periods] = x[-periods:]
+    else:
+        out[:] = x
+    return out
+
+
+def add_technical_indicators(df: pd.DataFrame, spec: Dict[str, Dict],
+                             price_col: str = 'Close', lag: int = 1) -> List[str]:
+    """
+    Append indicator columns to ``df`` in place.
+
+    Indicators are computed on data up to each row and then lagged by ``lag``
+    rows, so a lag of 1 only uses information available before the row
+    (no look-ahead leakage).
+
+    Args:
+        df: DataFrame with ``price_col`` (and High/Low for ATR)
+        spec: Mapping of indicator name to parameters, e.g.
+            ``{"ema": {"span": 12}, "rsi": {"window": 14},
+            "bollinger": {"window": 20, "num_std": 2},
+            "atr": {"window": 14}, "zscore": {"window": 20}}``
+        price_col: Column the price-based indicators are computed from
+        lag: Rows to shift every indicator by
+
+    Returns:
+        list: Names of the columns that were added
+    """
+    price = df[price_col].to_numpy(dtype=np.float64)
+    created = {}
+
+    for name, params in spec.items():
+        params = params or {}
+        if name == 'ema':
+            span = params.get('span', 12)
+            created[f'ema_{span}_prev'] = ema(price, span=span)
+        elif name == 'rsi':
+            window = params.get('window', 14)
+            created[f'rsi_{window}_prev'] = rsi(price, window)
+        elif name == 'bollinger':
+            window = params.get('window', 20)
+            mid, upper, lower = bollinger_bands(price, window, params.get('num_std', 2.0))
+            created[f'bb_mid_{window}_prev'] = mid
+            created[f'bb_upper_{window}_prev'] = upper
+            created[f'bb_lower_{window}_prev'] = lower
+        elif name == 'atr':
+            window = params.get('window', 14)
+            created[f'atr_{window}_prev'] = atr(df['High'], df['Low'], price, window)
+        elif name == 'zscore':
+            window = params.get('window', 20)
+            created[f'zscore_{window}_prev'] = rolling_zscore(price, window)
+        else:
+            raise ValueError(f"Unknown technical indicator: {name}")
+
+    for col, values in created.items():
+        df[col] = shift(values, lag)
+    return list(created)
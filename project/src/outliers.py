@@ -0,0 +1,664 @@
+"""
+Vectorized Outlier Detection and Treatment
+Stage 07: Outliers, Risk & Assumptions
+
+Detects outliers in many numeric columns at once and treats them by flagging,
+clipping to the detection bounds, or winsorizing to quantiles. Every method
+reduces to a lower and an upper bound per column:
+
+    iqr       [Q1 - k * IQR, Q3 + k * IQR]                     (k = 1.5)
+    zscore    mean +/- threshold * std (ddof=0)                 (threshold = 3)
+    mad       median +/- threshold * 1.4826 * MAD               (threshold = 3.5)
+    quantile  [lower quantile, upper quantile]                  (5% / 95%)
+
+The statistics are column-wise NumPy reductions over a (rows, columns) array.
+With ``by`` (e.g. 'ticker') they are computed per group, and with ``window``
+over the trailing ``window`` rows of each row (within its group), so a regime
+change does not flag a whole year of data. Bounds that cannot be computed
+(all-NaN column, too few values in a window, zero spread for MAD) never flag
+anything.
+
+Assumptions: values are float-like; rolling windows rely on the rows being
+in time order within each group; NaNs are ignored by the statistics and are
+never flagged.
+
+Example:
+    mask = detect_outliers(df, ['daily_return', 'daily_return_2'], method='mad')
+    clean = treat_outliers(df, method='iqr', treatment='clip', by='ticker')
+    detector = OutlierDetector(['daily_return'], method='iqr').fit(train_df)
+    detector.save('model/outlier_bounds.json')
+    treat_file('data/raw/returns.parquet', 'data/processed/returns.parquet',
+               method='zscore', window=63, by='ticker')
+"""
+
+import json
+import warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import indicators
+from cleaning import _target_frame, iter_parquet_chunks
+from sketches import DEFAULT_K, KLLSketch, rank_error
+
+METHODS = ('iqr', 'zscore', 'mad', 'quantile')
+TREATMENTS = ('flag', 'clip', 'winsorize')
+DEFAULT_THRESHOLDS = {'zscore': 3.0, 'mad': 3.5}
+# MAD of a normal distribution is 0.6745 sigma; scaling makes thresholds comparable to z-scores
+MAD_SCALE = 1.4826
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+# upper bound on the (rows, columns, window) scratch array of the rolling methods
+ROLLING_BLOCK_BYTES = 64 * 1024 ** 2
+
+
+def _check_method(method: str, treatment: str = None) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    if treatment is not None and treatment not in TREATMENTS:
+        raise ValueError(f"Unknown treatment '{treatment}', expected one of {TREATMENTS}")
+
+
+def _numeric_columns(df: pd.DataFrame, columns: Optional[List[str]], by: Optional[str]) -> List[str]:
+    """Requested columns, or every numeric column except the group column."""
+    if columns is None:
+        columns = df.select_dtypes(include=np.number).columns.tolist()
+    columns = [c for c in columns if c != by]
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"Columns not found: {missing}")
+    return columns
+
+
+def _finite_bounds(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Replace undefined bounds by -inf/+inf so they never flag or clip."""
+    return np.where(np.isnan(lo), -np.inf, lo), np.where(np.isnan(hi), np.inf, hi)
+
+
+def _static_bounds(values: np.ndarray, method: str, k: float, threshold: float,
+                   lower: float, upper: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-column bounds of a (rows, columns) float array."""
+    # all-NaN columns warn and give NaN bounds, which _finite_bounds neutralises
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if method == 'iqr':
+            q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+            return q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+        if method == 'quantile':
+            lo, hi = np.nanquantile(values, [lower, upper], axis=0)
+            return lo, hi
+        if method == 'zscore':
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0)
+            std = np.where(std > 0, std, 1.0)  # constant column: as the stage07 notebook
+            return mean - threshold * std, mean + threshold * std
+        median = np.nanmedian(values, axis=0)
+        scale = MAD_SCALE * np.nanmedian(np.abs(values - median), axis=0)
+        scale = np.where(scale > 0, scale, np.nan)
+        return median - threshold * scale, median + threshold * scale
+
+
+def _sorted_quantile(sorted_values: np.ndarray, count: np.ndarray, q: float) -> np.ndarray:
+    """
+    Linear-interpolated quantile along the last axis of NaN-last sorted data,
+    given the number of valid values per row (same as np.nanquantile).
+    """
+    pos = q * np.maximum(count - 1, 0)
+    below = np.floor(pos).astype(np.intp)
+    above = np.minimum(below + 1, np.maximum(count - 1, 0))
+    frac = pos - below
+    lo = np.take_along_axis(sorted_values, below[..., None], axis=-1)[..., 0]
+    hi = np.take_along_axis(sorted_values, above[..., None], axis=-1)[..., 0]
+    return lo + frac * (hi - lo)
+
+
+def _rolling_bounds(values: np.ndarray, method: str, window: int, min_periods: int,
+                    k: float, threshold: float, lower: float,
+                    upper: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Bounds from the trailing window (current row included) of every row."""
+    n, m = values.shape
+    if method == 'zscore':
+        mean = indicators.rolling_mean(values, window, min_periods)
+        std = indicators.rolling_std(values, window, ddof=0, min_periods=min_periods)
+        std = np.where(std > 0, std, 1.0)
+        return mean - threshold * std, mean + threshold * std
+
+    lo, hi = np.full((n, m), np.nan), np.full((n, m), np.nan)
+    if n == 0 or m == 0:
+        return lo, hi
+    # NaN rows in front give the first rows a (partial) window of their own
+    padded = np.concatenate([np.full((window - 1, m), np.nan), values])
+    step = max(1, ROLLING_BLOCK_BYTES // (8 * m * window))
+    for start in range(0, n, step):
+        stop = min(n, start + step)
+        windows = np.lib.stride_tricks.sliding_window_view(
+            padded[start:stop + window - 1], window, axis=0)
+        # NaNs sort last, so the valid values of each window are a prefix
+        ordered = np.sort(windows, axis=-1)
+        count = window - np.isnan(windows).sum(axis=-1)
+        if method == 'iqr':
+            q1 = _sorted_quantile(ordered, count, 0.25)
+            q3 = _sorted_quantile(ordered, count, 0.75)
+            block_lo, block_hi = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+        elif method == 'quantile':
+            block_lo = _sorted_quantile(ordered, count, lower)
+            block_hi = _sorted_quantile(ordered, count, upper)
+        else:
+            median = _sorted_quantile(ordered, count, 0.5)
+            deviations = np.sort(np.abs(windows - median[..., None]), axis=-1)
+            scale = MAD_SCALE * _sorted_quantile(deviations, count, 0.5)
+            scale = np.where(scale > 0, scale, np.nan)
+            block_lo, block_hi = median - threshold * scale, median + threshold * scale
+        enough = count >= min_periods
+        lo[start:stop] = np.where(enough, block_lo, np.nan)
+        hi[start:stop] = np.where(enough, block_hi, np.nan)
+    return lo, hi
+
+
+def _group_slices(keys: pd.Series) -> Tuple[np.ndarray, List[Tuple[object, np.ndarray]]]:
+    """
+    Stable sort order of the rows by group and the sorted positions of each
+    group; rows with a missing key form no group.
+    """
+    codes, uniques = pd.factorize(keys, sort=False)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    edges = np.searchsorted(sorted_codes, np.arange(len(uniques) + 1), side='left')
+    groups = [(uniques[g], np.arange(edges[g], edges[g + 1])) for g in range(len(uniques))]
+    return order, groups
+
+
+def _row_bounds(values: np.ndarray, method: str, keys: Optional[pd.Series], window: Optional[int],
+                min_periods: Optional[int], k: float, threshold: float, lower: float,
+                upper: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower and upper bound for every cell of values (rows, columns)."""
+    if window is not None:
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        min_periods = window if min_periods is None else min_periods
+
+    def compute(part: np.ndarray):
+        if window is not None:
+            return _rolling_bounds(part, method, window, min_periods, k, threshold, lower, upper)
+        lo, hi = _static_bounds(part, method, k, threshold, lower, upper)
+        return np.broadcast_to(lo, part.shape), np.broadcast_to(hi, part.shape)
+
+    if keys is None:
+        lo, hi = compute(values)
+        return _finite_bounds(lo, hi)
+
+    # one sort brings every group together; each group is one vectorized call
+    order, groups = _group_slices(keys)
+    ordered = values[order]
+    lo, hi = np.full(values.shape, np.nan), np.full(values.shape, np.nan)
+    for _, positions in groups:
+        if len(positions):
+            rows = slice(positions[0], positions[-1] + 1)
+            lo[order[rows]], hi[order[rows]] = compute(ordered[rows])
+    return _finite_bounds(lo, hi)
+
+
+def outlier_bounds(df: pd.DataFrame, columns: Optional[List[str]] = None, method: str = 'iqr',
+                   by: Optional[str] = None, window: Optional[int] = None,
+                   min_periods: Optional[int] = None, k: float = 1.5,
+                   threshold: Optional[float] = None, lower: float = 0.05,
+                   upper: float = 0.95) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Lower and upper outlier bound for every cell.
+    Args:
+        df: Input DataFrame
+        columns: Columns to check (default: every numeric column except by)
+        method: 'iqr', 'zscore', 'mad' or 'quantile'
+        by: Group column; statistics are computed per group
+        window: Trailing window length in rows (None uses all rows of the group)
+        min_periods: Valid values a window needs (default: window)
+        k: IQR multiplier
+        threshold: z-score/MAD cutoff (default 3.0 / 3.5)
+        lower: Lower quantile for method='quantile'
+        upper: Upper quantile for method='quantile'
+    Returns:
+        (lower, upper) DataFrames aligned with df[columns]; -inf/+inf where a
+        bound is undefined
+    """
+    _check_method(method)
+    columns = _numeric_columns(df, columns, by)
+    threshold = DEFAULT_THRESHOLDS.get(method) if threshold is None else threshold
+    values = df[columns].to_numpy(dtype=np.float64)
+    lo, hi = _row_bounds(values, method, df[by] if by else None, window, min_periods,
+                         k, threshold, lower, upper)
+    return (pd.DataFrame(lo, index=df.index, columns=columns),
+            pd.DataFrame(hi, index=df.index, columns=columns))
+
+
+def detect_outliers(df: pd.DataFrame, columns: Optional[List[str]] = None, method: str = 'iqr',
+                    by: Optional[str] = None, window: Optional[int] = None, **params) -> pd.DataFrame:
+    """
+    Boolean outlier mask (True outside the bounds, NaN cells are False).
+    Args:
+        df: Input DataFrame
+        columns: Columns to check (default: every numeric column except by)
+        method: 'iqr', 'zscore', 'mad' or 'quantile'
+        by: Group column (e.g. 'ticker')
+        window: Trailing window length for rolling bounds
+        **params: min_periods, k, threshold, lower, upper (see outlier_bounds)
+    Returns:
+        DataFrame of bools aligned with df[columns]
+    """
+    lo, hi = outlier_bounds(df, columns, method, by, window, **params)
+    values = df[lo.columns].to_numpy(dtype=np.float64)
+    mask = (values < lo.to_numpy()) | (values > hi.to_numpy())
+    return pd.DataFrame(mask, index=df.index, columns=lo.columns)
+
+
+def _apply_treatment(out: pd.DataFrame, columns: List[str], values: np.ndarray, lo: np.ndarray,
+                     hi: np.ndarray, treatment: str, flag_suffix: str) -> pd.DataFrame:
+    """Write clipped values or flag columns into out."""
+    if treatment == 'flag':
+        mask = (values < lo) | (values > hi)
+        out[[f'{c}{flag_suffix}' for c in columns]] = mask
+        return out
+    # NaN values stay NaN: np.clip propagates them
+    out[columns] = np.clip(values, lo, hi)
+    return out
+
+
+def treat_outliers(df: pd.DataFrame, columns: Optional[List[str]] = None, method: str = 'iqr',
+                   treatment: str = 'clip', by: Optional[str] = None,
+                   window: Optional[int] = None, inplace: bool = False,
+                   flag_suffix: str = '_outlier', **params) -> pd.DataFrame:
+    """
+    Flag, clip or winsorize outliers in many columns at once.
+    Assumption: clipping keeps every row (unlike dropping), which preserves the
+    time index for later rolling features.
+    Args:
+        df: Input DataFrame
+        columns: Columns to treat (default: every numeric column except by)
+        method: Detection method for 'flag' and 'clip'
+        treatment: 'flag' adds a boolean <column><flag_suffix> per column,
+            'clip' clips to the detection bounds, 'winsorize' clips to the
+            lower/upper quantiles (method is ignored)
+        by: Group column (e.g. 'ticker')
+        window: Trailing window length for rolling bounds
+        inplace: Modify df instead of returning a copy
+        flag_suffix: Suffix of the flag columns
+        **params: min_periods, k, threshold, lower, upper (see outlier_bounds)
+    Returns:
+        Treated DataFrame (df itself when inplace=True)
+    """
+    if treatment == 'winsorize':
+        method = 'quantile'
+    _check_method(method, treatment)
+    columns = _numeric_columns(df, columns, by)
+    lo, hi = outlier_bounds(df, columns, method, by, window, **params)
+    values = df[columns].to_numpy(dtype=np.float64)
+    out = _target_frame(df, inplace)
+    return _apply_treatment(out, columns, values, lo.to_numpy(), hi.to_numpy(), treatment, flag_suffix)
+
+
+def winsorize(df: pd.DataFrame, columns: Optional[List[str]] = None, lower: float = 0.05,
+              upper: float = 0.95, by: Optional[str] = None, window: Optional[int] = None,
+              inplace: bool = False) -> pd.DataFrame:
+    """
+    Clip each column to its [lower, upper] quantiles (per group / window).
+    Args:
+        df: Input DataFrame
+        columns: Columns to winsorize (default: every numeric column except by)
+        lower: Lower quantile
+        upper: Upper quantile
+        by: Group column
+        window: Trailing window length for rolling quantiles
+        inplace: Modify df instead of returning a copy
+    Returns:
+        Winsorized DataFrame (df itself when inplace=True)
+    """
+    return treat_outliers(df, columns, treatment='winsorize', by=by, window=window,
+                          inplace=inplace, lower=lower, upper=upper)
+
+
+def outlier_summary(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                    methods: Iterable[str] = ('iqr', 'zscore', 'mad'),
+                    by: Optional[str] = None, window: Optional[int] = None) -> pd.DataFrame:
+    """
+    Outlier counts and shares per column for several methods side by side.
+    Args:
+        df: Input DataFrame
+        columns: Columns to check
+        methods: Methods to compare (default parameters)
+        by: Group column
+        window: Trailing window length for rolling bounds
+    Returns:
+        DataFrame indexed by (method, column) with 'outliers' and 'share'
+    """
+    frames = []
+    for method in methods:
+        mask = detect_outliers(df, columns, method, by, window)
+        valid = df[mask.columns].notna().sum().to_numpy()
+        frames.append(pd.DataFrame({
+            'method': method,
+            'column': mask.columns,
+            'outliers': mask.sum().to_numpy(),
+            'share': mask.sum().to_numpy() / np.maximum(valid, 1),
+        }))
+    return pd.concat(frames, ignore_index=True).set_index(['method', 'column'])
+
+
+class _RunningMoments:
+    """Mergeable count/mean/M2 per column (Chan et al. parallel variance)."""
+
+    def __init__(self, n_columns: int):
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    def update(self, values: np.ndarray) -> None:
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0).astype(np.float64)
+        if not count.any():
+            return
+        with np.errstate(all='ignore'):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+            m2 = np.nansum(np.where(valid, values - mean, 0.0) ** 2, axis=0)
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = self.m2 + m2 + np.where(total > 0, delta ** 2 * self.count * count / total, 0.0)
+        self.count = total
+
+    def std(self) -> np.ndarray:
+        with np.errstate(all='ignore'):
+            return np.where(self.count > 0, np.sqrt(self.m2 / self.count), np.nan)
+
+
+class OutlierDetector:
+    """
+    Fit/transform version of treat_outliers with fixed bounds.
+    Assumption: bounds fitted on training data are the ones to apply to new
+    batches and at serving time, like CleaningPipeline.
+
+    fit() computes exact bounds; fit_chunks() streams data that does not fit
+    in memory (mean/std exactly, quantiles and MAD from KLL sketches, see
+    sketches.rank_error()). With ``by`` there is one set of bounds per group;
+    rows of groups not seen during fitting are left untouched. The fitted
+    bounds round-trip through save()/load() as JSON.
+
+    Example:
+        detector = OutlierDetector(['daily_return'], method='mad', by='ticker').fit(train_df)
+        clipped = detector.transform(new_df)
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None, method: str = 'iqr',
+                 treatment: str = 'clip', by: Optional[str] = None, k: float = 1.5,
+                 threshold: Optional[float] = None, lower: float = 0.05, upper: float = 0.95,
+                 flag_suffix: str = '_outlier'):
+        """
+        Args:
+            columns: Columns to treat (default: numeric columns of the fit data)
+            method: 'iqr', 'zscore', 'mad' or 'quantile'
+            treatment: 'flag', 'clip' or 'winsorize' (see treat_outliers)
+            by: Group column
+            k: IQR multiplier
+            threshold: z-score/MAD cutoff (default 3.0 / 3.5)
+            lower: Lower quantile for 'quantile'/'winsorize'
+            upper: Upper quantile for 'quantile'/'winsorize'
+            flag_suffix: Suffix of the flag columns
+        """
+        self.method = 'quantile' if treatment == 'winsorize' else method
+        _check_method(self.method, treatment)
+        self.columns = list(columns) if columns is not None else None
+        self.treatment = treatment
+        self.by = by
+        self.k = k
+        self.threshold = DEFAULT_THRESHOLDS.get(self.method) if threshold is None else threshold
+        self.lower = lower
+        self.upper = upper
+        self.flag_suffix = flag_suffix
+        self.columns_ = None
+
+    def _params(self) -> tuple:
+        return self.k, self.threshold, self.lower, self.upper
+
+    def fit(self, df: pd.DataFrame) -> "OutlierDetector":
+        """
+        Compute exact bounds from df.
+        Args:
+            df: Training DataFrame
+        Returns:
+            The fitted detector
+        """
+        self.columns_ = _numeric_columns(df, self.columns, self.by)
+        values = df[self.columns_].to_numpy(dtype=np.float64)
+        self.bounds_ = {}
+        if self.by is None:
+            self.bounds_[None] = _static_bounds(values, self.method, *self._params())
+        else:
+            order, groups = _group_slices(df[self.by])
+            ordered = values[order]
+            for key, positions in groups:
+                self.bounds_[key] = _static_bounds(ordered[positions], self.method, *self._params())
+        self.rank_error_ = 0.0
+        return self
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame], sketch_k: int = DEFAULT_K) -> "OutlierDetector":
+        """
+        Fit from a stream of DataFrame chunks without holding the data in memory.
+        Args:
+            chunks: Iterable of DataFrames with the same columns
+            sketch_k: KLL accuracy parameter (memory per column and group grows linearly)
+        Returns:
+            The fitted detector
+        """
+        states: Dict[object, object] = {}
+        self.columns_ = None
+        for chunk in chunks:
+            if self.columns_ is None:
+                self.columns_ = _numeric_columns(chunk, self.columns, self.by)
+            values = chunk[self.columns_].to_numpy(dtype=np.float64)
+            if self.by is None:
+                parts = [(None, values)]
+            else:
+                order, groups = _group_slices(chunk[self.by])
+                ordered = values[order]
+                parts = [(key, ordered[positions]) for key, positions in groups]
+            for key, part in parts:
+                if key not in states:
+                    states[key] = (_RunningMoments(len(self.columns_)) if self.method == 'zscore'
+                                   else [KLLSketch(sketch_k) for _ in self.columns_])
+                state = states[key]
+                if self.method == 'zscore':
+                    state.update(part)
+                else:
+                    for j, sketch in enumerate(state):
+                        sketch.update(part[:, j])
+
+        self.columns_ = self.columns_ or []
+        self.bounds_ = {key: self._sketch_bounds(state) for key, state in states.items()}
+        self.rank_error_ = 0.0 if self.method == 'zscore' or not states else rank_error(sketch_k)
+        return self
+
+    def _sketch_bounds(self, state) -> Tuple[np.ndarray, np.ndarray]:
+        """Bounds from streaming statistics of one group."""
+        if self.method == 'zscore':
+            mean, std = np.where(state.count > 0, state.mean, np.nan), state.std()
+            std = np.where(std > 0, std, 1.0)
+            return mean - self.threshold * std, mean + self.threshold * std
+        if self.method == 'mad':
+            median = np.array([s.quantile(0.5) for s in state])
+            scale = MAD_SCALE * np.array([s.mad(m) for s, m in zip(state, median)])
+            scale = np.where(scale > 0, scale, np.nan)
+            return median - self.threshold * scale, median + self.threshold * scale
+        qs = [0.25, 0.75] if self.method == 'iqr' else [self.lower, self.upper]
+        lo, hi = np.array([s.quantiles(qs) for s in state]).T
+        if self.method == 'iqr':
+            return lo - self.k * (hi - lo), hi + self.k * (hi - lo)
+        return lo, hi
+
+    def _check_fitted(self):
+        if self.columns_ is None:
+            raise ValueError("OutlierDetector is not fitted; call fit() or load() first")
+
+    def transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Apply the fitted bounds to df.
+        Args:
+            df: DataFrame with the fitted columns
+            inplace: Modify df instead of returning a copy
+        Returns:
+            Treated DataFrame (df itself when inplace=True)
+        """
+        self._check_fitted()
+        values = df[self.columns_].to_numpy(dtype=np.float64)
+        n, m = values.shape
+        if self.by is None:
+            lo, hi = self.bounds_.get(None, (np.full(m, np.nan), np.full(m, np.nan)))
+            lo, hi = np.broadcast_to(lo, (n, m)), np.broadcast_to(hi, (n, m))
+        else:
+            keys = list(self.bounds_)
+            codes = pd.Index(keys).get_indexer(df[self.by])
+            # unseen groups index the extra all-NaN row
+            table_lo = np.vstack([self.bounds_[key][0] for key in keys] + [np.full(m, np.nan)])
+            table_hi = np.vstack([self.bounds_[key][1] for key in keys] + [np.full(m, np.nan)])
+            lo, hi = table_lo[codes], table_hi[codes]
+        lo, hi = _finite_bounds(lo, hi)
+        out = _target_frame(df, inplace)
+        return _apply_treatment(out, self.columns_, values, lo, hi, self.treatment, self.flag_suffix)
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fit on df and return the treated df."""
+        return self.fit(df).transform(df)
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Apply transform() to each chunk lazily."""
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable fitted state."""
+        self._check_fitted()
+        return {
+            'columns': self.columns_,
+            'method': self.method,
+            'treatment': self.treatment,
+            'by': self.by,
+            'k': self.k,
+            'threshold': self.threshold,
+            'lower': self.lower,
+            'upper': self.upper,
+            'flag_suffix': self.flag_suffix,
+            'groups': [None if key is None else _json_key(key) for key in self.bounds_],
+            'lower_bounds': [np.asarray(lo).tolist() for lo, _ in self.bounds_.values()],
+            'upper_bounds': [np.asarray(hi).tolist() for _, hi in self.bounds_.values()],
+            'rank_error': self.rank_error_,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "OutlierDetector":
+        """Rebuild a fitted detector from to_dict() output."""
+        detector = cls(state['columns'], state['method'], state['treatment'], state['by'],
+                       state['k'], state['threshold'], state['lower'], state['upper'],
+                       state['flag_suffix'])
+        detector.columns_ = list(state['columns'])
+        detector.bounds_ = {
+            key: (np.array(lo, dtype=np.float64), np.array(hi, dtype=np.float64))
+            for key, lo, hi in zip(state['groups'], state['lower_bounds'], state['upper_bounds'])
+        }
+        detector.rank_error_ = float(state.get('rank_error', 0.0))
+        return detector
+
+    def save(self, path: str) -> None:
+        """Write the fitted state to a JSON file (NaN bounds are stored as null)."""
+        state = self.to_dict()
+        for name in ('lower_bounds', 'upper_bounds'):
+            state[name] = [[None if np.isnan(v) else v for v in row] for row in state[name]]
+        with open(path, 'w') as f:
+            json.dump(state, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "OutlierDetector":
+        """Load a fitted detector saved with save()."""
+        with open(path, 'r') as f:
+            state = json.load(f)
+        for name in ('lower_bounds', 'upper_bounds'):
+            state[name] = [[np.nan if v is None else v for v in row] for row in state[name]]
+        return cls.from_dict(state)
+
+
+def _json_key(key):
+    """Group key as a JSON scalar (NumPy scalars become Python values)."""
+    return key.item() if isinstance(key, np.generic) else key
+
+
+def _iter_chunks(path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    if Path(path).suffix.lower() in PARQUET_SUFFIXES:
+        return iter_parquet_chunks(path, batch_size)
+    return iter(pd.read_csv(path, chunksize=batch_size))
+
+
+def _rolling_chunks(chunks: Iterable[pd.DataFrame], columns: Optional[List[str]], method: str,
+                    treatment: str, by: Optional[str], window: int,
+                    params: dict) -> Iterator[pd.DataFrame]:
+    """
+    Rolling treatment of a stream: the last window - 1 raw rows (per group)
+    are carried into the next chunk, so windows span chunk boundaries.
+    """
+    tail = None
+    for chunk in chunks:
+        frame = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+        carried = 0 if tail is None else len(tail)
+        treated = treat_outliers(frame, columns, method, treatment, by, window, **params)
+        yield treated.iloc[carried:].reset_index(drop=True)
+        if window > 1:
+            tail = frame.groupby(by, sort=False).tail(window - 1) if by else frame.iloc[-(window - 1):]
+
+
+def treat_file(input_path: str, output_path: str, columns: Optional[List[str]] = None,
+               method: str = 'iqr', treatment: str = 'clip', by: Optional[str] = None,
+               window: Optional[int] = None, batch_size: int = 65536,
+               sketch_k: int = DEFAULT_K, **params) -> Optional[OutlierDetector]:
+    """
+    Streaming outlier treatment of a CSV or Parquet file larger than memory.
+    Fixed bounds take two passes (OutlierDetector.fit_chunks(), then
+    transform); rolling bounds take one pass, carrying window - 1 rows per
+    group between chunks. Peak memory is one chunk plus the sketches.
+    Args:
+        input_path: Source .csv or .parquet file
+        output_path: Destination .csv or .parquet file
+        columns: Columns to treat (default: numeric columns of the first chunk)
+        method: 'iqr', 'zscore', 'mad' or 'quantile'
+        treatment: 'flag', 'clip' or 'winsorize'
+        by: Group column (rows of a group must be in time order for window)
+        window: Trailing window length for rolling bounds
+        batch_size: Rows per chunk
+        sketch_k: KLL accuracy parameter for the quantile-based methods
+        **params: min_periods, k, threshold, lower, upper (see outlier_bounds)
+    Returns:
+        The fitted OutlierDetector, or None for rolling bounds
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    detector = None
+    if window is None:
+        params.pop('min_periods', None)
+        detector = OutlierDetector(columns, method, treatment, by, **params)
+        detector.fit_chunks(_iter_chunks(input_path, batch_size), sketch_k=sketch_k)
+        treated = detector.transform_chunks(_iter_chunks(input_path, batch_size))
+    else:
+        treated = _rolling_chunks(_iter_chunks(input_path, batch_size), columns, method,
+                                  treatment, by, window, params)
+
+    to_parquet = Path(output_path).suffix.lower() in PARQUET_SUFFIXES
+    writer, schema = None, None
+    try:
+        for i, chunk in enumerate(treated):
+            if not to_parquet:
+                chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+                continue
+            if writer is None:
+                # fixed schema from the first chunk: later all-null chunks must not change types
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False).remove_metadata()
+                writer = pq.ParquetWriter(output_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    return detector
@@ -0,0 +1,209 @@
+"""
+Mergeable Streaming Quantile Sketches
+
+KLL sketch (Karnin, Lang & Liberty, 2016) for estimating quantiles of a column
+that does not fit in memory. Values are fed in chunks; sketches built on
+different chunks, files or processes can be merged, and the result has the
+same guarantee as a sketch built over all the data at once.
+
+Error guarantee:
+    A sketch with parameter ``k`` answers rank queries with a normalized rank
+    error of at most ``rank_error(k)`` with 99% probability; for k=200 that is
+    about 1.3%. For the median this means the returned value has a true rank
+    between ``(0.5 - eps) * n`` and ``(0.5 + eps) * n``. The value itself is
+    always an observed data point, and the sketch size stays O(k) regardless
+    of n.
+
+Example:
+    sketch = KLLSketch(k=200)
+    for chunk in chunks:
+        sketch.update(chunk['Close'].to_numpy())
+    median = sketch.quantile(0.5)
+"""
+
+import math
+import numpy as np
+from typing import Iterable, List, Optional, Sequence
+
+DEFAULT_K = 200
+MIN_LEVEL_CAPACITY = 8
+LEVEL_DECAY = 2.0 / 3.0
+
+
+def rank_error(k: int = DEFAULT_K) -> float:
+    """
+    Normalized rank error of a single quantile query (99% confidence).
+
+    Empirical fit published with the Apache DataSketches KLL implementation,
+    which uses the same level capacities as this sketch.
+    """
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch over float values (NaNs are ignored).
+
+    Level ``h`` holds items that each stand for ``2**h`` inputs. When the
+    sketch exceeds its capacity the lowest full level is sorted and every other
+    item (random offset) is promoted one level up, halving that level's size.
+    All level operations are NumPy sorts and strided slices, so feeding large
+    chunks costs O(chunk log chunk) with no per-item Python.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = 0):
+        """
+        Args:
+            k: Accuracy parameter; error shrinks roughly as 1/k, size grows as k
+            seed: Seed for the compaction coin flips (None for nondeterministic)
+        """
+        if k < MIN_LEVEL_CAPACITY:
+            raise ValueError(f"k must be at least {MIN_LEVEL_CAPACITY}")
+        self.k = k
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(MIN_LEVEL_CAPACITY, int(math.ceil(self.k * LEVEL_DECAY ** depth)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self._levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self._levels)))
+
+    def _compress(self) -> None:
+        """Compact levels until the sketch fits its total capacity."""
+        while self._size() > self._max_size():
+            for h, items in enumerate(self._levels):
+                if len(items) < self._capacity(h):
+                    continue
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                even = len(items) - len(keep)
+                promoted = items[self._rng.integers(2):even:2]
+                self._levels[h] = keep
+                self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+                break
+
+    def update(self, values) -> "KLLSketch":
+        """
+        Add a batch of values.
+        Args:
+            values: Array-like of numbers; NaNs are skipped
+        Returns:
+            The sketch (for chaining)
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Fold another sketch into this one (other is left unchanged).
+        Args:
+            other: Sketch built with the same k
+        Returns:
+            The merged sketch
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.n += other.n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        """Sorted retained items with their cumulative weights."""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        Estimate several quantiles at once.
+        Args:
+            qs: Quantiles in [0, 1]
+        Returns:
+            Array of estimates (NaN when the sketch is empty)
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items, cum = self._weighted_items()
+        idx = np.searchsorted(cum, qs * cum[-1], side='left')
+        result = items[np.minimum(idx, len(items) - 1)]
+        # the extremes are tracked exactly
+        result = np.where(qs <= 0, self.min, result)
+        return np.where(qs >= 1, self.max, result)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a single quantile (see quantiles())."""
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value: float) -> float:
+        """Estimated fraction of inputs <= value."""
+        if self.n == 0:
+            return np.nan
+        items, cum = self._weighted_items()
+        idx = np.searchsorted(items, value, side='right')
+        return float(cum[idx - 1] / cum[-1]) if idx else 0.0
+
+    def mad(self, center: Optional[float] = None) -> float:
+        """
+        Estimate the median absolute deviation from center.
+        The retained items keep their weights, so the weighted median of
+        their distances to center is read off the same sketch.
+        Args:
+            center: Reference value (default: the estimated median)
+        Returns:
+            Estimate (NaN when the sketch is empty)
+        """
+        if self.n == 0:
+            return np.nan
+        items, cum = self._weighted_items()
+        center = self.quantile(0.5) if center is None else center
+        weights = np.diff(cum, prepend=0.0)
+        deviations = np.abs(items - center)
+        order = np.argsort(deviations, kind='stable')
+        cum_dev = np.cumsum(weights[order])
+        idx = np.searchsorted(cum_dev, 0.5 * cum_dev[-1], side='left')
+        return float(deviations[order][min(idx, len(items) - 1)])
+
+    def rank_error(self) -> float:
+        """Normalized rank error bound of this sketch (99% confidence)."""
+        return rank_error(self.k)
+
+    def __len__(self) -> int:
+        """Number of retained items (not the number of inputs, see .n)."""
+        return self._size()
+
+
+def merge_sketches(sketches: Iterable[KLLSketch]) -> Optional[KLLSketch]:
+    """Merge sketches into a new one; returns None for an empty iterable."""
+    merged = None
+    for sketch in sketches:
+        if merged is None:
+            merged = KLLSketch(sketch.k)
+        merged.merge(sketch)
+    return merged
@@ -0,0 +1,287 @@
+"""
+Partitioned Parquet Market-Data Store
+Stage 05: Data Storage
+
+Replaces ad-hoc timestamped CSV/Parquet snapshots with one Hive-partitioned
+Parquet dataset:
+
+    <root>/ticker=AAPL/year=2024/part-<sequence>.parquet
+
+Rows are keyed by (ticker, date). Every write stamps its rows with a
+monotonically increasing ``_batch`` number, so duplicates written at
+different times resolve to the latest write when reading and when
+compacting. Reads push ticker/date predicates down to pyarrow.dataset, which
+skips partitions that cannot match, so a date window only opens the files of
+the relevant tickers and years.
+
+Example:
+    store = MarketDataStore('data/store')
+    store.ingest(glob.glob('homework/stage05_data-storage/data/raw/*.csv'))
+    df = store.read(tickers=['AAPL'], start='2024-01-01', end='2024-07-01')
+    store.compact()
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ['ticker', 'date']
+BATCH_COLUMN = '_batch'
+# api_source-alpha_symbol-AAPL_20250817-133104.csv -> AAPL
+SYMBOL_PATTERN = re.compile(r'symbol-([A-Za-z0-9.\-]+?)_\d{8}')
+
+
+def _snake_case(name) -> str:
+    """'Adj Close' -> 'adj_close'."""
+    return re.sub(r'[^0-9a-zA-Z]+', '_', str(name)).strip('_').lower()
+
+
+def _partition_value(ticker: str) -> str:
+    return str(ticker).upper().replace('/', '_')
+
+
+def normalize_market_frame(df: pd.DataFrame, ticker: Optional[str] = None) -> pd.DataFrame:
+    """
+    Bring a price frame into the store layout.
+    Handles fetch_stock_data output (DatetimeIndex, 'Open'/'Adj Close' columns)
+    as well as the stage04/05 CSV and Parquet files (date/ticker columns).
+    Args:
+        df: Price data
+        ticker: Ticker to assign when df has no ticker column
+    Returns:
+        pd.DataFrame with ticker, date (datetime64[ns], midnight), year and
+        float64 value columns
+    """
+    out = df.copy()
+    if isinstance(out.index, pd.DatetimeIndex) or _snake_case(out.index.name or '') == 'date':
+        out = out.reset_index()
+    out.columns = [_snake_case(c) for c in out.columns]
+    if 'date' not in out.columns:
+        raise ValueError("Market data needs a date column or DatetimeIndex")
+    if 'ticker' not in out.columns:
+        if ticker is None:
+            raise ValueError("Market data has no ticker column; pass ticker=")
+        out['ticker'] = ticker
+    out['ticker'] = out['ticker'].astype(str).str.upper()
+    out['date'] = pd.to_datetime(out['date'], errors='coerce').dt.tz_localize(None).dt.normalize()
+    out['date'] = out['date'].astype('datetime64[ns]')
+    out = out.dropna(subset=['date'])
+    # one numeric type for every value column keeps file schemas compatible
+    for col in out.columns:
+        if col not in KEY_COLUMNS and pd.api.types.is_numeric_dtype(out[col]):
+            out[col] = out[col].astype(np.float64)
+    out['year'] = out['date'].dt.year.astype(np.int32)
+    return out
+
+
+class MarketDataStore:
+    """Hive-partitioned (ticker/year) Parquet dataset with (ticker, date) keys."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Dataset directory (created if missing)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_batch = 0
+
+    def _next_batch(self) -> int:
+        """Strictly increasing write sequence (nanosecond clock, never repeats)."""
+        with self._lock:
+            self._last_batch = max(time.time_ns(), self._last_batch + 1)
+            return self._last_batch
+
+    def _partitioning(self):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        return ds.partitioning(pa.schema([('ticker', pa.string()), ('year', pa.int32())]),
+                               flavor='hive')
+
+    def _partition_dir(self, ticker: str, year: int) -> Path:
+        return self.root / f'ticker={_partition_value(ticker)}' / f'year={int(year)}'
+
+    def _write_partition(self, part: pd.DataFrame, directory: Path, batch: int) -> Path:
+        """
+        Write one partition file atomically (temporary name, then rename).
+        ticker and year live in the directory names, not in the file.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'part-{batch}-{uuid.uuid4().hex[:8]}.parquet'
+        tmp = directory / f'.{path.name}.tmp'
+        part.drop(columns=['ticker', 'year'], errors='ignore').to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def write(self, df: pd.DataFrame, ticker: Optional[str] = None) -> int:
+        """
+        Append price data; one new file per touched (ticker, year) partition.
+        Later writes win over earlier ones for the same (ticker, date).
+        Args:
+            df: Price data (see normalize_market_frame)
+            ticker: Ticker for frames without a ticker column
+        Returns:
+            int: Number of rows written
+        """
+        data = normalize_market_frame(df, ticker)
+        data = data.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+        if data.empty:
+            return 0
+        batch = self._next_batch()
+        data[BATCH_COLUMN] = np.int64(batch)
+        for (tick, year), part in data.groupby(['ticker', 'year'], sort=True):
+            self._write_partition(part.sort_values('date'), self._partition_dir(tick, year), batch)
+        logging.info(f'[storage] Wrote {len(data)} rows in batch {batch}')
+        return len(data)
+
+    def _filter(self, tickers, start, end):
+        """pyarrow filter expression; partition fields let the scan skip directories."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        expr = None
+
+        def combine(condition):
+            return condition if expr is None else expr & condition
+
+        if tickers is not None:
+            expr = combine(ds.field('ticker').isin([_partition_value(t) for t in tickers]))
+        if start is not None:
+            start = pd.Timestamp(start).as_unit('ns')
+            expr = combine(ds.field('year') >= start.year)
+            expr = combine(ds.field('date') >= pa.scalar(start.value, pa.timestamp('ns')))
+        if end is not None:
+            end = pd.Timestamp(end).as_unit('ns')
+            expr = combine(ds.field('year') <= end.year)
+            expr = combine(ds.field('date') < pa.scalar(end.value, pa.timestamp('ns')))
+        return expr
+
+    def _dataset(self, expr=None):
+        """Dataset over the partition files that can match expr, with a unified schema."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        partitioning = self._partitioning()
+        # in-flight temporary files start with '.', so they are never listed
+        full = ds.dataset(self.root, format='parquet', partitioning=partitioning,
+                          ignore_prefixes=['.', '_'])
+        fragments = list(full.get_fragments(filter=expr))
+        if not fragments:
+            return None
+        # files from different sources may carry different value columns
+        schema = pa.unify_schemas([f.physical_schema for f in fragments] + [partitioning.schema])
+        return ds.dataset([f.path for f in fragments], schema=schema, format='parquet',
+                          partitioning=partitioning, partition_base_dir=str(self.root))
+
+    def read(self, tickers: Optional[Iterable[str]] = None, start=None, end=None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load deduplicated rows for tickers and a [start, end) date window.
+        Args:
+            tickers: Tickers to load (None loads all)
+            start: First date (inclusive)
+            end: Last date (exclusive)
+            columns: Value columns to return in addition to ticker and date
+        Returns:
+            pd.DataFrame sorted by (ticker, date)
+        """
+        expr = self._filter(list(tickers) if tickers is not None else None, start, end)
+        dataset = self._dataset(expr)
+        if dataset is None:
+            return pd.DataFrame(columns=KEY_COLUMNS + (columns or []))
+        wanted = None
+        if columns is not None:
+            wanted = list(dict.fromkeys(KEY_COLUMNS + list(columns) + [BATCH_COLUMN]))
+        df = dataset.to_table(filter=expr, columns=wanted).to_pandas()
+        df['ticker'] = df['ticker'].astype(str)
+        df = (df.sort_values(KEY_COLUMNS + [BATCH_COLUMN], kind='stable')
+                .drop_duplicates(subset=KEY_COLUMNS, keep='last'))
+        values = [c for c in df.columns if c not in KEY_COLUMNS + [BATCH_COLUMN, 'year']]
+        return df[KEY_COLUMNS + values].reset_index(drop=True)
+
+    def partitions(self) -> Dict[str, List[Path]]:
+        """Partition directory -> data files, for every partition in the store."""
+        result = {}
+        for directory in sorted(self.root.glob('ticker=*/year=*')):
+            files = sorted(directory.glob('part-*.parquet'))
+            if files:
+                result[str(directory)] = files
+        return result
+
+    def compact(self, min_files: int = 2) -> int:
+        """
+        Merge the files of each partition into one deduplicated file.
+        The new file is written before the old ones are removed; an
+        interruption leaves duplicates, which reads already resolve.
+        Args:
+            min_files: Only compact partitions with at least this many files
+        Returns:
+            int: Number of partitions compacted
+        """
+        compacted = 0
+        for directory, files in self.partitions().items():
+            if len(files) < min_files:
+                continue
+            directory = Path(directory)
+            frames = [pd.read_parquet(f) for f in files]
+            merged = pd.concat(frames, ignore_index=True)
+            merged = (merged.sort_values(['date', BATCH_COLUMN], kind='stable')
+                            .drop_duplicates(subset=['date'], keep='last'))
+            self._write_partition(merged, directory, int(merged[BATCH_COLUMN].max()))
+            for f in files:
+                f.unlink()
+            compacted += 1
+        logging.info(f'[storage] Compacted {compacted} partitions')
+        return compacted
+
+    def ingest(self, paths: Iterable[str], ticker: Optional[str] = None) -> int:
+        """
+        Load legacy snapshot files (CSV or Parquet) into the store.
+        The ticker comes from a ticker column, else from a 'symbol-XXX_'
+        file name (stage04 API dumps), else from the ticker argument.
+        Args:
+            paths: Files to ingest
+            ticker: Fallback ticker
+        Returns:
+            int: Rows written
+        """
+        total = 0
+        for path in paths:
+            path = Path(path)
+            df = pd.read_parquet(path) if path.suffix in ('.parquet', '.pq') else pd.read_csv(path)
+            match = SYMBOL_PATTERN.search(path.name)
+            file_ticker = match.group(1) if match else ticker
+            total += self.write(df, ticker=file_ticker)
+        return total
+
+    def fetch_and_store(self, tickers: Iterable[str], start, end, fetcher=None) -> int:
+        """
+        Download bars (see acquisition.StockDataFetcher) and write them.
+        Args:
+            tickers: Tickers to download
+            start, end: Date range (end exclusive)
+            fetcher: StockDataFetcher to use (default: Yahoo with its default cache)
+        Returns:
+            int: Rows written
+        """
+        from acquisition import StockDataFetcher
+
+        fetcher = fetcher if fetcher is not None else StockDataFetcher()
+        frames = fetcher.fetch_many(tickers, start, end)
+        return sum(self.write(df, ticker=tick) for tick, df in frames.items() if len(df))
+
+    def clear(self) -> None:
+        """Delete every partition (the root directory is kept)."""
+        for child in self.root.iterdir():
+            if child.is_dir():
+                shutil.rmtree(child)
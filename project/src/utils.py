@@ -1,33 +1,426 @@
+import hashlib
+import json
+import os
+import warnings
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
-def analyze_numeric(df, group_col=None):
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+GROUPED_STATS = ['mean', 'std', 'min', 'max', 'count']
+# share of sampled date strings a detected format must parse to be locked in
+DATE_FORMAT_MIN_MATCH = 0.99
+
+def _percentile_label(q):
+    """Row/column label used by describe() for a percentile, e.g. 0.25 -> '25%'."""
+    return f'{q * 100:g}%'
+
+def _column_blocks(n_columns, block_size=64):
+    """Column slices that bound the size of temporary arrays."""
+    return [slice(start, min(start + block_size, n_columns))
+            for start in range(0, max(n_columns, 1), block_size)]
+
+def _stable_code_order(codes, n_codes):
     """
-    Generate enhanced statistics for numeric columns.
-    Compatible with both grouped and ungrouped data.
+    Stable argsort of non-negative integer codes.
+    NumPy only uses radix sort for 16-bit keys, so larger code ranges are
+    sorted as an LSD radix over 16-bit digits (much faster than a stable
+    comparison sort on int64).
     """
-    numeric_df = df.select_dtypes(include=np.number)
-    
-    if group_col and group_col in df.columns:
-        stats = numeric_df.groupby(df[group_col]).agg(
-            ['mean', 'std', 'min', 'max', 'count']
-        )
+    codes = np.asarray(codes, dtype=np.int64)
+    order = np.argsort((codes & 0xFFFF).astype(np.uint16), kind='stable')
+    shift = 16
+    while (n_codes - 1) >> shift:
+        digit = ((codes[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digit, kind='stable')]
+        shift += 16
+    return order
+
+def _sort_within_segments(x, starts, segment_ids):
+    """
+    Sort every column of x ascending inside each segment (NaNs last).
+    With reasonably sized segments each one is sorted directly, all columns
+    at once; with many tiny segments a global value sort followed by a stable
+    radix sort on the segment id avoids the per-segment Python loop.
+    """
+    n_rows = len(x)
+    out = np.empty_like(x)
+    if len(starts) * 64 <= n_rows:
+        ends = np.append(starts[1:], n_rows)
+        for start, end in zip(starts, ends):
+            out[start:end] = np.sort(x[start:end], axis=0)
     else:
-        stats = numeric_df.describe(percentiles=[0.25, 0.5, 0.75])
-        stats.loc['range'] = stats.loc['max'] - stats.loc['min']
-    
+        for j in range(x.shape[1]):
+            by_value = np.argsort(x[:, j])
+            out[:, j] = x[by_value[_stable_code_order(segment_ids[by_value], len(starts))], j]
+    return out
+
+def _segment_stats(values, starts, percentiles=()):
+    """
+    Per-segment statistics for every column of a float array.
+    Rows must already be ordered so that each group is one contiguous segment
+    beginning at the matching entry of ``starts``. Sums, minima and maxima are
+    single np.*.reduceat passes; the standard deviation takes a second pass
+    over deviations from the segment mean (numerically stable); percentiles
+    sort each column once by (segment, value). NaNs are ignored throughout.
+    Args:
+        values (np.ndarray): (rows, columns) float64 array, rows sorted by segment
+        starts (np.ndarray): First row of each segment
+        percentiles (sequence): Quantiles in [0, 1], linear interpolation
+    Returns:
+        dict: stat name -> (segments, columns) array
+    """
+    n_rows, n_cols = values.shape
+    lengths = np.diff(np.append(starts, n_rows))
+    segment_ids = np.repeat(np.arange(len(starts)), lengths)
+    stats = {name: np.empty((len(starts), n_cols))
+             for name in ['count', 'mean', 'std', 'min', 'max'] + [_percentile_label(q) for q in percentiles]}
+
+    if n_rows == 0:
+        for name, table in stats.items():
+            table.fill(0 if name == 'count' else np.nan)
+        return stats
+
+    for block in _column_blocks(n_cols):
+        x = values[:, block]
+        valid = ~np.isnan(x)
+        count = np.add.reduceat(valid, starts, axis=0, dtype=np.int64)
+        empty = count == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.add.reduceat(np.where(valid, x, 0.0), starts, axis=0) / count
+            dev = np.where(valid, x - np.repeat(mean, lengths, axis=0), 0.0)
+            var = np.add.reduceat(dev * dev, starts, axis=0) / (count - 1)
+        var[count < 2] = np.nan
+        mins = np.minimum.reduceat(np.where(valid, x, np.inf), starts, axis=0)
+        maxs = np.maximum.reduceat(np.where(valid, x, -np.inf), starts, axis=0)
+        mins[empty], maxs[empty] = np.nan, np.nan
+
+        stats['count'][:, block] = count
+        stats['mean'][:, block] = mean
+        stats['std'][:, block] = np.sqrt(var)
+        stats['min'][:, block] = mins
+        stats['max'][:, block] = maxs
+
+        if len(percentiles):
+            # NaNs sort to the end of their segment, after the count valid values
+            ordered = _sort_within_segments(x, starts, segment_ids)
+            last = np.maximum(count - 1, 0)
+            cols = np.arange(x.shape[1])
+            for q in percentiles:
+                pos = q * last
+                lo = np.floor(pos).astype(np.int64)
+                hi = np.minimum(lo + 1, last)
+                low_vals = ordered[starts[:, None] + lo, cols]
+                high_vals = ordered[starts[:, None] + hi, cols]
+                result = low_vals + (high_vals - low_vals) * (pos - lo)
+                result[empty] = np.nan
+                stats[_percentile_label(q)][:, block] = result
     return stats
 
-def parse_date_column(df, column, date_format=None):
+def _numeric_columns(df, group_col=None):
+    """Numeric part of df (without the grouping column) and whether to group."""
+    grouped = bool(group_col) and group_col in df.columns
+    numeric_df = df.select_dtypes(include=np.number)
+    if grouped:
+        numeric_df = numeric_df.drop(columns=[group_col], errors='ignore')
+    return numeric_df, grouped
+
+def _resolve_percentiles(grouped, percentiles=None):
+    """Percentiles to report: quartiles plus the median by default when ungrouped."""
+    if grouped:
+        return list(percentiles or [])
+    return sorted(set(DEFAULT_PERCENTILES if percentiles is None else percentiles) | {0.5})
+
+def _group_segments(keys):
+    """
+    Row order that makes every group contiguous.
+    Args:
+        keys (pd.Series): Group key per row
+    Returns:
+        tuple: (row order, segment starts, group label per segment); rows with
+        a missing key are left out, as groupby does
+    """
+    # factorize(sort=True) orders groups like groupby; missing keys get code -1
+    codes, groups = pd.factorize(keys, sort=True)
+    # missing keys are moved to a trailing code so they can be cut off the end
+    order = _stable_code_order(np.where(codes >= 0, codes, len(groups)), len(groups) + 1)
+    order = order[:np.count_nonzero(codes >= 0)]
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+    return order, starts, groups[sorted_codes[starts]]
+
+def _stats_table(stats, columns, dtypes, percentiles, index=None):
+    """
+    Lay out _segment_stats() output the way analyze_numeric returns it.
+    Args:
+        stats (dict): stat name -> (groups, columns) array
+        columns (list): Column labels
+        dtypes (list): Original dtype per column (integer min/max keep it)
+        percentiles (list): Percentiles present in stats
+        index (pd.Index, optional): Group labels; None for the ungrouped table
+    Returns:
+        pd.DataFrame: describe()-style table, or one row per group with
+        (column, statistic) columns
+    """
+    pct_labels = [_percentile_label(q) for q in percentiles]
+    if index is None:
+        labels = ['count', 'mean', 'std', 'min'] + pct_labels + ['max']
+        table = pd.DataFrame(np.vstack([stats[name] for name in labels]), index=labels, columns=columns)
+        table.loc['range'] = table.loc['max'] - table.loc['min']
+        return table
+
+    table = {}
+    for j, col in enumerate(columns):
+        for name in GROUPED_STATS + pct_labels:
+            column = stats[name][:, j]
+            if name == 'count':
+                column = column.astype(np.int64)
+            elif name in ('min', 'max') and np.issubdtype(dtypes[j], np.integer):
+                column = column.astype(dtypes[j])
+            table[(col, name)] = column
+    columns_index = pd.MultiIndex.from_tuples(table.keys()) if table else None
+    return pd.DataFrame(table, index=index, columns=columns_index)
+
+def analyze_numeric(df, group_col=None, percentiles=None):
+    """
+    Generate enhanced statistics for numeric columns.
+    Compatible with both grouped and ungrouped data.
+    Every statistic comes from one engine (_segment_stats) working on rows
+    sorted by group code, so the data is scanned a fixed number of times
+    regardless of how many statistics or groups are requested.
+    Args:
+        df (pd.DataFrame): Input DataFrame
+        group_col (str, optional): Column to group by
+        percentiles (list, optional): Quantiles in [0, 1]. Defaults to
+            quartiles when ungrouped (the median is always included, as in
+            describe()); grouped output only adds them when requested
+    Returns:
+        pd.DataFrame: Ungrouped, a describe()-style table (count, mean, std,
+        min, percentiles, max, range) with one column per numeric column.
+        Grouped, one row per group with (column, statistic) columns.
+    """
+    numeric_df, grouped = _numeric_columns(df, group_col)
+    if numeric_df.shape[1] == 0:
+        raise ValueError("No numeric columns to analyze")
+    values = numeric_df.to_numpy(dtype=np.float64)
+    percentiles = _resolve_percentiles(grouped, percentiles)
+    dtypes = list(numeric_df.dtypes)
+
+    if not grouped:
+        stats = _segment_stats(values, np.zeros(1, dtype=np.int64), percentiles)
+        return _stats_table(stats, numeric_df.columns, dtypes, percentiles)
+
+    order, starts, groups = _group_segments(df[group_col])
+    stats = _segment_stats(np.take(values, order, axis=0), starts, percentiles)
+    return _stats_table(stats, numeric_df.columns, dtypes, percentiles,
+                        index=pd.Index(groups, name=group_col))
+
+def _detect_date_format(values, sample_size=1000, min_match=DATE_FORMAT_MIN_MATCH):
+    """
+    Detect one strptime format that parses (almost) every sampled string.
+    Candidates are the formats pandas guesses for the sampled values, tried
+    from most to least common, so dayfirst-looking strings such as
+    '25/12/2023' can still win when they dominate the sample. A few malformed
+    strings do not disqualify a format: the one parsing the largest share of
+    the sample wins if that share is at least min_match.
+    Args:
+        values (array-like): Candidate date strings (ideally unique values)
+        sample_size (int): Number of strings inspected
+        min_match (float): Minimum share of the sample the format must parse
+    Returns:
+        str or None: Format string, or None if no single format fits
+    """
+    strings = [v for v in values[:sample_size * 4] if isinstance(v, str)][:sample_size]
+    if not strings:
+        return None
+    with warnings.catch_warnings():
+        # dayfirst hints are irrelevant here: every candidate is validated below
+        warnings.simplefilter('ignore', UserWarning)
+        guesses = pd.Series([guess_datetime_format(v) for v in strings]).value_counts()
+    best, best_share = None, 0.0
+    for fmt in guesses.index:
+        if fmt is None:
+            continue
+        parsed = pd.to_datetime(pd.Index(strings), format=fmt, errors='coerce')
+        share = 1.0 - parsed.isna().mean()
+        if share == 1.0:
+            return fmt
+        if share > best_share:
+            best, best_share = fmt, share
+    return best if best_share >= min_match else None
+
+def parse_date_column(df, column, date_format=None, inplace=False, cache=True,
+                      return_failures=False, sample_size=1000,
+                      min_match=DATE_FORMAT_MIN_MATCH):
     """
     Parse a column in a DataFrame to datetime.
+    Unparseable values become NaT (errors='coerce'). Without date_format the
+    format is detected once from a sample and locked for the whole column
+    instead of being inferred per value. The format is locked when it parses
+    at least min_match of the sample; the remaining malformed values become
+    NaT and are counted as failures. If no single format fits, pandas' own
+    inference is used as before.
     Args:
         df (pd.DataFrame): Input DataFrame
         column (str): Column name to parse
         date_format (str, optional): Custom date format
+        inplace (bool): Replace the column in df instead of working on a copy
+        cache (bool): Parse each distinct value once and map the results back
+            through factorize codes (large speedup when values repeat)
+        return_failures (bool): Also return how many non-null values could
+            not be parsed
+        sample_size (int): Strings inspected by format detection
+        min_match (float): Share of the sample a detected format must parse
     Returns:
-        pd.DataFrame: DataFrame with parsed date column
+        pd.DataFrame: DataFrame with parsed date column, or
+        (pd.DataFrame, int) when return_failures is True
     """
-    df = df.copy()
-    df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce')
-    return df
\ No newline at end of file
+    if not inplace:
+        df = df.copy()
+    values = df[column]
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return (df, 0) if return_failures else df
+
+    if cache:
+        codes, uniques = pd.factorize(values)
+    else:
+        codes, uniques = None, values.to_numpy()
+
+    fmt = date_format
+    if fmt is None:
+        fmt = _detect_date_format(uniques, sample_size, min_match)
+    parsed = pd.to_datetime(pd.Index(uniques), format=fmt, errors='coerce')
+
+    failed = parsed.isna() & pd.notna(uniques)
+    if cache:
+        failures = int(np.bincount(codes[codes >= 0], minlength=len(uniques))[failed].sum())
+        parsed = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    else:
+        failures = int(failed.sum())
+    df[column] = pd.Series(parsed, index=df.index, name=column)
+    return (df, failures) if return_failures else df
+
+def _file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _frame_to_arrow(df):
+    """
+    Arrow table that maps back to pandas without copies.
+    Numeric and datetime columns are converted from their NumPy arrays, so
+    NaN/NaT stay values instead of becoming nulls; columns without nulls are
+    what to_pandas()/to_numpy() can hand out as views. A non-default index
+    (e.g. from index_col) is stored as leading __index_level_<i>__ columns and
+    its names go into the schema metadata, see _arrow_index().
+    """
+    import pyarrow as pa
+
+    index_names = []
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0
+            and df.index.step == 1 and df.index.name is None):
+        index_names = list(df.index.names)
+        df = df.reset_index(names=[f'__index_level_{i}__' for i in range(len(index_names))])
+    arrays = []
+    for col in df.columns:
+        values = df[col]
+        numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        if numeric or pd.api.types.is_datetime64_dtype(values):
+            arrays.append(pa.array(values.to_numpy()))
+        else:
+            arrays.append(pa.array(values, from_pandas=True))
+    metadata = {'index_names': json.dumps(index_names)}
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns], metadata=metadata)
+
+def _arrow_index(table):
+    """(index field names, original index names) stored by _frame_to_arrow."""
+    metadata = table.schema.metadata or {}
+    names = json.loads(metadata.get(b'index_names', b'[]'))
+    return [f'__index_level_{i}__' for i in range(len(names))], names
+
+def _atomic_write_text(path, text):
+    """Write text through a temporary file so readers never see a partial file."""
+    tmp = Path(path).with_name(f'.{Path(path).name}.{os.getpid()}.tmp')
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+def load_csv_cached(path, cache_dir='data/cache/csv', as_numpy=False, **read_csv_kwargs):
+    """
+    Load a CSV through a memory-mapped Arrow IPC cache.
+    The first call parses the CSV and writes an uncompressed Arrow file next to
+    a JSON manifest (source size, mtime, SHA-256 and read_csv arguments). Later
+    calls memory-map that file, so numeric and datetime columns are zero-copy
+    views into the OS page cache, shared by every process reading the same
+    cache. The cache is rebuilt when the source size or content changes; a
+    changed mtime alone only triggers a hash check.
+    Mapped arrays are read-only: under copy-on-write (pandas >= 3) writes copy
+    the column, while older pandas raises on in-place writes to them.
+    Args:
+        path (str): CSV file
+        cache_dir (str): Directory for the cached Arrow files
+        as_numpy (bool): Return {column: np.ndarray} instead of a DataFrame;
+            index levels (e.g. from index_col) are included under their names
+        **read_csv_kwargs: Passed to pd.read_csv (part of the cache key)
+    Returns:
+        pd.DataFrame or dict: Loaded data
+    """
+    import pyarrow as pa
+
+    source = Path(path).resolve()
+    stat = source.stat()
+    options = json.dumps(read_csv_kwargs, sort_keys=True, default=str)
+    # v2: the index is stored (older cache files lack it and are rebuilt)
+    key = hashlib.sha1(f'{source}|{options}|v2'.encode()).hexdigest()[:16]
+    cache = Path(cache_dir)
+    data_path = cache / f'{source.stem}-{key}.arrow'
+    manifest_path = cache / f'{source.stem}-{key}.json'
+
+    manifest = None
+    if data_path.exists() and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest['size'] != stat.st_size:
+            manifest = None
+        elif manifest['mtime_ns'] != stat.st_mtime_ns:
+            # touched or rewritten: trust the cache only if the bytes match
+            if _file_digest(source) == manifest['sha256']:
+                manifest['mtime_ns'] = stat.st_mtime_ns
+                _atomic_write_text(manifest_path, json.dumps(manifest, indent=2))
+            else:
+                manifest = None
+
+    if manifest is None:
+        cache.mkdir(parents=True, exist_ok=True)
+        table = _frame_to_arrow(pd.read_csv(source, **read_csv_kwargs))
+        tmp = data_path.with_name(f'.{data_path.name}.{os.getpid()}.tmp')
+        with pa.OSFile(str(tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, data_path)
+        manifest = {'source': str(source), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                    'sha256': _file_digest(source), 'read_csv_kwargs': options}
+        _atomic_write_text(manifest_path, json.dumps(manifest, indent=2))
+
+    table = pa.ipc.open_file(pa.memory_map(str(data_path), 'r')).read_all()
+    index_fields, index_names = _arrow_index(table)
+    if as_numpy:
+        # a single chunk converts without copying (numeric columns without nulls);
+        # index levels come first, under their names (or the stored field name)
+        labels = {field: name for field, name in zip(index_fields, index_names) if name is not None}
+        return {labels.get(name, name): (column.chunk(0) if column.num_chunks == 1 else column)
+                .to_numpy(zero_copy_only=False)
+                for name, column in zip(table.column_names, table.columns)}
+    # split_blocks keeps one block per column, so columns are not consolidated (copied)
+    df = table.to_pandas(split_blocks=True)
+    if index_fields:
+        df = df.set_index(index_fields)
+        df.index.names = index_names
+    return df